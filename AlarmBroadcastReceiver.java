@@ -3,6 +3,7 @@ package com.reminder.myreminders;
 import android.content.BroadcastReceiver;
 import android.content.Context;
 import android.content.Intent;
+import android.app.AlarmManager;
 import android.app.NotificationManager;
 import android.app.NotificationChannel;
 import android.app.PendingIntent;
@@ -14,6 +15,18 @@ import android.os.PowerManager;
 import androidx.core.app.NotificationCompat;
 import android.os.Vibrator;
 import android.os.VibrationEffect;
+import android.service.notification.StatusBarNotification;
+import android.text.TextUtils;
+
+import java.io.File;
+import java.io.IOException;
+import java.io.RandomAccessFile;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileLock;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Calendar;
+import java.util.List;
 
 /**
  * BroadcastReceiver that handles alarms even when app is completely closed
@@ -21,6 +34,41 @@ import android.os.VibrationEffect;
  */
 public class AlarmBroadcastReceiver extends BroadcastReceiver {
     
+    // Shared with the Python side (fire_ledger.py)
+    private static final String LEDGER_FILE_NAME = "fired.ledger";
+    private static final int LEDGER_MAGIC = 0x464C4731;  // "FLG1"
+    private static final int LEDGER_CAPACITY = 1024;
+    private static final int LEDGER_HEADER = 8;
+    private static final int LEDGER_ENTRY = 8;
+    private static final int LEDGER_SIZE = LEDGER_HEADER + LEDGER_CAPACITY * LEDGER_ENTRY;
+    private static final int LEDGER_KEEP_MINUTES = 24 * 60;
+    
+    // Shared with the Python side (notification_channels.py), which normally
+    // creates it when the app first starts. The id carries CHANNELS_VERSION:
+    // keep the two in step
+    private static final String ALARM_CHANNEL_ID = "reminder_alarms_v2";
+    private static boolean alarmChannelReady = false;
+    
+    // Shared with alarm_dispatch.py: reminders firing together form one group
+    // and only its summary alerts
+    private static final String ALARM_DISMISS = "com.reminder.ALARM_DISMISS";
+    private static final String GROUP_KEY = "com.reminder.ALARMS";
+    private static final int SUMMARY_NOTIFICATION_ID = 2999;
+    
+    // Shared with fire_latency.py: a cell of log2 ms bucket counts plus the
+    // largest sample for each (path, stage); this receiver is path "receiver"
+    private static final String LATENCY_FILE_NAME = "fire_latency.hist";
+    private static final int LATENCY_MAGIC = 0x4C415431;  // "LAT1"
+    private static final int LATENCY_HEADER = 8;
+    private static final int LATENCY_BUCKETS = 24;
+    private static final int LATENCY_CELL = (LATENCY_BUCKETS + 1) * 4;
+    private static final int LATENCY_PATHS = 4;
+    private static final int LATENCY_STAGES = 3;
+    private static final int LATENCY_SIZE = LATENCY_HEADER + LATENCY_PATHS * LATENCY_STAGES * LATENCY_CELL;
+    private static final int LATENCY_PATH_RECEIVER = 3;
+    private static final int LATENCY_STAGE_TRIGGER = 0;
+    private static final int LATENCY_STAGE_NOTIFICATION = 1;
+    
     @Override
     public void onReceive(Context context, Intent intent) {
         // This method is called when the alarm triggers
@@ -35,15 +83,256 @@ if (action != null && action.equals("com.reminder.ALARM_TRIGGER")) {
             String reminderCategory = intent.getStringExtra("reminder_category");
             String reminderNote = intent.getStringExtra("reminder_note");
             
+            // The app or the service may already have fired this occurrence
+            long triggeredAt = System.currentTimeMillis();
+            long occurrenceMinute = intent.getIntExtra("occurrence_minute", 0);
+            long scheduledAt = occurrenceMinute * 60000 + intent.getIntExtra("occurrence_offset_ms", 0);
+            if (occurrenceMinute == 0) {
+                occurrenceMinute = triggeredAt / 60000;
+            }
+            List<Integer> ids = new ArrayList<>();
+            List<String> texts = new ArrayList<>();
+            claimAll(context, intent, reminderId, reminderText, occurrenceMinute, ids, texts);
+            
+            // A repeating reminder's alarm is one-shot: register its next occurrence
+            rearmNextOccurrence(context, intent, reminderId, triggeredAt);
+            if (ids.isEmpty()) {
+                return;
+            }
+            
             // Wake up the device
             wakeUpDevice(context);
             
-            // Show notification
-            showAlarmNotification(context, reminderId, reminderText, reminderCategory, reminderNote);
+            // One notification per reminder, one summary, one vibration
+            for (int i = 0; i < ids.size(); i++) {
+                showAlarmNotification(context, ids.get(i), texts.get(i), reminderCategory,
+                    ids.size() == 1 ? reminderNote : null, ids.size() > 1);
+            }
+            if (ids.size() > 1) {
+                showSummaryNotification(context, texts);
+            }
+            
+            // Alarms registered by older versions don't say when they were due
+            if (scheduledAt > 0) {
+                long notifiedAt = System.currentTimeMillis();
+                int[] cellIndexes = new int[2 * ids.size()];
+                long[] samples = new long[2 * ids.size()];
+                for (int i = 0; i < ids.size(); i++) {
+                    cellIndexes[2 * i] = LATENCY_PATH_RECEIVER * LATENCY_STAGES + LATENCY_STAGE_TRIGGER;
+                    samples[2 * i] = triggeredAt - scheduledAt;
+                    cellIndexes[2 * i + 1] = LATENCY_PATH_RECEIVER * LATENCY_STAGES + LATENCY_STAGE_NOTIFICATION;
+                    samples[2 * i + 1] = notifiedAt - scheduledAt;
+                }
+                recordLatency(context, cellIndexes, samples);
+            }
             
             // Vibrate
             vibrateDevice(context);
+        } else if (ALARM_DISMISS.equals(action)) {
+            dismissAlarm(context, intent.getIntExtra("reminder_id", -1));
+        }
+    }
+    
+    /**
+     * Register the next occurrence of a per-reminder alarm under the same
+     * request code, so it keeps repeating while the app and service are dead.
+     * Slots and snoozes carry no "alarm_days_mask"; the app re-arms those.
+     */
+    private void rearmNextOccurrence(Context context, Intent intent, int reminderId, long now) {
+        int daysMask = intent.getIntExtra("alarm_days_mask", 0);
+        if (reminderId < 0 || daysMask == 0 || intent.hasExtra("reminder_ids")) {
+            return;
+        }
+        long nextMs = nextOccurrenceMs(intent.getIntExtra("alarm_hour", 0),
+            intent.getIntExtra("alarm_minute", 0), daysMask, now);
+        if (nextMs < 0) {
+            return;
+        }
+        try {
+            Intent next = new Intent(intent);
+            next.putExtra("occurrence_minute", (int) (nextMs / 60000));
+            next.putExtra("occurrence_offset_ms", (int) (nextMs % 60000));
+            PendingIntent pendingIntent = PendingIntent.getBroadcast(context, reminderId, next,
+                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE);
+            AlarmManager alarmManager = (AlarmManager) context.getSystemService(Context.ALARM_SERVICE);
+            try {
+                alarmManager.setExactAndAllowWhileIdle(AlarmManager.RTC_WAKEUP, nextMs, pendingIntent);
+            } catch (SecurityException e) {
+                // Exact alarm permission revoked: a late alarm beats none
+                alarmManager.setAndAllowWhileIdle(AlarmManager.RTC_WAKEUP, nextMs, pendingIntent);
+            }
+        } catch (Exception e) {
+            e.printStackTrace();
+        }
+    }
+    
+    /**
+     * Same as reminder_schedule.next_occurrence_ms(): the first selected day
+     * (bit 0 = Monday) at hour:minute strictly after now, -1 if none is
+     */
+    static long nextOccurrenceMs(int hour, int minute, int daysMask, long now) {
+        Calendar candidate = Calendar.getInstance();
+        candidate.setTimeInMillis(now);
+        candidate.set(Calendar.HOUR_OF_DAY, hour);
+        candidate.set(Calendar.MINUTE, minute);
+        candidate.set(Calendar.SECOND, 0);
+        candidate.set(Calendar.MILLISECOND, 0);
+        for (int offset = 0; offset <= 7; offset++) {
+            int weekday = (candidate.get(Calendar.DAY_OF_WEEK) + 5) % 7;
+            if ((daysMask >> weekday & 1) != 0 && candidate.getTimeInMillis() > now) {
+                return candidate.getTimeInMillis();
+            }
+            candidate.add(Calendar.DAY_OF_MONTH, 1);
         }
+        return -1;
+    }
+    
+    /**
+     * Claim the occurrence for every reminder in the intent ("reminder_ids" and
+     * newline separated "reminder_text" for a shared slot); the ones that had
+     * not fired yet go into ids/texts
+     */
+    private void claimAll(Context context, Intent intent, int reminderId, String reminderText,
+                          long occurrenceMinute, List<Integer> ids, List<String> texts) {
+        String idList = intent.getStringExtra("reminder_ids");
+        if (idList == null || idList.isEmpty()) {
+            if (claimOccurrence(context, reminderId, occurrenceMinute)) {
+                ids.add(reminderId);
+                texts.add(reminderText);
+            }
+            return;
+        }
+        String[] slotIds = idList.split(",");
+        String[] slotTexts = reminderText == null ? new String[0] : reminderText.split("\n", -1);
+        for (int i = 0; i < slotIds.length; i++) {
+            int id = Integer.parseInt(slotIds[i]);
+            if (claimOccurrence(context, id, occurrenceMinute)) {
+                ids.add(id);
+                texts.add(slotTexts.length == slotIds.length ? slotTexts[i] : reminderText);
+            }
+        }
+    }
+    
+    /**
+     * Same protocol as FiredLedger.claim(): a big-endian ring of (id, minute)
+     * int pairs after an 8 byte header (magic, next slot), read and written
+     * under an exclusive lock (a POSIX record lock, like lockf).
+     *
+     * POSIX record locks belong to the whole process, and closing any
+     * descriptor of the file drops them, so they only keep other processes
+     * out. This receiver runs in the app's process, so the app claims through
+     * here too (fire_ledger.JavaFiredLedger) and the class lock keeps the two
+     * apart. The same goes for the latency histogram below.
+     */
+    public static synchronized boolean claimOccurrence(Context context, int reminderId, long occurrenceMinute) {
+        int minute = (int) occurrenceMinute;
+        File ledger = new File(context.getFilesDir(), LEDGER_FILE_NAME);
+        try (RandomAccessFile file = new RandomAccessFile(ledger, "rw");
+             FileLock lock = file.getChannel().lock()) {
+            byte[] data = new byte[LEDGER_SIZE];
+            ByteBuffer ring = ByteBuffer.wrap(data);
+            boolean fresh = file.length() != LEDGER_SIZE;
+            if (!fresh) {
+                file.readFully(data);
+                fresh = ring.getInt(0) != LEDGER_MAGIC;
+            }
+            if (fresh) {
+                // New file, or one in an older format
+                Arrays.fill(data, (byte) 0);
+                ring.putInt(0, LEDGER_MAGIC);
+            }
+            
+            long oldest = System.currentTimeMillis() / 60000 - LEDGER_KEEP_MINUTES;
+            if (minute >= oldest) {
+                for (int offset = LEDGER_HEADER; offset < LEDGER_SIZE; offset += LEDGER_ENTRY) {
+                    if (ring.getInt(offset) == reminderId && ring.getInt(offset + 4) == minute) {
+                        return false;
+                    }
+                }
+            }
+            
+            int head = Integer.remainderUnsigned(ring.getInt(4), LEDGER_CAPACITY);
+            if (fresh) {
+                file.seek(0);
+                file.write(data);
+                file.setLength(LEDGER_SIZE);
+            }
+            file.seek(LEDGER_HEADER + head * LEDGER_ENTRY);
+            file.writeInt(reminderId);
+            file.writeInt(minute);
+            file.seek(4);
+            file.writeInt((head + 1) % LEDGER_CAPACITY);
+            return true;
+        } catch (IOException e) {
+            // Better a duplicate alarm than a missed one
+            return true;
+        }
+    }
+    
+    /**
+     * Same protocol as LatencyHistogram.record(): read the whole file, add
+     * each sample (ms) to its (path * stages + stage) cell, write it back,
+     * all under an exclusive lock. Also used by the app process
+     * (fire_latency.JavaLatencyHistogram)
+     */
+    public static synchronized void recordLatency(Context context, int[] cellIndexes, long[] samples) {
+        File histogram = new File(context.getFilesDir(), LATENCY_FILE_NAME);
+        try (RandomAccessFile file = new RandomAccessFile(histogram, "rw");
+             FileLock lock = file.getChannel().lock()) {
+            byte[] data = new byte[LATENCY_SIZE];
+            ByteBuffer cells = ByteBuffer.wrap(data);
+            boolean fresh = file.length() != LATENCY_SIZE;
+            if (!fresh) {
+                file.readFully(data);
+                fresh = cells.getInt(0) != LATENCY_MAGIC;
+            }
+            if (fresh) {
+                Arrays.fill(data, (byte) 0);
+                cells.putInt(0, LATENCY_MAGIC);
+            }
+            
+            for (int i = 0; i < samples.length; i++) {
+                addLatency(cells, cellIndexes[i], samples[i]);
+            }
+            long total = Integer.toUnsignedLong(cells.getInt(4)) + samples.length;
+            cells.putInt(4, (int) Math.min(total, 0xFFFFFFFFL));
+            
+            file.seek(0);
+            file.write(data);
+        } catch (IOException e) {
+            // Statistics only; never get in the way of the alarm
+        }
+    }
+    
+    /**
+     * The histogram as it is on disk, read under a shared lock; null if there
+     * is none yet (LatencyHistogram.read() in the app process)
+     */
+    public static synchronized byte[] readLatency(Context context) {
+        File histogram = new File(context.getFilesDir(), LATENCY_FILE_NAME);
+        if (histogram.length() != LATENCY_SIZE) {
+            return null;
+        }
+        try (RandomAccessFile file = new RandomAccessFile(histogram, "r");
+             FileLock lock = file.getChannel().lock(0, Long.MAX_VALUE, true)) {
+            byte[] data = new byte[LATENCY_SIZE];
+            file.readFully(data);
+            return ByteBuffer.wrap(data).getInt(0) == LATENCY_MAGIC ? data : null;
+        } catch (IOException e) {
+            return null;
+        }
+    }
+    
+    private static void addLatency(ByteBuffer cells, int cellIndex, long ms) {
+        ms = Math.max(0, ms);
+        int bucket = ms < 1 ? 0 : Math.min(LATENCY_BUCKETS - 1, 64 - Long.numberOfLeadingZeros(ms));
+        int cell = LATENCY_HEADER + cellIndex * LATENCY_CELL;
+        int countAt = cell + bucket * 4;
+        long bucketCount = Integer.toUnsignedLong(cells.getInt(countAt)) + 1;
+        cells.putInt(countAt, (int) Math.min(bucketCount, 0xFFFFFFFFL));
+        int maxAt = cell + LATENCY_BUCKETS * 4;
+        long max = Math.max(Integer.toUnsignedLong(cells.getInt(maxAt)), Math.min(ms, 0xFFFFFFFFL));
+        cells.putInt(maxAt, (int) max);
     }
     
     private void wakeUpDevice(Context context) {
@@ -57,35 +346,12 @@ if (action != null && action.equals("com.reminder.ALARM_TRIGGER")) {
         wakeLock.acquire(60000); // 60 seconds
     }
     
-    private void showAlarmNotification(Context context, int reminderId, String text, String category, String note) {
+    private void showAlarmNotification(Context context, int reminderId, String text, String category,
+                                       String note, boolean grouped) {
         NotificationManager notificationManager = 
             (NotificationManager) context.getSystemService(Context.NOTIFICATION_SERVICE);
         
-        String channelId = "reminder_alarm_channel";
-        
-        // Create notification channel for Android 8.0+
-        if (Build.VERSION.SDK_INT >= Build.VERSION_CODES.O) {
-            NotificationChannel channel = new NotificationChannel(
-                channelId,
-                "Reminder Alarms",
-                NotificationManager.IMPORTANCE_HIGH
-            );
-            channel.setDescription("Full-screen alarm notifications");
-            channel.enableVibration(true);
-            channel.setVibrationPattern(new long[]{0, 1000, 500, 1000});
-            channel.setLockscreenVisibility(NotificationCompat.VISIBILITY_PUBLIC);
-            channel.setBypassDnd(true);
-            
-            // Set alarm sound
-            Uri alarmSound = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM);
-            AudioAttributes audioAttributes = new AudioAttributes.Builder()
-                .setContentType(AudioAttributes.CONTENT_TYPE_SONIFICATION)
-                .setUsage(AudioAttributes.USAGE_ALARM)
-                .build();
-            channel.setSound(alarmSound, audioAttributes);
-            
-            notificationManager.createNotificationChannel(channel);
-        }
+        ensureAlarmChannel(notificationManager);
         
         // Create intent to open app
         Intent launchIntent = context.getPackageManager()
@@ -104,7 +370,7 @@ if (action != null && action.equals("com.reminder.ALARM_TRIGGER")) {
         );
         
         // Build notification
-        NotificationCompat.Builder builder = new NotificationCompat.Builder(context, channelId)
+        NotificationCompat.Builder builder = new NotificationCompat.Builder(context, ALARM_CHANNEL_ID)
             .setSmallIcon(android.R.drawable.ic_lock_idle_alarm)
             .setContentTitle("⏰ REMINDER: " + category)
             .setContentText(text)
@@ -114,8 +380,15 @@ if (action != null && action.equals("com.reminder.ALARM_TRIGGER")) {
             .setOngoing(true)
             .setFullScreenIntent(pendingIntent, true)
             .setContentIntent(pendingIntent)
-            .setVibrate(new long[]{0, 1000, 500, 1000, 500, 1000})
-            .setSound(RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM));
+            .setGroup(GROUP_KEY)
+            .addAction(0, "Dismiss", dismissIntent(context, reminderId));
+        if (grouped) {
+            // The summary does the alerting
+            builder.setGroupAlertBehavior(NotificationCompat.GROUP_ALERT_SUMMARY);
+        } else {
+            builder.setVibrate(new long[]{0, 1000, 500, 1000, 500, 1000})
+                .setSound(RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM));
+        }
         
         // Add note if exists
         if (note != null && !note.isEmpty()) {
@@ -127,6 +400,118 @@ if (action != null && action.equals("com.reminder.ALARM_TRIGGER")) {
         notificationManager.notify(3000 + reminderId, builder.build());
     }
     
+    private void showSummaryNotification(Context context, List<String> texts) {
+        NotificationManager notificationManager = 
+            (NotificationManager) context.getSystemService(Context.NOTIFICATION_SERVICE);
+        
+        NotificationCompat.InboxStyle style = new NotificationCompat.InboxStyle();
+        for (String text : texts) {
+            style.addLine(text);
+        }
+        
+        Intent launchIntent = context.getPackageManager()
+            .getLaunchIntentForPackage(context.getPackageName());
+        if (launchIntent != null) {
+            launchIntent.setFlags(Intent.FLAG_ACTIVITY_NEW_TASK | Intent.FLAG_ACTIVITY_CLEAR_TOP);
+            launchIntent.putExtra("alarm_triggered", true);
+        }
+        PendingIntent pendingIntent = PendingIntent.getActivity(
+            context,
+            SUMMARY_NOTIFICATION_ID,
+            launchIntent,
+            PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+        );
+        
+        NotificationCompat.Builder builder = new NotificationCompat.Builder(context, ALARM_CHANNEL_ID)
+            .setSmallIcon(android.R.drawable.ic_lock_idle_alarm)
+            .setContentTitle("⏰ " + texts.size() + " reminders")
+            .setContentText(TextUtils.join(", ", texts))
+            .setStyle(style)
+            .setPriority(NotificationCompat.PRIORITY_MAX)
+            .setCategory(NotificationCompat.CATEGORY_ALARM)
+            .setOngoing(true)
+            .setFullScreenIntent(pendingIntent, true)
+            .setContentIntent(pendingIntent)
+            .setGroup(GROUP_KEY)
+            .setGroupSummary(true)
+            .setGroupAlertBehavior(NotificationCompat.GROUP_ALERT_SUMMARY)
+            .setVibrate(new long[]{0, 1000, 500, 1000, 500, 1000})
+            .setSound(RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM));
+        
+        notificationManager.notify(SUMMARY_NOTIFICATION_ID, builder.build());
+    }
+    
+    private PendingIntent dismissIntent(Context context, int reminderId) {
+        Intent intent = new Intent(context, AlarmBroadcastReceiver.class);
+        intent.setAction(ALARM_DISMISS);
+        intent.putExtra("reminder_id", reminderId);
+        return PendingIntent.getBroadcast(
+            context,
+            3000 + reminderId,
+            intent,
+            PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+        );
+    }
+    
+    /**
+     * Remove one reminder's notification; with the last one of the group gone,
+     * the summary and the vibration go too
+     */
+    private void dismissAlarm(Context context, int reminderId) {
+        NotificationManager notificationManager = 
+            (NotificationManager) context.getSystemService(Context.NOTIFICATION_SERVICE);
+        notificationManager.cancel(3000 + reminderId);
+        
+        boolean othersShowing = false;
+        if (Build.VERSION.SDK_INT >= Build.VERSION_CODES.M) {
+            for (StatusBarNotification shown : notificationManager.getActiveNotifications()) {
+                if (GROUP_KEY.equals(shown.getNotification().getGroup())
+                        && shown.getId() != SUMMARY_NOTIFICATION_ID
+                        && shown.getId() != 3000 + reminderId) {
+                    othersShowing = true;
+                    break;
+                }
+            }
+        }
+        if (!othersShowing) {
+            notificationManager.cancel(SUMMARY_NOTIFICATION_ID);
+            Vibrator vibrator = (Vibrator) context.getSystemService(Context.VIBRATOR_SERVICE);
+            vibrator.cancel();
+        }
+    }
+    
+    /**
+     * Create the alarm channel only if it doesn't exist yet (after an update the
+     * receiver can fire before the app has run again); same settings as alarm_channel()
+     */
+    private static synchronized void ensureAlarmChannel(NotificationManager notificationManager) {
+        if (alarmChannelReady || Build.VERSION.SDK_INT < Build.VERSION_CODES.O) {
+            return;
+        }
+        if (notificationManager.getNotificationChannel(ALARM_CHANNEL_ID) == null) {
+            NotificationChannel channel = new NotificationChannel(
+                ALARM_CHANNEL_ID,
+                "Reminder Alarms",
+                NotificationManager.IMPORTANCE_HIGH
+            );
+            channel.setDescription("Alarms for your reminders");
+            channel.enableVibration(true);
+            channel.setVibrationPattern(new long[]{0, 1000, 500, 1000});
+            channel.setLockscreenVisibility(NotificationCompat.VISIBILITY_PUBLIC);
+            channel.setBypassDnd(true);
+            
+            Uri alarmSound = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM);
+            AudioAttributes audioAttributes = new AudioAttributes.Builder()
+                .setContentType(AudioAttributes.CONTENT_TYPE_SONIFICATION)
+                .setUsage(AudioAttributes.USAGE_ALARM)
+                .build();
+            channel.setSound(alarmSound, audioAttributes);
+            
+            notificationManager.createNotificationChannel(channel);
+        }
+        alarmChannelReady = true;
+    }
+    
     private void vibrateDevice(Context context) {
         Vibrator vibrator = (Vibrator) context.getSystemService(Context.VIBRATOR_SERVICE);
         long[] pattern = {0, 1000, 500, 1000, 500, 1000};
@@ -0,0 +1,261 @@
+"""
+Alarm sound playback shared by the app and both background services
+MediaPlayers are prepared ahead of time with prepareAsync(), so firing an
+alarm only has to call start()
+"""
+import time
+import threading
+from collections import OrderedDict
+
+from jni_registry import java
+from ringtone_catalogue import RingtoneCatalogue, is_bundled
+
+# Prepared players kept around: the next alarm's sound plus the default fallback
+POOL_SIZE = 2
+
+# Prepare the next alarm's sound this long before it is due
+PREWARM_AHEAD_SECONDS = 120
+
+# Data source of the system default alarm sound
+DEFAULT_SOURCE = 'SYSTEM_DEFAULT'
+
+_listener_classes = None
+
+
+def sound_source(ringtone_name, ringtone_uri=None):
+    """Data source for a reminder's ringtone: a URI string, 'bundled:<file>' or
+    DEFAULT_SOURCE; None = silent"""
+    if ringtone_name == 'Vibrate Only' or ringtone_uri == 'VIBRATE_ONLY':
+        return None
+    if ringtone_uri and ringtone_uri not in ('SYSTEM_DEFAULT', 'BROWSE'):
+        return ringtone_uri
+    return DEFAULT_SOURCE
+
+
+def listener_classes():
+    """MediaPlayer callback interfaces, defined on first use (jnius is Android only)"""
+    global _listener_classes
+    if _listener_classes is None:
+        from jnius import PythonJavaClass, java_method
+
+        class PreparedListener(PythonJavaClass):
+            __javainterfaces__ = ['android/media/MediaPlayer$OnPreparedListener']
+            __javacontext__ = 'app'
+
+            def __init__(self, callback):
+                super().__init__()
+                self.callback = callback
+
+            @java_method('(Landroid/media/MediaPlayer;)V')
+            def onPrepared(self, player):
+                self.callback(True)
+
+        class ErrorListener(PythonJavaClass):
+            __javainterfaces__ = ['android/media/MediaPlayer$OnErrorListener']
+            __javacontext__ = 'app'
+
+            def __init__(self, callback):
+                super().__init__()
+                self.callback = callback
+
+            @java_method('(Landroid/media/MediaPlayer;II)Z')
+            def onError(self, player, what, extra):
+                print(f"MediaPlayer error {what}/{extra}")
+                self.callback(False)
+                return True
+
+        _listener_classes = (PreparedListener, ErrorListener)
+    return _listener_classes
+
+
+class PreparedPlayer:
+    """One MediaPlayer for one data source.
+
+    state: 'preparing' -> 'prepared' -> 'playing', or 'error'; 'released' at the end
+    """
+    def __init__(self, source):
+        self.source = source
+        self.player = None
+        self.state = 'preparing'
+        # The Java side only holds weak references to these
+        self.listeners = ()
+
+    def release(self):
+        player, self.player = self.player, None
+        if player is not None:
+            try:
+                if self.state == 'playing':
+                    player.stop()
+                player.release()
+            except Exception as e:
+                print(f"MediaPlayer release error: {e}")
+        self.state = 'released'
+
+
+class AlarmAudio:
+    """Bounded pool of prepared MediaPlayers keyed by data source.
+
+    prewarm() before an alarm is due; play() then starts a prepared player
+    straight away, or one still preparing the moment it is ready. A source
+    that fails is replaced by the default alarm sound without any blocking
+    prepare(). Bundled ringtones (minute-long MP3s) are streamed from
+    their file like any other source.
+    last_latency_ms is the time from play() to start(); play()'s on_started
+    is called at that moment too.
+    """
+    def __init__(self, context, pool_size=POOL_SIZE, catalogue=None):
+        self.context = context
+        self.catalogue = catalogue or RingtoneCatalogue()
+        self.pool_size = pool_size
+        self.pool = OrderedDict()
+        self.current = None
+        # prepareAsync() callbacks arrive on the Android main thread
+        self.lock = threading.Lock()
+        self.requested_at = 0
+        self.on_started = None
+        self.last_latency_ms = None
+        self.plays = 0
+        self.warm_plays = 0
+        self.fallbacks = 0
+
+    def prewarm(self, source):
+        """Have `source` (and the default fallback) prepared before it is needed"""
+        if source is None:
+            return
+        with self.lock:
+            self._warm(DEFAULT_SOURCE)
+            if source != DEFAULT_SOURCE:
+                self._warm(source)
+
+    def play(self, source, on_started=None):
+        """Start looping `source` as soon as possible; None just stops the current sound"""
+        self.stop()
+        if source is None:
+            return
+        with self.lock:
+            self.requested_at = time.perf_counter()
+            self.on_started = on_started
+            self.plays += 1
+            entry = self.pool.pop(source, None)
+            if entry is None:
+                entry = self._prepare(source)
+            elif entry.state == 'prepared':
+                self.warm_plays += 1
+            # A source that already failed to prepare goes straight to the fallback
+            self.current = entry
+            self._start_or_wait(entry)
+
+    def stop(self):
+        with self.lock:
+            entry, self.current = self.current, None
+            self.on_started = None
+        if entry is not None:
+            entry.release()
+
+    def release(self):
+        """Stop and free every player (the process is going away)"""
+        self.stop()
+        with self.lock:
+            pool, self.pool = self.pool, OrderedDict()
+        for entry in pool.values():
+            entry.release()
+
+    def stats(self):
+        """Counters for logging"""
+        return {
+            'plays': self.plays,
+            'prewarmed': self.warm_plays,
+            'fallbacks': self.fallbacks,
+            'last_latency_ms': self.last_latency_ms
+        }
+
+    def _warm(self, source):
+        entry = self.pool.get(source)
+        if entry is not None and entry.state != 'error':
+            self.pool.move_to_end(source)
+            return
+        self.pool[source] = self._prepare(source)
+        while len(self.pool) > self.pool_size:
+            _, old = self.pool.popitem(last=False)
+            old.release()
+
+    def _prepare(self, source):
+        entry = PreparedPlayer(source)
+        try:
+            player = entry.player = java.MediaPlayer()
+            player.setAudioStreamType(java.AudioManager.STREAM_ALARM)
+            if source == DEFAULT_SOURCE:
+                player.setDataSource(self.context, java.RingtoneManager.getDefaultUri(
+                    java.RingtoneManager.TYPE_ALARM))
+            elif is_bundled(source):
+                player.setDataSource(self.catalogue.path(source))
+            else:
+                player.setDataSource(self.context, java.Uri.parse(source))
+            player.setLooping(True)
+
+            PreparedListener, ErrorListener = listener_classes()
+            entry.listeners = (
+                PreparedListener(lambda ok: self._on_prepared(entry, ok)),
+                ErrorListener(lambda ok: self._on_prepared(entry, ok))
+            )
+            player.setOnPreparedListener(entry.listeners[0])
+            player.setOnErrorListener(entry.listeners[1])
+            player.prepareAsync()
+        except Exception as e:
+            print(f"Alarm sound prepare error ({source}): {e}")
+            entry.release()
+            entry.state = 'error'
+        return entry
+
+    def _on_prepared(self, entry, ok):
+        with self.lock:
+            if entry.state in ('released', 'playing'):
+                return
+            if entry is self.current:
+                entry.state = 'prepared' if ok else 'error'
+                self._start_or_wait(entry)
+            elif ok:
+                entry.state = 'prepared'
+            else:
+                # Pooled player: free it now, the next prewarm() replaces it
+                entry.release()
+                entry.state = 'error'
+
+    def _started(self, source):
+        self.last_latency_ms = (time.perf_counter() - self.requested_at) * 1000
+        print(f"Alarm sound started after {self.last_latency_ms:.1f} ms ({source})")
+        on_started, self.on_started = self.on_started, None
+        if on_started is not None:
+            try:
+                on_started()
+            except Exception as e:
+                print(f"Sound start callback error: {e}")
+
+    def _start_or_wait(self, entry):
+        """Called with the lock held, for self.current"""
+        if entry.state == 'prepared':
+            try:
+                entry.player.start()
+                entry.state = 'playing'
+                self._started(entry.source)
+                return
+            except Exception as e:
+                print(f"Alarm sound start error ({entry.source}): {e}")
+                entry.state = 'error'
+        if entry.state == 'error':
+            self._fall_back(entry)
+        # Still preparing: _on_prepared() starts it
+
+    def _fall_back(self, entry):
+        entry.release()
+        if entry.source == DEFAULT_SOURCE:
+            print("No alarm sound available")
+            self.current = None
+            return
+        print(f"Alarm sound {entry.source} failed, using the default alarm")
+        self.fallbacks += 1
+        fallback = self.pool.pop(DEFAULT_SOURCE, None)
+        if fallback is None or fallback.state == 'error':
+            fallback = self._prepare(DEFAULT_SOURCE)
+        self.current = fallback
+        self._start_or_wait(fallback)
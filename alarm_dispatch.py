@@ -0,0 +1,264 @@
+"""
+One alert for all the reminders that fire at the same instant
+The app and the background service hand every batch of claimed reminders to
+AlarmDispatcher, which posts them as one notification group and plays one sound
+and one vibration for the whole batch. Each reminder keeps its own notification
+and can be dismissed on its own
+"""
+import threading
+
+from jni_registry import java
+from alarm_audio import sound_source
+from ringtone_catalogue import is_bundled
+from notification_channels import ALARM_CHANNEL_ID
+from fire_latency import FireTimer
+
+# Shared with AlarmBroadcastReceiver.java
+GROUP_KEY = 'com.reminder.ALARMS'
+SUMMARY_NOTIFICATION_ID = 2999
+DISMISS_ACTION = 'com.reminder.ALARM_DISMISS'
+RECEIVER_CLASS = 'com.reminder.myreminders.AlarmBroadcastReceiver'
+
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+VIBRATION_PATTERNS = {
+    'High': [0, 1000, 500, 1000, 500, 1000],
+    'Medium': [0, 500, 200, 500, 200, 500],
+    'Low': [0, 500, 200, 500],
+}
+
+
+def notification_id(reminder_id):
+    return 3000 + reminder_id
+
+
+def lead_reminder(reminders):
+    """The reminder whose sound and vibration the batch uses: highest priority, then first"""
+    return min(reminders, key=lambda r: PRIORITY_RANK.get(r.priority, 1))
+
+
+def notification_sound_uri(reminder):
+    """Sound for the alerting notification (Android < 8; the channel's after that)"""
+    ringtone_uri = reminder.ringtone_uri
+    # Bundled clips are files the system can't open; the app plays those itself
+    if ringtone_uri and ringtone_uri not in ('SYSTEM_DEFAULT', 'VIBRATE_ONLY', 'BROWSE') \
+            and not is_bundled(ringtone_uri):
+        return java.Uri.parse(ringtone_uri)
+    return java.RingtoneManager.getDefaultUri(java.RingtoneManager.TYPE_ALARM)
+
+
+def summary_line(reminder):
+    return f"{reminder.category}: {reminder.text}"
+
+
+class AlarmDispatcher:
+    """Posts, sounds and dismisses batches of alarms.
+
+    A batch that fires while an earlier one is still showing joins its
+    group. dismiss() removes one reminder; the sound and vibration stop with
+    the last one. The Dismiss action on a notification goes to
+    AlarmBroadcastReceiver.java, so the process that fired the batch finds
+    out with poll_dismissed().
+
+    With a LatencyHistogram, each fire() records how long after the
+    scheduled instants it triggered, posted and started the sound.
+    """
+    def __init__(self, context, alarm_audio, repeat_vibration=False, latency=None, path='app'):
+        self.context = context
+        self.alarm_audio = alarm_audio
+        self.repeat_vibration = repeat_vibration
+        self.latency = latency
+        # Firing path the latency samples are recorded under
+        self.path = path
+        # reminder id -> Reminder, for every alarm still showing
+        self.active = {}
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.coalesced = 0
+
+    def fire(self, reminders, scheduled=(), path=None):
+        """Alert once for every reminder in `reminders` (already claimed in the ledger).
+
+        scheduled: epoch seconds each reminder was due, for the latency histogram
+        """
+        reminders = list(reminders)
+        if not reminders:
+            return
+        timer = None
+        if self.latency is not None and scheduled:
+            timer = FireTimer(self.latency, path or self.path, scheduled)
+        lead = lead_reminder(reminders)
+        with self.lock:
+            for r in reminders:
+                self.active[r.id] = r
+            showing = list(self.active.values())
+            self.batches += 1
+            self.coalesced += len(reminders) - 1
+
+        try:
+            self.post(reminders, showing, lead)
+        except Exception as e:
+            print(f"Alarm notification error: {e}")
+            import traceback
+            traceback.print_exc()
+        if timer is not None:
+            timer.notified()
+        self.vibrate(lead)
+        try:
+            self.alarm_audio.play(sound_source(lead.ringtone, lead.ringtone_uri),
+                                  on_started=timer.sound_started if timer is not None else None)
+        except Exception as e:
+            print(f"Play alarm error: {e}")
+        print(f"Fired {len(reminders)} reminder(s) as one alert")
+
+    def dismiss(self, reminder_id):
+        """Remove one reminder of the batch; True once none are left"""
+        with self.lock:
+            self.active.pop(reminder_id, None)
+            done = not self.active
+        notification_service = self.notification_service()
+        notification_service.cancel(notification_id(reminder_id))
+        if done:
+            notification_service.cancel(SUMMARY_NOTIFICATION_ID)
+            self.silence()
+        return done
+
+    def dismiss_all(self):
+        with self.lock:
+            active, self.active = self.active, {}
+        self.cancel_notifications(active)
+        self.silence()
+
+    def poll_dismissed(self):
+        """Drop the reminders whose notification is gone; silence once all are.
+
+        True while some of the batch is still showing.
+        """
+        with self.lock:
+            if not self.active:
+                return False
+        if java.VERSION.SDK_INT < 23:
+            return True
+        showing = {n.getId() for n in self.notification_service().getActiveNotifications()}
+        with self.lock:
+            for reminder_id in list(self.active):
+                if notification_id(reminder_id) not in showing:
+                    del self.active[reminder_id]
+            if self.active:
+                return True
+        self.silence()
+        return False
+
+    def silence(self):
+        try:
+            self.alarm_audio.stop()
+            self.context.getSystemService(java.Context.VIBRATOR_SERVICE).cancel()
+        except Exception as e:
+            print(f"Silence alarm error: {e}")
+
+    def notification_service(self):
+        return self.context.getSystemService(java.Context.NOTIFICATION_SERVICE)
+
+    def cancel_notifications(self, reminder_ids):
+        if not reminder_ids:
+            return
+        notification_service = self.notification_service()
+        for reminder_id in reminder_ids:
+            notification_service.cancel(notification_id(reminder_id))
+        notification_service.cancel(SUMMARY_NOTIFICATION_ID)
+
+    def post(self, reminders, showing, lead):
+        """One notification per reminder, all in one group. With more than one
+        showing, a summary listing them does the alerting"""
+        notification_service = self.notification_service()
+        content_intent = self.content_intent()
+        grouped = len(showing) > 1
+
+        for r in reminders:
+            builder = self.builder(content_intent)
+            builder.setContentTitle(f"⏰ {r.category}")
+            builder.setContentText(r.text)
+            if r.note:
+                builder.setStyle(
+                    java.NotificationCompat.BigTextStyle()
+                    .bigText(f"{r.text}\n\n📝 {r.note}")
+                )
+            builder.addAction(0, "Dismiss", self.dismiss_intent(r.id))
+            builder.setGroup(GROUP_KEY)
+            if grouped:
+                # Only the summary makes a sound
+                builder.setGroupAlertBehavior(java.NotificationCompat.GROUP_ALERT_SUMMARY)
+            else:
+                self.alert(builder, lead)
+            notification_service.notify(notification_id(r.id), self.build(builder, alerting=not grouped))
+
+        if grouped:
+            style = java.InboxStyle()
+            for r in showing:
+                style.addLine(summary_line(r))
+            builder = self.builder(content_intent)
+            builder.setContentTitle(f"⏰ {len(showing)} reminders")
+            builder.setContentText(", ".join(r.text for r in showing))
+            builder.setStyle(style)
+            builder.setGroup(GROUP_KEY)
+            builder.setGroupSummary(True)
+            builder.setGroupAlertBehavior(java.NotificationCompat.GROUP_ALERT_SUMMARY)
+            self.alert(builder, lead)
+            notification_service.notify(SUMMARY_NOTIFICATION_ID, self.build(builder, alerting=True))
+
+    def builder(self, content_intent):
+        builder = java.NotificationCompat.Builder(self.context, ALARM_CHANNEL_ID)
+        builder.setSmallIcon(self.context.getApplicationInfo().icon)
+        builder.setContentIntent(content_intent)
+        builder.setPriority(java.NotificationCompat.PRIORITY_MAX)
+        builder.setCategory(java.NotificationCompat.CATEGORY_ALARM)
+        builder.setAutoCancel(True)
+        return builder
+
+    def alert(self, builder, lead):
+        builder.setVibrate(VIBRATION_PATTERNS.get(lead.priority, VIBRATION_PATTERNS['Medium']))
+        if sound_source(lead.ringtone, lead.ringtone_uri) is not None:
+            builder.setSound(notification_sound_uri(lead))
+
+    def build(self, builder, alerting):
+        notification = builder.build()
+        if alerting:
+            notification.flags |= notification.FLAG_INSISTENT
+        return notification
+
+    def content_intent(self):
+        intent = java.Intent(self.context.getApplicationContext(), java.PythonActivity)
+        intent.setFlags(java.Intent.FLAG_ACTIVITY_NEW_TASK | java.Intent.FLAG_ACTIVITY_SINGLE_TOP |
+                        java.Intent.FLAG_ACTIVITY_CLEAR_TOP)
+        return java.PendingIntent.getActivity(
+            self.context, 0, intent,
+            java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
+        )
+
+    def dismiss_intent(self, reminder_id):
+        """Broadcast to AlarmBroadcastReceiver.java, which works whichever process is alive"""
+        intent = java.Intent()
+        intent.setClassName(self.context.getPackageName(), RECEIVER_CLASS)
+        intent.setAction(DISMISS_ACTION)
+        intent.putExtra('reminder_id', reminder_id)
+        return java.PendingIntent.getBroadcast(
+            self.context, notification_id(reminder_id), intent,
+            java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
+        )
+
+    def vibrate(self, lead):
+        """One vibration for the whole batch"""
+        try:
+            vibrator = self.context.getSystemService(java.Context.VIBRATOR_SERVICE)
+            pattern = VIBRATION_PATTERNS.get(lead.priority, VIBRATION_PATTERNS['Medium'])
+            repeat = 0 if self.repeat_vibration else -1
+            if java.VERSION.SDK_INT >= 26:
+                vibrator.vibrate(java.VibrationEffect.createWaveform(pattern, repeat))
+            else:
+                vibrator.vibrate(pattern, repeat)
+        except Exception as e:
+            print(f"Vibration error: {e}")
+
+    def stats(self):
+        """Counters for logging"""
+        return {'batches': self.batches, 'coalesced': self.coalesced}
@@ -0,0 +1,112 @@
+"""
+AlarmManager helpers shared by the app and the background service
+Every function takes an Android Context; Java classes come from jni_registry
+"""
+from jni_registry import java
+
+ALARM_ACTION = "com.reminder.ALARM_TRIGGER"
+
+# Request codes of the "next_alarm" strategy slots, far above any reminder id
+NEXT_ALARM_REQUEST_CODE = 900000
+# One-shot snooze alarm of reminder N is registered under SNOOZE_REQUEST_CODE + N
+SNOOZE_REQUEST_CODE = 800000
+
+
+def _pending_broadcast(context, request_code, intent):
+    PendingIntent = java.PendingIntent
+    return PendingIntent.getBroadcast(
+        context,
+        request_code,
+        intent,
+        PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+    )
+
+
+def _alarm_intent(context):
+    Intent = java.Intent
+    intent = Intent()
+    intent.setAction(ALARM_ACTION)
+    intent.setPackage(context.getPackageName())
+    return intent
+
+
+def set_exact_alarm(context, request_code, trigger_ms, extras):
+    """Register (or replace) an exact wake-up alarm that broadcasts ALARM_ACTION"""
+    AlarmManager = java.AlarmManager
+    Context = java.Context
+
+    intent = _alarm_intent(context)
+    for key, value in extras.items():
+        intent.putExtra(key, value)
+    # With occurrence_minute, the exact instant the alarm is due (for latency stats)
+    intent.putExtra('occurrence_offset_ms', trigger_ms % 60000)
+
+    alarm_manager = context.getSystemService(Context.ALARM_SERVICE)
+    alarm_manager.setExactAndAllowWhileIdle(
+        AlarmManager.RTC_WAKEUP,
+        trigger_ms,
+        _pending_broadcast(context, request_code, intent)
+    )
+
+
+def cancel_alarm(context, request_code):
+    """Cancel the alarm registered under a request code"""
+    Context = java.Context
+
+    pending_intent = _pending_broadcast(context, request_code, _alarm_intent(context))
+    alarm_manager = context.getSystemService(Context.ALARM_SERVICE)
+    alarm_manager.cancel(pending_intent)
+    pending_intent.cancel()
+
+
+def snooze_extras(reminder, until_ms):
+    """Intent extras for a snoozed reminder's one-shot alarm"""
+    return {
+        'reminder_id': reminder.id,
+        'reminder_text': reminder.text,
+        'reminder_category': reminder.category,
+        'reminder_note': reminder.note,
+        'occurrence_minute': until_ms // 60000
+    }
+
+
+def set_snooze_alarm(context, reminder_id, until_ms, extras):
+    set_exact_alarm(context, SNOOZE_REQUEST_CODE + reminder_id, until_ms, extras)
+
+
+def cancel_snooze_alarm(context, reminder_id):
+    cancel_alarm(context, SNOOZE_REQUEST_CODE + reminder_id)
+
+
+def slot_extras(occurrence_ms, reminder_ids, reminders_by_id):
+    """Intent extras for a slot firing one or more reminders at the same instant"""
+    reminders = [reminders_by_id[rid] for rid in reminder_ids]
+    first = reminders[0]
+    return {
+        'reminder_id': reminder_ids[0],
+        'reminder_ids': ','.join(map(str, reminder_ids)),
+        'reminder_text': '\n'.join(r.text for r in reminders),
+        'reminder_category': first.category,
+        'reminder_note': first.note if len(reminders) == 1 else '',
+        # Minutes since the epoch fit an int extra
+        'occurrence_minute': occurrence_ms // 60000
+    }
+
+
+def sync_next_alarm_slots(context, window, reminders_by_id, registered):
+    """Keep slot k registered for window[k]; returns the new {slot: (ms, extras)} map.
+
+    window is the output of OccurrenceQueue.window(); slots whose
+    occurrence and extras did not change are left alone.
+    """
+    wanted = {}
+    for slot, (ms, ids) in enumerate(window):
+        wanted[slot] = (ms, slot_extras(ms, ids, reminders_by_id))
+
+    for slot in registered:
+        if slot not in wanted:
+            cancel_alarm(context, NEXT_ALARM_REQUEST_CODE + slot)
+    for slot, (ms, extras) in wanted.items():
+        if registered.get(slot) != (ms, extras):
+            set_exact_alarm(context, NEXT_ALARM_REQUEST_CODE + slot, ms, extras)
+    return wanted
@@ -3,13 +3,13 @@ title = My Reminders
 package.name = myreminders
 package.domain = com.reminder
 source.dir = .
-source.include_exts = py,png,jpg,kv,atlas,json,java
+source.include_exts = py,png,jpg,kv,atlas,json,java,mp3
 android.add_src = java
-source.include_exts = py,png,jpg,kv,atlas,json
+source.include_exts = py,png,jpg,kv,atlas,json,mp3
 source.include_patterns = service/*
 version = 2.6
 
-requirements = python3==3.9.19,kivy==2.3.0,android,pyjnius
+requirements = python3==3.9.19,kivy==2.3.0,android,pyjnius,sqlite3
 
 orientation = portrait
 fullscreen = 0
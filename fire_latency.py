@@ -0,0 +1,222 @@
+"""
+How late alarms fire, per firing path and stage
+Every path that fires an alarm (the app, the service's backup check, the
+service's AlarmManager intent and AlarmBroadcastReceiver.java) adds its samples
+to one small histogram file next to the fired ledger
+"""
+import os
+import math
+import time
+import struct
+
+from locked_file import LockedFile
+from jni_registry import java
+
+LATENCY_FILE_NAME = 'fire_latency.hist'
+
+# Firing paths and what is timed, both measured from the scheduled instant:
+# trigger = the path started firing, notification = posted, sound = playing
+PATHS = ('app', 'service', 'intent', 'receiver')
+STAGES = ('trigger', 'notification', 'sound')
+
+# log2 buckets of milliseconds: 0 is under 1 ms, b is [2^(b-1), 2^b) ms and
+# the last one is open-ended (over ~70 minutes)
+BUCKETS = 24
+
+# Each (path, stage) cell is BUCKETS counts followed by the largest sample in ms
+MAGIC = b'LAT1'
+HEADER = struct.Struct('>4sI')      # magic, samples recorded in total
+CELL = struct.Struct('>%dI' % (BUCKETS + 1))
+FILE_SIZE = HEADER.size + len(PATHS) * len(STAGES) * CELL.size
+
+MAX_COUNT = 0xFFFFFFFF
+
+
+def empty_histogram():
+    return HEADER.pack(MAGIC, 0) + bytes(FILE_SIZE - HEADER.size)
+
+
+def bucket_of(ms):
+    if ms < 1:
+        return 0
+    return min(BUCKETS - 1, int(ms).bit_length())
+
+
+def bucket_limit_ms(bucket):
+    """Upper bound of a bucket (None for the open-ended last one)"""
+    if bucket >= BUCKETS - 1:
+        return None
+    return 1 << bucket
+
+
+def cell_index(path, stage):
+    return PATHS.index(path) * len(STAGES) + STAGES.index(stage)
+
+
+def cell_offset(path, stage):
+    return HEADER.size + cell_index(path, stage) * CELL.size
+
+
+def percentile_bucket(counts, fraction):
+    """Bucket holding the sample at `fraction` (0..1) of the way through"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = max(1, math.ceil(total * fraction))
+    seen = 0
+    for bucket, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return bucket
+    return len(counts) - 1
+
+
+def format_ms(ms):
+    if ms is None:
+        return '-'
+    if ms < 1000:
+        return f"{ms:.0f}ms"
+    if ms < 60000:
+        return f"{ms / 1000:.1f}s"
+    return f"{ms / 60000:.1f}min"
+
+
+def format_report(rows):
+    """Text table of report() rows: percentiles are bucket upper bounds"""
+    if not rows:
+        return "No alarms recorded yet"
+    lines = []
+    for row in rows:
+        p50, p90, p99 = (
+            '>' + format_ms(1 << (BUCKETS - 2)) if limit is None else '<' + format_ms(limit)
+            for limit in (row['p50'], row['p90'], row['p99'])
+        )
+        lines.append(f"{row['path']:<8} {row['stage']:<12} n={row['count']:<5} "
+                     f"p50{p50} p90{p90} p99{p99} max {format_ms(row['max'])}")
+    return '\n'.join(lines)
+
+
+class LatencyHistogram:
+    """Fixed-size (~1.2 KB) histogram file shared by every firing path.
+
+    record() reads the file, adds to the counters and writes it back under
+    the file's lock, so samples from the app, the service and the Java
+    receiver all land in the one file.
+    """
+    def __init__(self, data_dir):
+        self.file = LockedFile(os.path.join(data_dir, LATENCY_FILE_NAME), FILE_SIZE, MAGIC,
+                               empty_histogram)
+
+    def record(self, samples):
+        """Add (path, stage, ms) samples; ms is measured from the scheduled instant"""
+        samples = [(path, stage, max(0, ms)) for path, stage, ms in samples]
+        if not samples:
+            return
+        try:
+            with self.file.locked() as (f, data, _):
+                data = bytearray(data)
+
+                for path, stage, ms in samples:
+                    offset = cell_offset(path, stage)
+                    cell = list(CELL.unpack_from(data, offset))
+                    bucket = bucket_of(ms)
+                    cell[bucket] = min(MAX_COUNT, cell[bucket] + 1)
+                    cell[BUCKETS] = max(cell[BUCKETS], min(MAX_COUNT, int(ms)))
+                    CELL.pack_into(data, offset, *cell)
+                total = HEADER.unpack_from(data)[1]
+                HEADER.pack_into(data, 0, MAGIC, min(MAX_COUNT, total + len(samples)))
+
+                f.seek(0)
+                f.write(data)
+                f.flush()
+        except OSError as e:
+            print(f"Latency histogram error: {e}")
+
+    def read(self):
+        """{(path, stage): (bucket counts, max ms)} for the cells with samples"""
+        data = self.read_file()
+        if data is None:
+            return {}
+        cells = {}
+        for path in PATHS:
+            for stage in STAGES:
+                cell = CELL.unpack_from(data, cell_offset(path, stage))
+                if any(cell[:BUCKETS]):
+                    cells[(path, stage)] = (list(cell[:BUCKETS]), cell[BUCKETS])
+        return cells
+
+    def report(self):
+        """One row per (path, stage) with samples: count, p50/p90/p99 upper bounds, max"""
+        rows = []
+        for (path, stage), (counts, max_ms) in self.read().items():
+            rows.append({
+                'path': path,
+                'stage': stage,
+                'count': sum(counts),
+                'p50': bucket_limit_ms(percentile_bucket(counts, 0.5)),
+                'p90': bucket_limit_ms(percentile_bucket(counts, 0.9)),
+                'p99': bucket_limit_ms(percentile_bucket(counts, 0.99)),
+                'max': max_ms
+            })
+        return rows
+
+    def read_file(self):
+        return self.file.read()
+
+    def reset(self):
+        self.file.remove()
+
+
+class JavaLatencyHistogram(LatencyHistogram):
+    """LatencyHistogram for the app's process on Android, where the file is
+    written and read through AlarmBroadcastReceiver's synchronized methods
+    (see fire_ledger.JavaFiredLedger)"""
+    def __init__(self, context, data_dir):
+        super().__init__(data_dir)
+        self.context = context
+
+    def record(self, samples):
+        samples = [(path, stage, max(0, ms)) for path, stage, ms in samples]
+        if not samples:
+            return
+        try:
+            java.AlarmBroadcastReceiver.recordLatency(
+                self.context,
+                [cell_index(path, stage) for path, stage, _ in samples],
+                [min(MAX_COUNT, int(ms)) for _, _, ms in samples]
+            )
+        except Exception as e:
+            print(f"Latency histogram error: {e}")
+
+    def read_file(self):
+        try:
+            data = java.AlarmBroadcastReceiver.readLatency(self.context)
+        except Exception as e:
+            print(f"Latency histogram error: {e}")
+            return None
+        if data is None:
+            return None
+        # Java bytes are signed
+        return bytes(b & 0xFF for b in data)
+
+
+class FireTimer:
+    """One firing's samples: created when a path starts firing, then told when
+    the notification is up and when the sound starts"""
+    def __init__(self, histogram, path, scheduled):
+        self.histogram = histogram
+        self.path = path
+        # Epoch seconds each fired reminder was due
+        self.scheduled = list(scheduled)
+        self.triggered_at = time.time()
+
+    def samples(self, stage, at):
+        return [(self.path, stage, (at - due) * 1000) for due in self.scheduled]
+
+    def notified(self):
+        """Records the trigger and notification stages together (one file write)"""
+        self.histogram.record(self.samples('trigger', self.triggered_at) +
+                              self.samples('notification', time.time()))
+
+    def sound_started(self):
+        self.histogram.record(self.samples('sound', time.time()))
@@ -0,0 +1,99 @@
+"""
+Fired-occurrence ledger shared by every path that can fire an alarm
+The app, the background service and AlarmBroadcastReceiver.java all claim
+(reminder id, occurrence minute) here before firing; only the first claim wins
+"""
+import os
+import time
+import struct
+
+from reminder_schedule import MINUTES_PER_DAY
+from locked_file import LockedFile
+from jni_registry import java
+
+LEDGER_FILE_NAME = 'fired.ledger'
+
+# Fixed-size ring of the most recent claims: 8 KB on disk whatever happens
+MAGIC = b'FLG1'
+CAPACITY = 1024
+HEADER = struct.Struct('>4sI')      # magic, index of the slot written next
+ENTRY = struct.Struct('>ii')        # reminder id, occurrence minute
+FILE_SIZE = HEADER.size + CAPACITY * ENTRY.size
+
+# Claims this old no longer count, whether or not the ring has overwritten them
+KEEP_MINUTES = MINUTES_PER_DAY
+
+
+def occurrence_minute(when):
+    """Minutes since the epoch of a naive local datetime (same value in every process)"""
+    return int(time.mktime(when.timetuple())) // 60
+
+
+def empty_ledger():
+    return HEADER.pack(MAGIC, 0) + bytes(CAPACITY * ENTRY.size)
+
+
+def find_entry(data, entry):
+    """True if the packed entry is in one of the ring's slots"""
+    pos = data.find(entry, HEADER.size)
+    while pos != -1:
+        if (pos - HEADER.size) % ENTRY.size == 0:
+            return True
+        pos = data.find(entry, pos + 1)
+    return False
+
+
+class FiredLedger:
+    """Ring buffer of the last CAPACITY fired (reminder id, occurrence minute) pairs.
+
+    A claim reads the 8 KB file, looks for the pair and writes one slot plus
+    the head index, all under the file's lock. Nothing is kept in memory
+    between claims, and a restart picks up where the file left off.
+    """
+    def __init__(self, data_dir):
+        self.file = LockedFile(os.path.join(data_dir, LEDGER_FILE_NAME), FILE_SIZE, MAGIC, empty_ledger)
+
+    def claim(self, reminder_id, minute):
+        """True if this caller should fire the occurrence, False if it already fired"""
+        entry = ENTRY.pack(reminder_id, minute)
+        try:
+            with self.file.locked() as (f, data, fresh):
+                oldest = int(time.time()) // 60 - KEEP_MINUTES
+                if minute >= oldest and find_entry(data, entry):
+                    return False
+
+                head = HEADER.unpack_from(data)[1] % CAPACITY
+                if fresh:
+                    f.seek(0)
+                    f.write(data)
+                    f.truncate()
+                f.seek(HEADER.size + head * ENTRY.size)
+                f.write(entry)
+                f.seek(len(MAGIC))
+                f.write(struct.pack('>I', (head + 1) % CAPACITY))
+                f.flush()
+                return True
+        except OSError as e:
+            # Better a duplicate alarm than a missed one
+            print(f"Fired ledger error: {e}")
+            return True
+
+
+class JavaFiredLedger:
+    """FiredLedger for the app's process on Android.
+
+    AlarmBroadcastReceiver runs in that process too, and a lockf() lock
+    doesn't keep it out (see locked_file.py), so claims go through the
+    receiver's synchronized claimOccurrence(), which does the same on disk.
+    """
+    def __init__(self, context):
+        self.context = context
+
+    def claim(self, reminder_id, minute):
+        """True if this caller should fire the occurrence, False if it already fired"""
+        try:
+            return bool(java.AlarmBroadcastReceiver.claimOccurrence(self.context, reminder_id, minute))
+        except Exception as e:
+            # Better a duplicate alarm than a missed one
+            print(f"Fired ledger error: {e}")
+            return True
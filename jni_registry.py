@@ -0,0 +1,64 @@
+"""
+Lazily resolved Java classes shared by the app and both background services
+Each class is looked up with autoclass() once per process and cached after that
+"""
+
+# Short name -> fully qualified Java class name
+CLASS_NAMES = {
+    'PythonActivity': 'org.kivy.android.PythonActivity',
+    'PythonService': 'org.kivy.android.PythonService',
+    'Context': 'android.content.Context',
+    'Intent': 'android.content.Intent',
+    'Uri': 'android.net.Uri',
+    'Build': 'android.os.Build',
+    'VERSION': 'android.os.Build$VERSION',
+    'PowerManager': 'android.os.PowerManager',
+    'Vibrator': 'android.os.Vibrator',
+    'VibrationEffect': 'android.os.VibrationEffect',
+    'AlarmManager': 'android.app.AlarmManager',
+    'PendingIntent': 'android.app.PendingIntent',
+    'NotificationManager': 'android.app.NotificationManager',
+    'NotificationChannel': 'android.app.NotificationChannel',
+    'NotificationCompat': 'androidx.core.app.NotificationCompat',
+    'InboxStyle': 'androidx.core.app.NotificationCompat$InboxStyle',
+    'MediaPlayer': 'android.media.MediaPlayer',
+    'AudioManager': 'android.media.AudioManager',
+    'AudioAttributes': 'android.media.AudioAttributes',
+    'RingtoneManager': 'android.media.RingtoneManager',
+    'Settings': 'android.provider.Settings',
+    'AlarmBroadcastReceiver': 'com.reminder.myreminders.AlarmBroadcastReceiver',
+}
+
+
+class JavaClasses:
+    """Cached autoclass() handles: java.Intent, or java.get('full.class.Name')"""
+    def __init__(self, names):
+        self._names = names
+        self._classes = {}
+        self.resolved = 0
+        self.saved = 0
+
+    def get(self, name):
+        class_name = self._names.get(name, name)
+        cls = self._classes.get(class_name)
+        if cls is None:
+            # jnius only exists on Android, so import it on first use
+            from jnius import autoclass
+            cls = autoclass(class_name)
+            self._classes[class_name] = cls
+            self.resolved += 1
+        else:
+            self.saved += 1
+        return cls
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get(name)
+
+    def stats(self):
+        """Lookup counters, for logging"""
+        return {'resolved': self.resolved, 'saved': self.saved}
+
+
+java = JavaClasses(CLASS_NAMES)
@@ -0,0 +1,67 @@
+"""
+Small fixed-size files shared by every process that fires alarms
+fire_ledger.py and fire_latency.py keep their state in one each. Updates run
+under an exclusive lockf() lock, the same POSIX record lock Java's
+FileChannel.lock() takes, so other processes (AlarmBroadcastReceiver.java in
+the app's) are kept out. Those locks belong to the whole process, though, and
+closing any descriptor of the file drops them: in the app's own process the
+files are only touched through the receiver's synchronized Java methods
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No POSIX locks (desktop Windows); only one process fires there anyway
+    fcntl = None
+
+
+class LockedFile:
+    """A fixed-size binary file that starts with a magic number.
+
+    Layouts are big-endian throughout so Java's RandomAccessFile/ByteBuffer
+    read them as is. A missing file, or one in an older format, reads as
+    `empty()`.
+    """
+    def __init__(self, path, size, magic, empty):
+        self.path = path
+        self.size = size
+        self.magic = magic
+        self.empty = empty
+        # lockf() locks belong to the process, so threads need their own lock
+        self.lock = threading.Lock()
+
+    def valid(self, data):
+        return len(data) == self.size and data[:len(self.magic)] == self.magic
+
+    @contextmanager
+    def locked(self):
+        """Yields (file, contents, fresh) with the file locked; fresh means the
+        contents are empty() and nothing valid is on disk yet"""
+        with self.lock, os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b') as f:
+            if fcntl:
+                fcntl.lockf(f, fcntl.LOCK_EX)
+            data = f.read(self.size)
+            fresh = not self.valid(data)
+            if fresh:
+                data = self.empty()
+            # Closing the file releases the lock
+            yield f, data, fresh
+
+    def read(self):
+        """Contents without taking the lock (for reports); None if there is nothing valid"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read(self.size)
+        except OSError:
+            return None
+        return data if self.valid(data) else None
+
+    def remove(self):
+        with self.lock:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
@@ -1,5 +1,4 @@
 import os
-import json
 import datetime
 from kivy.app import App
 from kivy.clock import Clock
@@ -11,6 +10,9 @@ from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.uix.spinner import Spinner
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.checkbox import CheckBox
 from kivy.uix.slider import Slider
 from kivy.uix.togglebutton import ToggleButton
@@ -18,6 +20,24 @@ from kivy.utils import platform
 from kivy.graphics import Color, RoundedRectangle
 from kivy.metrics import dp
 from kivy.core.window import Window
+from kivy.factory import Factory
+
+from reminder_store import DATA_FILE_NAME, ReminderIndex, open_store
+from reminder_model import Reminder, decode_reminders
+from reminder_schedule import (
+    ALARM_STRATEGY, NEXT_ALARM_WINDOW, DueIndex, OccurrenceQueue, epoch_ms, mask_to_days,
+    next_occurrence_ms, next_occurrences, seconds_until
+)
+import alarm_manager
+from jni_registry import java
+from task_worker import TaskWorker
+from reminder_ipc import ChangeNotifier, change_ops
+from fire_ledger import FiredLedger, JavaFiredLedger, occurrence_minute
+from alarm_audio import PREWARM_AHEAD_SECONDS, AlarmAudio, sound_source
+from ringtone_catalogue import RingtoneCatalogue
+from notification_channels import ensure_channels
+from alarm_dispatch import AlarmDispatcher, lead_reminder
+from fire_latency import JavaLatencyHistogram, LatencyHistogram, format_ms, format_report
 
 print("Enhanced Reminder App starting...")
 
@@ -27,7 +47,6 @@ if platform == 'android':
     print("Requesting Android permissions...")
     try:
         from android.permissions import request_permissions, Permission, check_permission
-        from jnius import autoclass
         
         permissions = [
             Permission.VIBRATE,
@@ -47,17 +66,17 @@ if platform == 'android':
         
         def request_special_permissions():
             try:
-                PythonActivity = autoclass('org.kivy.android.PythonActivity')
-                Intent = autoclass('android.content.Intent')
-                Settings = autoclass('android.provider.Settings')
-                Uri = autoclass('android.net.Uri')
-                Build = autoclass('android.os.Build')
+                PythonActivity = java.PythonActivity
+                Intent = java.Intent
+                Settings = java.Settings
+                Uri = java.Uri
+                Build = java.Build
                 
                 activity = PythonActivity.mActivity
                 
                 if Build.VERSION.SDK_INT >= 31:
-                    AlarmManager = autoclass('android.app.AlarmManager')
-                    Context = autoclass('android.content.Context')
+                    AlarmManager = java.AlarmManager
+                    Context = java.Context
                     alarm_manager = activity.getSystemService(Context.ALARM_SERVICE)
                     
                     if not alarm_manager.canScheduleExactAlarms():
@@ -65,8 +84,8 @@ if platform == 'android':
                         intent = Intent(Settings.ACTION_REQUEST_SCHEDULE_EXACT_ALARM)
                         activity.startActivity(intent)
                 
-                PowerManager = autoclass('android.os.PowerManager')
-                Context = autoclass('android.content.Context')
+                PowerManager = java.PowerManager
+                Context = java.Context
                 power_manager = activity.getSystemService(Context.POWER_SERVICE)
                 package_name = activity.getPackageName()
                 
@@ -85,76 +104,38 @@ if platform == 'android':
         print(f"Permission error: {e}")
 
 
-def schedule_alarm_with_manager(reminder_id, hour, minute, days, reminder_data):
-    """Schedule alarm using AlarmManager"""
+def schedule_alarm_with_manager(reminder_id, hour, minute, days_mask, reminder_data, next_alarm_time=None):
+    """Schedule alarm using AlarmManager
+
+    next_alarm_time (epoch ms) can be passed in when it was already computed
+    for a whole batch with next_occurrences().
+    """
     if platform == 'android':
         try:
-            from jnius import autoclass
-            
-            PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            Intent = autoclass('android.content.Intent')
-            PendingIntent = autoclass('android.app.PendingIntent')
-            AlarmManager = autoclass('android.app.AlarmManager')
-            Context = autoclass('android.content.Context')
-            Calendar = autoclass('java.util.Calendar')
+            PythonActivity = java.PythonActivity
             
             activity = PythonActivity.mActivity
             context = activity.getApplicationContext()
-            alarm_manager = context.getSystemService(Context.ALARM_SERVICE)
             
             # Find next occurrence
-            now = Calendar.getInstance()
-            current_time = now.getTimeInMillis()
-            
-            next_alarm_time = None
-            
-            for day in days:
-                calendar = Calendar.getInstance()
-                calendar.set(Calendar.HOUR_OF_DAY, hour)
-                calendar.set(Calendar.MINUTE, minute)
-                calendar.set(Calendar.SECOND, 0)
-                calendar.set(Calendar.MILLISECOND, 0)
-                
-                # Convert Python day (0=Monday) to Java day (1=Sunday, 2=Monday, etc.)
-                java_day = ((day + 1) % 7) + 1
-                calendar.set(Calendar.DAY_OF_WEEK, java_day)
-                
-                # If the time has passed today, schedule for next week
-                if calendar.getTimeInMillis() <= current_time:
-                    calendar.add(Calendar.WEEK_OF_YEAR, 1)
-                
-                if next_alarm_time is None or calendar.getTimeInMillis() < next_alarm_time:
-                    next_alarm_time = calendar.getTimeInMillis()
+            if next_alarm_time is None:
+                next_alarm_time = next_occurrence_ms(hour * 60 + minute, days_mask, datetime.datetime.now())
             
             if next_alarm_time:
-                # Create intent for service
-                # Create intent for BroadcastReceiver
-                intent = Intent()
-                intent.setAction("com.reminder.ALARM_TRIGGER")
-                intent.setPackage(context.getPackageName())
-                intent.putExtra("reminder_id", reminder_id)
-                intent.putExtra("reminder_text", reminder_data.get('text', ''))
-                intent.putExtra("reminder_category", reminder_data.get('category', 'Personal'))
-                intent.putExtra("reminder_note", reminder_data.get('note', ''))
-                intent.putExtra("alarm_hour", hour)
-                intent.putExtra("alarm_minute", minute)
-                intent.putExtra("alarm_days", ','.join(map(str, days)))
-                
-                pending_intent = PendingIntent.getBroadcast(
-                    context,
-                    reminder_id,
-                    intent,
-                    PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
-                )
-                
-                # Schedule exact alarm
-                alarm_manager.setExactAndAllowWhileIdle(
-                    AlarmManager.RTC_WAKEUP,
-                    next_alarm_time,
-                    pending_intent
-                )
+                # Exact alarm delivered to AlarmBroadcastReceiver
+                alarm_manager.set_exact_alarm(context, reminder_id, next_alarm_time, {
+                    'reminder_id': reminder_id,
+                    'reminder_text': reminder_data.get('text', ''),
+                    'reminder_category': reminder_data.get('category', 'Personal'),
+                    'reminder_note': reminder_data.get('note', ''),
+                    'alarm_hour': hour,
+                    'alarm_minute': minute,
+                    'alarm_days_mask': days_mask,
+                    # Key of this occurrence in the fired ledger
+                    'occurrence_minute': next_alarm_time // 60000
+                })
                 
-                print(f"✅ AlarmManager: Scheduled reminder {reminder_id} at {hour}:{minute:02d} for days {days}")
+                print(f"✅ AlarmManager: Scheduled reminder {reminder_id} at {hour}:{minute:02d} for days {mask_to_days(days_mask)}")
                 
         except Exception as e:
             print(f"❌ AlarmManager schedule error: {e}")
@@ -166,32 +147,10 @@ def cancel_alarm_with_manager(reminder_id, days):
     """Cancel alarm using AlarmManager"""
     if platform == 'android':
         try:
-            from jnius import autoclass
-            
-            PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            Intent = autoclass('android.content.Intent')
-            PendingIntent = autoclass('android.app.PendingIntent')
-            AlarmManager = autoclass('android.app.AlarmManager')
-            Context = autoclass('android.content.Context')
-            
-            activity = PythonActivity.mActivity
-            context = activity.getApplicationContext()
-            alarm_manager = context.getSystemService(Context.ALARM_SERVICE)
-            
-            # Cancel the pending intent
-            intent = Intent()
-            intent.setAction("com.reminder.ALARM_TRIGGER")
-            intent.setPackage(context.getPackageName())
-
-            pending_intent = PendingIntent.getBroadcast(
-                context,
-                reminder_id,
-                intent,
-                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
-            )
+            PythonActivity = java.PythonActivity
+            context = PythonActivity.mActivity.getApplicationContext()
             
-            alarm_manager.cancel(pending_intent)
-            pending_intent.cancel()
+            alarm_manager.cancel_alarm(context, reminder_id)
             
             print(f"✅ AlarmManager: Cancelled reminder {reminder_id}")
             
@@ -199,44 +158,174 @@ def cancel_alarm_with_manager(reminder_id, days):
             print(f"❌ AlarmManager cancel error: {e}")
 
 
-def create_notification_channel():
-    """Create notification channel for Android 8.0+"""
+class AlarmScheduler:
+    """Keeps AlarmManager in sync with the reminder list, touching only changed alarms"""
+    def __init__(self, strategy=ALARM_STRATEGY):
+        self.strategy = strategy
+        # reminder id (= request code) -> snapshot of what was last registered
+        # (None = nothing known yet)
+        self.scheduled = None
+        # 'next_alarm' strategy: upcoming occurrences and the registered slots
+        self.queue = OccurrenceQueue()
+        self.reminders_by_id = {}
+        self.slots = None
+        # reminder id -> (epoch ms, extras) of its registered one-shot snooze alarm
+        self.snoozes = {}
+
+    @staticmethod
+    def snapshot(reminder, next_ms):
+        """Everything that ends up in the AlarmManager registration, including
+        when it fires: once that has passed the alarm counts as changed"""
+        return (
+            reminder.hour,
+            reminder.minute,
+            reminder.days_mask,
+            reminder.text,
+            reminder.category,
+            reminder.note,
+            next_ms
+        )
+
+    def sync(self, reminders):
+        """Schedule new/changed alarms and cancel the ones that went away"""
+        self.sync_snoozes(reminders)
+        if self.strategy == 'next_alarm':
+            self.reminders_by_id = {r.id: r for r in reminders}
+            self.queue.rebuild(
+                ((r.id, r.minute_of_day, r.days_mask) for r in reminders if r.enabled),
+                datetime.datetime.now()
+            )
+            self.sync_slots()
+            return
+        
+        # Next fire time of every enabled reminder in one pass
+        enabled = [r for r in reminders if r.enabled]
+        fire_times = next_occurrences(
+            ((r.id, r.minute_of_day, r.days_mask) for r in enabled),
+            datetime.datetime.now()
+        )
+        wanted = {r.id: self.snapshot(r, fire_times.get(r.id)) for r in enabled}
+        disabled = [r.id for r in reminders if not r.enabled]
+
+        if self.scheduled is None:
+            # First sync in this process: the system state is unknown, so make
+            # sure disabled reminders (and 'next_alarm' slots) are not left
+            # registered from a previous run
+            previous = {}
+            stale = disabled + [alarm_manager.NEXT_ALARM_REQUEST_CODE + slot
+                                for slot in range(NEXT_ALARM_WINDOW)]
+        else:
+            previous = self.scheduled
+            stale = [code for code in previous if code not in wanted]
+
+        for code in stale:
+            cancel_alarm_with_manager(code, [])
+
+        changed = {code: snap for code, snap in wanted.items() if previous.get(code) != snap}
+        self.register(changed)
+
+        self.scheduled = wanted
+        print(f"AlarmScheduler: {len(changed)} scheduled, {len(stale)} cancelled, "
+              f"{len(wanted) - len(changed)} unchanged")
+
+    @staticmethod
+    def register(snapshots):
+        for code, snap in snapshots.items():
+            hour, minute, days_mask, text, category, note, next_ms = snap
+            schedule_alarm_with_manager(code, hour, minute, days_mask, {
+                'text': text,
+                'category': category,
+                'note': note
+            }, next_ms)
+
+    def advance(self):
+        """After a fire: arm the next occurrence of whatever has fired"""
+        now = datetime.datetime.now()
+        if self.strategy == 'next_alarm':
+            if self.queue.advance(now):
+                self.sync_slots()
+            return
+        if not self.scheduled:
+            return
+        
+        now_ms = epoch_ms(now)
+        passed = {code: snap for code, snap in self.scheduled.items()
+                  if snap[-1] is not None and snap[-1] <= now_ms}
+        if not passed:
+            return
+        fire_times = next_occurrences(
+            ((code, snap[0] * 60 + snap[1], snap[2]) for code, snap in passed.items()),
+            now
+        )
+        rearmed = {code: snap[:-1] + (fire_times.get(code),) for code, snap in passed.items()}
+        self.register(rearmed)
+        self.scheduled.update(rearmed)
+        print(f"AlarmScheduler: {len(rearmed)} re-armed for their next occurrence")
+
+    def sync_slots(self):
+        """Register only the NEXT_ALARM_WINDOW earliest occurrences"""
+        if platform != 'android':
+            return
+        try:
+            PythonActivity = java.PythonActivity
+            context = PythonActivity.mActivity.getApplicationContext()
+            
+            registered = self.slots
+            if registered is None:
+                # Per-reminder alarms may be left over from the other strategy
+                for reminder_id in self.reminders_by_id:
+                    alarm_manager.cancel_alarm(context, reminder_id)
+                registered = {}
+            
+            window = self.queue.window(NEXT_ALARM_WINDOW)
+            self.slots = alarm_manager.sync_next_alarm_slots(
+                context, window, self.reminders_by_id, registered
+            )
+            if window:
+                print(f"AlarmScheduler: next alarm slot armed for reminders {window[0][1]}")
+        except Exception as e:
+            print(f"❌ AlarmManager slot error: {e}")
+
+    def sync_snoozes(self, reminders):
+        """One-shot exact alarms for snoozed reminders (either strategy)"""
+        if platform != 'android':
+            return
+        try:
+            PythonActivity = java.PythonActivity
+            context = PythonActivity.mActivity.getApplicationContext()
+            
+            now_ms = epoch_ms(datetime.datetime.now())
+            wanted = {}
+            for r in reminders:
+                if r.enabled and r.snooze_until:
+                    until_ms = epoch_ms(r.snooze_until)
+                    # One that already ran out has fired (or the app fires it now)
+                    if until_ms > now_ms:
+                        wanted[r.id] = (until_ms, alarm_manager.snooze_extras(r, until_ms))
+            
+            for reminder_id in self.snoozes:
+                if reminder_id not in wanted:
+                    alarm_manager.cancel_snooze_alarm(context, reminder_id)
+            for reminder_id, (until_ms, extras) in wanted.items():
+                if self.snoozes.get(reminder_id) != (until_ms, extras):
+                    alarm_manager.set_snooze_alarm(context, reminder_id, until_ms, extras)
+                    print(f"✅ AlarmManager: Snooze alarm for reminder {reminder_id}")
+            self.snoozes = wanted
+        except Exception as e:
+            print(f"❌ AlarmManager snooze error: {e}")
+
+    def reset(self):
+        """Forget the snapshot so the next sync re-registers everything"""
+        self.scheduled = None
+        self.slots = None
+        self.snoozes = {}
+
+
+def create_notification_channels(data_dir):
+    """Create the notification channels (Android 8.0+) unless this version already did"""
     if platform == 'android':
         try:
-            from jnius import autoclass
-            PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            Context = autoclass('android.content.Context')
-            NotificationManager = autoclass('android.app.NotificationManager')
-            NotificationChannel = autoclass('android.app.NotificationChannel')
-            AudioAttributes = autoclass('android.media.AudioAttributes')
-            RingtoneManager = autoclass('android.media.RingtoneManager')
-            Build = autoclass('android.os.Build')
-            
-            activity = PythonActivity.mActivity
-            notification_service = activity.getSystemService(Context.NOTIFICATION_SERVICE)
-            
-            # Only create channel on Android 8.0+
-            if Build.VERSION.SDK_INT >= 26:
-                channel_id = "reminder_channel"
-                channel_name = "Reminder Notifications"
-                importance = NotificationManager.IMPORTANCE_HIGH
-                
-                channel = NotificationChannel(channel_id, channel_name, importance)
-                channel.setDescription("Notifications for reminders")
-                channel.enableVibration(True)
-                channel.setVibrationPattern([0, 500, 200, 500])
-                channel.setLockscreenVisibility(1)
-                channel.setBypassDnd(True)
-                
-                default_sound_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-                audio_attributes = AudioAttributes.Builder() \
-                    .setContentType(AudioAttributes.CONTENT_TYPE_SONIFICATION) \
-                    .setUsage(AudioAttributes.USAGE_ALARM) \
-                    .build()
-                channel.setSound(default_sound_uri, audio_attributes)
-                
-                notification_service.createNotificationChannel(channel)
-                print("✅ Notification channel created with alarm sound")
+            ensure_channels(java.PythonActivity.mActivity, data_dir)
         except Exception as e:
             print(f"❌ Channel creation error: {e}")
             import traceback
@@ -247,12 +336,11 @@ def start_background_service():
     """Start the background service for reminders"""
     if platform == 'android':
         try:
-            from jnius import autoclass
-            PythonService = autoclass('org.kivy.android.PythonService')
-            PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            Intent = autoclass('android.content.Intent')
-            Build = autoclass('android.os.Build')
-            Context = autoclass('android.content.Context')
+            PythonService = java.PythonService
+            PythonActivity = java.PythonActivity
+            Intent = java.Intent
+            Build = java.Build
+            Context = java.Context
             
             activity = PythonActivity.mActivity
             context = activity.getApplicationContext()
@@ -273,6 +361,39 @@ def start_background_service():
             traceback.print_exc()
 
 
+CATEGORY_COLORS = {
+    'Work': (0.95, 0.5, 0.2, 1),
+    'Personal': (0.3, 0.65, 0.95, 1),
+    'Health': (0.2, 0.8, 0.5, 1),
+    'Shopping': (0.85, 0.35, 0.75, 1),
+    'Other': (0.6, 0.6, 0.65, 1)
+}
+
+DAY_LETTERS = {0: 'M', 1: 'T', 2: 'W', 3: 'T', 4: 'F', 5: 'S', 6: 'S'}
+
+# Edits within this window are written (and synced to AlarmManager) together
+SAVE_DEBOUNCE_SECONDS = 0.4
+
+# Longest wait between reminder checks, so a wall clock or time zone change
+# made while the app is open is noticed (same idea as the service's MAX_IDLE_SECONDS)
+MAX_CHECK_DELAY_SECONDS = 300
+
+
+def days_label_text(days_mask):
+    """Short label for a weekday bitmask"""
+    if days_mask == 0b1111111:
+        return "Every day"
+    elif days_mask == 0b0011111:
+        return "Weekdays"
+    elif days_mask == 0b1100000:
+        return "Weekend"
+    return " ".join([DAY_LETTERS[d] for d in mask_to_days(days_mask)])
+
+
+# Every possible label, indexed by mask, so cards never build one
+DAYS_LABELS = tuple(days_label_text(mask) for mask in range(128))
+
+
 class ModernCard(BoxLayout):
     """Enhanced card with gradient-like effect"""
     def __init__(self, bg_color=(1, 1, 1, 1), accent_color=(0.3, 0.6, 0.95, 1), **kwargs):
@@ -284,10 +405,10 @@ class ModernCard(BoxLayout):
             Color(0.5, 0.5, 0.5, 0.15)
             self.shadow = RoundedRectangle(radius=[dp(18)])
             
-            Color(*accent_color)
+            self.accent_color_instr = Color(*accent_color)
             self.accent_line = RoundedRectangle(radius=[dp(18), 0, 0, dp(18)])
             
-            Color(*bg_color)
+            self.bg_color_instr = Color(*bg_color)
             self.bg_rect = RoundedRectangle(radius=[dp(18)])
         
         self.bind(pos=self.update_graphics, size=self.update_graphics)
@@ -301,149 +422,128 @@ class ModernCard(BoxLayout):
         
         self.bg_rect.pos = (self.pos[0] + dp(5), self.pos[1])
         self.bg_rect.size = (self.size[0] - dp(5), self.size[1])
+    
+    def set_colors(self, bg_color, accent_color):
+        """Recolor the card without rebuilding its canvas"""
+        self.bg_color = bg_color
+        self.accent_color = accent_color
+        self.bg_color_instr.rgba = bg_color
+        self.accent_color_instr.rgba = accent_color
 
 
 class CategoryChip(Button):
     """Small chip for categories"""
-    def __init__(self, text, color=(0.3, 0.6, 0.95, 1), **kwargs):
+    def __init__(self, text='', color=(0.3, 0.6, 0.95, 1), **kwargs):
         super().__init__(**kwargs)
         self.text = text
         self.size_hint = (None, None)
         self.size = (dp(80), dp(28))
         self.background_normal = ''
-        self.background_color = (*color[:3], 0.15)
-        self.color = color
         self.font_size = '12sp'
         self.bold = True
         
         with self.canvas.before:
-            Color(*color[:3], 0.15)
+            self.bg_color_instr = Color(*color[:3], 0.15)
             self.bg = RoundedRectangle(radius=[dp(14)])
         
+        self.set_color(color)
         self.bind(pos=self.update_bg, size=self.update_bg)
     
     def update_bg(self, *args):
         self.bg.pos = self.pos
         self.bg.size = self.size
+    
+    def set_color(self, color):
+        self.background_color = (*color[:3], 0.15)
+        self.color = color
+        self.bg_color_instr.rgba = (*color[:3], 0.15)
 
 
-class ReminderCard(ModernCard):
-    def __init__(self, reminder, index, callbacks, **kwargs):
-        category = reminder.get('category', 'Personal')
-        category_colors = {
-            'Work': (0.95, 0.5, 0.2, 1),
-            'Personal': (0.3, 0.65, 0.95, 1),
-            'Health': (0.2, 0.8, 0.5, 1),
-            'Shopping': (0.85, 0.35, 0.75, 1),
-            'Other': (0.6, 0.6, 0.65, 1)
-        }
-        accent = category_colors.get(category, (0.3, 0.6, 0.95, 1))
-        
-        if not reminder.get('enabled', True):
-            bg_color = (0.96, 0.96, 0.97, 1)
-            accent = (0.7, 0.7, 0.72, 1)
-        else:
-            bg_color = (1, 1, 1, 1)
-        
-        super().__init__(bg_color=bg_color, accent_color=accent, **kwargs)
+class ReminderCard(RecycleDataViewBehavior, ModernCard):
+    """Reminder row of the recycled list.
+
+    The widget tree is built once; refresh_view_attrs rebinds it to
+    whichever reminder scrolls into its slot.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.reminder_id = None
+        self.callbacks = {}
         self.orientation = 'vertical'
         self.size_hint_y = None
         self.height = dp(160)
         self.padding = [dp(20), dp(16), dp(16), dp(16)]
         self.spacing = dp(10)
         
-        header_row = BoxLayout(size_hint_y=0.25, spacing=dp(10))
+        self.header_row = BoxLayout(size_hint_y=0.25, spacing=dp(10))
         
-        category_chip = CategoryChip(text=category, color=accent)
-        header_row.add_widget(category_chip)
-        header_row.add_widget(Label(size_hint_x=1))
+        self.category_chip = CategoryChip()
+        self.header_row.add_widget(self.category_chip)
+        self.header_row.add_widget(Label(size_hint_x=1))
         
-        time_label = Label(
-            text=reminder['time'].strftime('%I:%M %p'),
+        self.time_label = Label(
             font_size='22sp',
             bold=True,
             size_hint_x=None,
             width=dp(110),
-            halign='right',
-            color=accent if reminder.get('enabled') else (0.65, 0.65, 0.65, 1)
+            halign='right'
         )
-        time_label.bind(size=time_label.setter('text_size'))
-        header_row.add_widget(time_label)
+        self.time_label.bind(size=self.time_label.setter('text_size'))
+        self.header_row.add_widget(self.time_label)
         
-        priority = reminder.get('priority', 'Medium')
-        if priority == 'High':
-            priority_indicator = Label(
-                text="!!!",
-                font_size='18sp',
-                bold=True,
-                color=(0.95, 0.3, 0.3, 1),
-                size_hint_x=None,
-                width=dp(30)
-            )
-            header_row.add_widget(priority_indicator)
+        # Only attached to header_row for High priority reminders
+        self.priority_indicator = Label(
+            text="!!!",
+            font_size='18sp',
+            bold=True,
+            color=(0.95, 0.3, 0.3, 1),
+            size_hint_x=None,
+            width=dp(30)
+        )
         
-        self.add_widget(header_row)
+        self.add_widget(self.header_row)
         
-        text_label = Label(
-            text=reminder['text'],
+        self.text_label = Label(
             halign='left',
             valign='top',
             font_size='16sp',
-            color=(0.2, 0.2, 0.25, 1) if reminder.get('enabled') else (0.6, 0.6, 0.6, 1),
             size_hint_y=0.3,
             text_size=(None, None)
         )
-        text_label.bind(size=lambda *x: setattr(text_label, 'text_size', (text_label.width, None)))
-        self.add_widget(text_label)
+        self.text_label.bind(size=lambda *x: setattr(self.text_label, 'text_size', (self.text_label.width, None)))
+        self.add_widget(self.text_label)
         
-        info_row = BoxLayout(size_hint_y=0.2, spacing=dp(12))
-        
-        days_map = {0: 'M', 1: 'T', 2: 'W', 3: 'T', 4: 'F', 5: 'S', 6: 'S'}
-        selected_days = reminder.get('days', list(range(7)))
-        
-        if len(selected_days) == 7:
-            days_text = "Every day"
-        elif len(selected_days) == 5 and selected_days == [0, 1, 2, 3, 4]:
-            days_text = "Weekdays"
-        elif len(selected_days) == 2 and selected_days == [5, 6]:
-            days_text = "Weekend"
-        else:
-            days_text = " ".join([days_map[d] for d in sorted(selected_days)])
+        self.info_row = BoxLayout(size_hint_y=0.2, spacing=dp(12))
         
         repeat_icon = Label(text="🔁", font_size='16sp', size_hint_x=None, width=dp(25))
-        info_row.add_widget(repeat_icon)
+        self.info_row.add_widget(repeat_icon)
         
-        days_label = Label(
-            text=days_text,
+        self.days_label = Label(
             halign='left',
             font_size='13sp',
             color=(0.45, 0.5, 0.6, 1),
             size_hint_x=0.5
         )
-        days_label.bind(size=days_label.setter('text_size'))
-        info_row.add_widget(days_label)
+        self.days_label.bind(size=self.days_label.setter('text_size'))
+        self.info_row.add_widget(self.days_label)
         
-        if reminder.get('note'):
-            note_icon = Label(text="📝", font_size='14sp', size_hint_x=None, width=dp(25))
-            info_row.add_widget(note_icon)
+        # Only attached to info_row when the reminder has a note
+        self.note_icon = Label(text="📝", font_size='14sp', size_hint_x=None, width=dp(25))
         
-        info_row.add_widget(Label(size_hint_x=1))
-        self.add_widget(info_row)
+        self.info_row.add_widget(Label(size_hint_x=1))
+        self.add_widget(self.info_row)
         
         btn_row = BoxLayout(size_hint_y=0.25, spacing=dp(8))
         
-        toggle_btn = ToggleButton(
-            state='down' if reminder.get('enabled') else 'normal',
+        self.toggle_btn = ToggleButton(
             size_hint_x=0.3,
             background_normal='',
             background_down='',
-            background_color=(0.2, 0.75, 0.5, 1) if reminder.get('enabled') else (0.7, 0.7, 0.72, 1),
             color=(1, 1, 1, 1),
             font_size='12sp',
             bold=True
         )
-        toggle_btn.text = "ON" if reminder.get('enabled') else "OFF"
-        toggle_btn.bind(on_press=lambda x: callbacks['toggle'](index))
+        self.toggle_btn.bind(on_press=lambda x: self.callbacks['toggle'](self.reminder_id))
         
         edit_btn = Button(
             text="✏️ Edit",
@@ -454,7 +554,7 @@ class ReminderCard(ModernCard):
             bold=True,
             size_hint_x=0.4
         )
-        edit_btn.bind(on_press=lambda x: callbacks['edit'](index))
+        edit_btn.bind(on_press=lambda x: self.callbacks['edit'](self.reminder_id))
         
         del_btn = Button(
             text="🗑️",
@@ -464,28 +564,155 @@ class ReminderCard(ModernCard):
             font_size='16sp',
             size_hint_x=0.3
         )
-        del_btn.bind(on_press=lambda x: callbacks['delete'](index))
+        del_btn.bind(on_press=lambda x: self.callbacks['delete'](self.reminder_id))
         
-        btn_row.add_widget(toggle_btn)
+        btn_row.add_widget(self.toggle_btn)
         btn_row.add_widget(edit_btn)
         btn_row.add_widget(del_btn)
         
         self.add_widget(btn_row)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        reminder = data['reminder']
+        self.reminder_id = data['reminder_id']
+        self.callbacks = rv.callbacks
+        
+        enabled = reminder.enabled
+        category = reminder.category
+        accent = CATEGORY_COLORS.get(category, (0.3, 0.6, 0.95, 1))
+        
+        if not enabled:
+            bg_color = (0.96, 0.96, 0.97, 1)
+            accent = (0.7, 0.7, 0.72, 1)
+        else:
+            bg_color = (1, 1, 1, 1)
+        self.set_colors(bg_color, accent)
+        
+        self.category_chip.text = category
+        self.category_chip.set_color(accent)
+        
+        self.time_label.text = reminder.time.strftime('%I:%M %p')
+        self.time_label.color = accent if enabled else (0.65, 0.65, 0.65, 1)
+        
+        high_priority = reminder.priority == 'High'
+        if high_priority and self.priority_indicator.parent is None:
+            self.header_row.add_widget(self.priority_indicator)
+        elif not high_priority and self.priority_indicator.parent is not None:
+            self.header_row.remove_widget(self.priority_indicator)
+        
+        self.text_label.text = reminder.text
+        self.text_label.color = (0.2, 0.2, 0.25, 1) if enabled else (0.6, 0.6, 0.6, 1)
+        
+        self.days_label.text = DAYS_LABELS[reminder.days_mask]
+        
+        has_note = bool(reminder.note)
+        if has_note and self.note_icon.parent is None:
+            # Keep it in front of the trailing spacer
+            self.info_row.add_widget(self.note_icon, index=1)
+        elif not has_note and self.note_icon.parent is not None:
+            self.info_row.remove_widget(self.note_icon)
+        
+        self.toggle_btn.state = 'down' if enabled else 'normal'
+        self.toggle_btn.background_color = (0.2, 0.75, 0.5, 1) if enabled else (0.7, 0.7, 0.72, 1)
+        self.toggle_btn.text = "ON" if enabled else "OFF"
+
+
+class CategoryHeader(RecycleDataViewBehavior, Label):
+    """Category group title of the recycled list"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.size_hint = (1, None)
+        self.height = dp(35)
+        self.font_size = '15sp'
+        self.bold = True
+        self.halign = 'left'
+        self.color = (0.3, 0.4, 0.6, 1)
+        self.padding = [dp(8), 0]
+        self.bind(size=self.setter('text_size'))
+
+
+class EmptyStateCard(RecycleDataViewBehavior, ModernCard):
+    """Placeholder shown when the (filtered) list is empty"""
+    def __init__(self, **kwargs):
+        super().__init__(bg_color=(0.97, 0.98, 1, 1), accent_color=(0.3, 0.6, 0.95, 1), **kwargs)
+        self.size_hint_y = None
+        self.height = dp(180)
+        self.padding = dp(24)
+        
+        empty_box = BoxLayout(orientation='vertical', spacing=dp(12))
+        empty_box.add_widget(Label(
+            text="📭",
+            font_size='60sp',
+            size_hint_y=0.4,
+            color=(0.6, 0.7, 0.85, 1)
+        ))
+        self.title_label = Label(
+            font_size='20sp',
+            bold=True,
+            size_hint_y=0.3,
+            color=(0.3, 0.4, 0.6, 1)
+        )
+        empty_box.add_widget(self.title_label)
+        empty_box.add_widget(Label(
+            text="Tap the green button above to create your first reminder!",
+            font_size='14sp',
+            size_hint_y=0.3,
+            color=(0.5, 0.6, 0.7, 1)
+        ))
+        
+        self.add_widget(empty_box)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.title_label.text = data['title']
+
+
+class ReminderList(RecycleView):
+    """Virtualized reminder list: only the rows in the viewport exist as widgets"""
+    def __init__(self, callbacks, **kwargs):
+        super().__init__(**kwargs)
+        self.callbacks = callbacks
+        
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            key_viewclass='viewclass',
+            size_hint_y=None,
+            default_size=(None, dp(160)),
+            default_size_hint=(1, None),
+            spacing=dp(10),
+            padding=[0, dp(6), 0, dp(12)]
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+
+Factory.register('ReminderCard', cls=ReminderCard)
+Factory.register('CategoryHeader', cls=CategoryHeader)
+Factory.register('EmptyStateCard', cls=EmptyStateCard)
 
 
 class ReminderApp(App):
     def build(self):
         print("Building Enhanced UI...")
         self.reminders = []
-        self.editing_index = None
+        self.reminder_index = ReminderIndex()
+        self.due_index = DueIndex()
+        self.editing_id = None
         self.alarm_popup = None
-        self.media_player = None
+        # Reminders listed in the alarm popup, not dismissed yet
+        self.alarm_reminders = []
+        self.dismiss_poll = None
+        # Prepared alarm sounds (Android only, created on first use)
+        self.alarm_audio = None
+        self.dispatcher = None
+        self.prewarm_event = None
         self.snooze_minutes = 10
-        self.triggered_reminders = set()
-        self.last_check_minute = -1
+        self.last_check_occurrence = -1
+        self.snoozed_ids = set()
+        self.check_event = None
         self.selected_ringtone_uri = None
         self.current_filter = 'All'
         self.current_sort = 'Time'
+        self.alarm_scheduler = AlarmScheduler()
         
         try:
             if platform == 'android':
@@ -493,12 +720,29 @@ class ReminderApp(App):
             else:
                 self.data_dir = os.path.dirname(os.path.abspath(__file__))
             
-            self.data_file = os.path.join(self.data_dir, 'reminders.json')
+            self.data_file = os.path.join(self.data_dir, DATA_FILE_NAME)
         except Exception as e:
             print(f"Data dir error: {e}")
-            self.data_file = 'reminders.json'
+            self.data_file = DATA_FILE_NAME
+        self.store = open_store(os.path.dirname(self.data_file))
+        self.loaded = False
+        # Disk writes and AlarmManager calls; results come back on the UI thread
+        self.worker = TaskWorker(dispatch=lambda fn: Clock.schedule_once(lambda dt: fn(), 0))
+        self.save_trigger = Clock.create_trigger(self.flush_reminders, SAVE_DEBOUNCE_SECONDS)
+        # Pushes what changed to the background service as soon as it's on disk
+        self.notifier = ChangeNotifier(os.path.dirname(self.data_file))
+        # Shared with the service and the Java receiver so each occurrence fires once.
+        # The receiver runs in this process, so on Android both files go through it
+        if platform == 'android':
+            context = java.PythonActivity.mActivity
+            self.ledger = JavaFiredLedger(context)
+            # How late alarms fire, from every path; shown in the settings
+            self.latency = JavaLatencyHistogram(context, os.path.dirname(self.data_file))
+        else:
+            self.ledger = FiredLedger(os.path.dirname(self.data_file))
+            self.latency = LatencyHistogram(os.path.dirname(self.data_file))
         
-        create_notification_channel()
+        create_notification_channels(os.path.dirname(self.data_file))
         Clock.schedule_once(lambda dt: start_background_service(), 3)
         
         self.load_ringtones()
@@ -665,21 +909,20 @@ class ReminderApp(App):
         
         self.layout.add_widget(stats_card)
 
-        scroll = ScrollView(size_hint=(1, 1))
-        self.reminder_list = BoxLayout(
-            orientation="vertical",
-            size_hint_y=None,
-            spacing=dp(10),
-            padding=[0, dp(6), 0, dp(12)]
+        self.reminder_list = ReminderList(
+            callbacks={
+                'edit': self.edit_reminder,
+                'toggle': self.toggle_reminder,
+                'delete': self.delete_reminder
+            },
+            size_hint=(1, 1)
         )
-        self.reminder_list.bind(minimum_height=self.reminder_list.setter('height'))
-        scroll.add_widget(self.reminder_list)
-        self.layout.add_widget(scroll)
+        self.layout.add_widget(self.reminder_list)
 
         root.add_widget(self.layout)
         
         self.refresh_reminder_list()
-        Clock.schedule_interval(self.check_reminders, 5)
+        self.arm_reminder_check()
         
         print("Enhanced UI built successfully")
         return root
@@ -732,11 +975,10 @@ The app will request these permissions automatically."""
             
             def open_settings(btn):
                 try:
-                    from jnius import autoclass
-                    PythonActivity = autoclass('org.kivy.android.PythonActivity')
-                    Intent = autoclass('android.content.Intent')
-                    Settings = autoclass('android.provider.Settings')
-                    Uri = autoclass('android.net.Uri')
+                    PythonActivity = java.PythonActivity
+                    Intent = java.Intent
+                    Settings = java.Settings
+                    Uri = java.Uri
                     
                     activity = PythonActivity.mActivity
                     package_name = activity.getPackageName()
@@ -763,11 +1005,25 @@ The app will request these permissions automatically."""
         
         def restart_service(btn):
             start_background_service()
+            self.worker.submit(self.resync_alarms, [r.to_item() for r in self.reminders])
             popup.dismiss()
         
         restart_btn.bind(on_press=restart_service)
         content.add_widget(restart_btn)
         
+        latency_btn = Button(
+            text="📊 Alarm Latency",
+            size_hint_y=None,
+            height=dp(50),
+            background_normal='',
+            background_color=(0.55, 0.45, 0.85, 1),
+            color=(1, 1, 1, 1),
+            font_size='15sp',
+            bold=True
+        )
+        latency_btn.bind(on_press=lambda btn: self.show_latency_report())
+        content.add_widget(latency_btn)
+        
         close_btn = Button(
             text="Close",
             size_hint_y=None,
@@ -782,7 +1038,7 @@ The app will request these permissions automatically."""
         popup = Popup(
             title="",
             content=content,
-            size_hint=(0.9, 0.7),
+            size_hint=(0.9, 0.8),
             separator_height=0,
             background_color=(1, 1, 1, 0.98)
         )
@@ -791,6 +1047,76 @@ The app will request these permissions automatically."""
         content.add_widget(close_btn)
         popup.open()
 
+    def show_latency_report(self):
+        """How late alarms fired, per path and stage, from the shared histogram"""
+        content = BoxLayout(orientation='vertical', spacing=dp(12), padding=dp(16))
+        
+        content.add_widget(Label(
+            text="📊 Alarm Latency",
+            font_size='20sp',
+            bold=True,
+            size_hint_y=None,
+            height=dp(36),
+            color=(0.2, 0.3, 0.5, 1)
+        ))
+        
+        report = format_report(self.latency.report())
+        last_sound = self.alarm_audio.last_latency_ms if self.alarm_audio is not None else None
+        report += f"\n\nTime after the scheduled instant (log2 buckets)." \
+                  f"\nLast sound start after play(): {format_ms(last_sound)}"
+        
+        report_label = Label(
+            text=report,
+            font_size='12sp',
+            font_name='RobotoMono-Regular',
+            halign='left',
+            valign='top',
+            size_hint_y=None,
+            color=(0.3, 0.3, 0.4, 1)
+        )
+        report_label.bind(width=lambda label, width: setattr(label, 'text_size', (width, None)))
+        report_label.bind(texture_size=lambda label, size: setattr(label, 'height', size[1]))
+        scroll = ScrollView()
+        scroll.add_widget(report_label)
+        content.add_widget(scroll)
+        
+        btn_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(12))
+        reset_btn = Button(
+            text="Reset",
+            background_normal='',
+            background_color=(0.95, 0.35, 0.4, 1),
+            color=(1, 1, 1, 1),
+            font_size='15sp',
+            bold=True
+        )
+        close_btn = Button(
+            text="Close",
+            background_normal='',
+            background_color=(0.7, 0.7, 0.72, 1),
+            color=(1, 1, 1, 1),
+            font_size='15sp',
+            bold=True
+        )
+        btn_box.add_widget(reset_btn)
+        btn_box.add_widget(close_btn)
+        content.add_widget(btn_box)
+        
+        popup = Popup(
+            title="",
+            content=content,
+            size_hint=(0.95, 0.7),
+            separator_height=0,
+            background_color=(1, 1, 1, 0.98)
+        )
+        
+        def reset(btn):
+            self.latency.reset()
+            report_label.text = format_report([])
+        
+        reset_btn.bind(on_press=reset)
+        close_btn.bind(on_press=popup.dismiss)
+        popup.open()
+
     def filter_reminders(self, spinner, text):
         self.current_filter = text
         self.refresh_reminder_list()
@@ -798,12 +1124,12 @@ The app will request these permissions automatically."""
     def sort_reminders(self, spinner, text):
         self.current_sort = text
         if text == 'Time':
-            self.reminders.sort(key=lambda x: (x['time'].hour, x['time'].minute))
+            self.reminders.sort(key=lambda x: x.minute_of_day)
         elif text == 'Category':
-            self.reminders.sort(key=lambda x: x.get('category', 'Personal'))
+            self.reminders.sort(key=lambda x: x.category)
         elif text == 'Priority':
             priority_order = {'High': 0, 'Medium': 1, 'Low': 2}
-            self.reminders.sort(key=lambda x: priority_order.get(x.get('priority', 'Medium'), 1))
+            self.reminders.sort(key=lambda x: priority_order.get(x.priority, 1))
         self.save_reminders()
         self.refresh_reminder_list()
 
@@ -812,6 +1138,9 @@ The app will request these permissions automatically."""
             'System Alarm': 'SYSTEM_DEFAULT',
             'Vibrate Only': 'VIBRATE_ONLY'
         }
+        # Sounds shipped in assets/ringtones (file names only, nothing decoded)
+        self.ringtone_catalogue = RingtoneCatalogue()
+        self.ringtones.update(self.ringtone_catalogue.by_name)
         
         if platform == 'android':
             self.ringtones['Browse for Sound...'] = 'BROWSE'
@@ -819,11 +1148,10 @@ The app will request these permissions automatically."""
     def browse_ringtone(self, callback):
         if platform == 'android':
             try:
-                from jnius import autoclass
                 from android import activity
                 
-                Intent = autoclass('android.content.Intent')
-                PythonActivity = autoclass('org.kivy.android.PythonActivity')
+                Intent = java.Intent
+                PythonActivity = java.PythonActivity
                 
                 self._ringtone_callback = callback
                 
@@ -855,72 +1183,156 @@ The app will request these permissions automatically."""
         self.date_label.text = now.strftime('%A, %b %d')
 
     def load_reminders(self):
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    for item in data:
-                        h, m = map(int, item['time'].split(':'))
-                        self.reminders.append({
-                            'text': item['text'],
-                            'time': datetime.time(h, m),
-                            'played': False,
-                            'recurring': item.get('recurring', True),
-                            'enabled': item.get('enabled', True),
-                            'days': item.get('days', list(range(7))),
-                            'snooze_until': None,
-                            'ringtone': item.get('ringtone', 'System Alarm'),
-                            'ringtone_uri': item.get('ringtone_uri', None),
-                            'category': item.get('category', 'Personal'),
-                            'priority': item.get('priority', 'Medium'),
-                            'note': item.get('note', '')
-                        })
-                print(f"Loaded {len(self.reminders)} reminders")
-        except Exception as e:
-            print(f"Load error: {e}")
+        """Read the reminders on the worker thread; on_reminders_loaded() takes it from there"""
+        def read():
+            try:
+                return self.store.load()
+            except Exception as e:
+                print(f"Load error: {e}")
+                return []
+        
+        self.worker.submit(read, on_done=self.on_reminders_loaded)
+
+    def on_reminders_loaded(self, data):
+        # Anything added before the file was read goes after it, with a fresh id
+        early = self.reminders
+        self.reminders = decode_reminders(data)
+        self.reminder_index.rebuild(self.reminders)
+        for r in early:
+            r.id = None
+            self.reminder_index.add(r)
+            self.reminders.append(r)
+        # Snoozes survive restarts; ones that ran out meanwhile fire on the next check
+        self.snoozed_ids = {r.id for r in self.reminders if r.snooze_until}
+        self.loaded = True
+        print(f"Loaded {len(self.reminders)} reminders")
+        
+        self.rebuild_due_index()
+        self.arm_reminder_check()
+        self.refresh_reminder_list()
+        # AlarmManager may have lost everything (reboot, update, force stop):
+        # register every alarm now, even if this session never edits anything
+        self.worker.submit(self.resync_alarms, [r.to_item() for r in self.reminders])
+        if early:
+            self.save_reminders()
+
+    def rebuild_due_index(self):
+        self.due_index.rebuild(
+            (r.id, r.minute_of_day, r.days_mask)
+            for r in self.reminders if r.enabled
+        )
+
+    def arm_reminder_check(self):
+        """(Re)arm one timer for the next due reminder or snooze expiry"""
+        if self.check_event is not None:
+            self.check_event.cancel()
+            self.check_event = None
+        
+        now = datetime.datetime.now()
+        candidates = []
+        next_due = self.due_index.next_due_after(now)
+        if next_due is not None:
+            due_ids = self.due_index.due(next_due.weekday(), next_due.hour * 60 + next_due.minute)
+            due = [self.reminder_index.get(rid) for rid in due_ids]
+            due = [r for r in due if r is not None]
+            if due:
+                # The one whose sound the dispatcher will play
+                candidates.append((next_due, lead_reminder(due).id))
+        for reminder_id in self.snoozed_ids:
+            r = self.reminder_index.get(reminder_id)
+            if r is not None and r.snooze_until:
+                candidates.append((r.snooze_until, reminder_id))
+        if not candidates:
+            return
+        
+        when, reminder_id = min(candidates)
+        # Small margin so the timer lands just after the minute boundary.
+        # Never longer than MAX_CHECK_DELAY_SECONDS: the next due instant is
+        # recomputed from the clock every time the timer fires
+        delay = min(max(0, seconds_until(when)) + 0.05, MAX_CHECK_DELAY_SECONDS)
+        self.check_event = Clock.schedule_once(self.on_check_timer, delay)
+        self.arm_prewarm(when, self.reminder_index.get(reminder_id))
+
+    def arm_prewarm(self, when, reminder):
+        """Have the next alarm's sound prepared shortly before it is due"""
+        if self.prewarm_event is not None:
+            self.prewarm_event.cancel()
+            self.prewarm_event = None
+        if platform != 'android' or reminder is None:
+            return
+        
+        source = sound_source(reminder.ringtone, reminder.ringtone_uri)
+        delay = seconds_until(when) - PREWARM_AHEAD_SECONDS
+        if delay <= 0:
+            self.get_alarm_audio().prewarm(source)
+        else:
+            self.prewarm_event = Clock.schedule_once(
+                lambda dt: self.get_alarm_audio().prewarm(source), delay
+            )
+
+    def get_alarm_audio(self):
+        if self.alarm_audio is None:
+            self.alarm_audio = AlarmAudio(java.PythonActivity.mActivity,
+                                          catalogue=self.ringtone_catalogue)
+        return self.alarm_audio
+
+    def get_dispatcher(self):
+        if self.dispatcher is None:
+            self.dispatcher = AlarmDispatcher(java.PythonActivity.mActivity, self.get_alarm_audio(),
+                                              repeat_vibration=True, latency=self.latency)
+        return self.dispatcher
+
+    def on_check_timer(self, dt):
+        self.check_event = None
+        self.check_reminders(dt)
+        self.worker.submit(self.alarm_scheduler.advance)
+        self.arm_reminder_check()
 
     def save_reminders(self):
+        """Update the in-memory schedule now; disk and AlarmManager follow after a short debounce"""
+        self.rebuild_due_index()
+        self.arm_reminder_check()
+        self.save_trigger()
+
+    def flush_reminders(self, *args):
+        """Snapshot the list and queue the write + AlarmManager sync on the worker"""
+        if not self.loaded:
+            # Never replace the file before it has been read
+            return
+        self.worker.submit(self.persist, [r.to_item() for r in self.reminders])
+
+    def persist(self, items):
+        """Worker thread: write the snapshot, then bring AlarmManager in line with it"""
         try:
-            data = [{
-                'text': r['text'],
-                'time': r['time'].strftime('%H:%M'),
-                'recurring': r.get('recurring', True),
-                'enabled': r.get('enabled', True),
-                'days': r.get('days', list(range(7))),
-                'ringtone': r.get('ringtone', 'System Alarm'),
-                'ringtone_uri': r.get('ringtone_uri', None),
-                'category': r.get('category', 'Personal'),
-                'priority': r.get('priority', 'Medium'),
-                'note': r.get('note', '')
-            } for r in self.reminders]
-            
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            print(f"Saved {len(data)} reminders")
-            
-            # IMPORTANT: Schedule all enabled reminders with AlarmManager
-            for idx, r in enumerate(self.reminders):
-                if r.get('enabled'):
-                    schedule_alarm_with_manager(
-                        idx,
-                        r['time'].hour,
-                        r['time'].minute,
-                        r.get('days', list(range(7))),
-                        {
-                            'text': r['text'],
-                            'category': r.get('category', 'Personal'),
-                            'note': r.get('note', '')
-                        }
-                    )
-                else:
-                    cancel_alarm_with_manager(idx, r.get('days', list(range(7))))
-                    
+            base = self.store.signature()
+            changes = self.store.save(items)
+            print(f"Saved {len(items)} reminders ({changes} changes)")
+            if changes:
+                self.notifier.send(change_ops(self.store.last_changes), base, self.store.signature())
         except Exception as e:
             print(f"Save error: {e}")
+            import traceback
+            traceback.print_exc()
+        
+        # IMPORTANT: Keep AlarmManager in sync (only changed reminders are touched).
+        # The worker gets its own copies, the UI keeps editing self.reminders
+        self.alarm_scheduler.sync(decode_reminders(items))
+
+    def resync_alarms(self, items):
+        """Worker thread: forget what was registered and register everything again"""
+        self.alarm_scheduler.reset()
+        self.alarm_scheduler.sync(decode_reminders(items))
+
+    def flush_now(self):
+        """Skip the debounce and wait for the worker (app leaving the foreground)"""
+        if self.save_trigger.is_triggered:
+            self.save_trigger.cancel()
+            self.flush_reminders()
+        if not self.worker.flush():
+            print("Save still running after 5s")
 
     def show_add_dialog(self, instance):
-        self.editing_index = None
+        self.editing_id = None
         self.show_reminder_dialog()
 
     def show_reminder_dialog(self, reminder=None):
@@ -963,7 +1375,7 @@ The app will request these permissions automatically."""
             font_size='15sp'
         )
         if reminder:
-            text_input.text = reminder['text']
+            text_input.text = reminder.text
         form.add_widget(text_input)
 
         cat_label = Label(
@@ -979,7 +1391,7 @@ The app will request these permissions automatically."""
         form.add_widget(cat_label)
         
         category_spinner = Spinner(
-            text=reminder.get('category', 'Personal') if reminder else 'Personal',
+            text=reminder.category if reminder else 'Personal',
             values=['Work', 'Personal', 'Health', 'Shopping', 'Other'],
             size_hint=(1, None),
             height=dp(45),
@@ -1004,17 +1416,17 @@ The app will request these permissions automatically."""
         
         priority_btns = []
         priorities = [('High', (0.95, 0.3, 0.3, 1)), ('Medium', (0.95, 0.7, 0.2, 1)), ('Low', (0.3, 0.7, 0.95, 1))]
-        selected_priority = {'value': reminder.get('priority', 'Medium') if reminder else 'Medium'}
+        selected_priority = {'value': reminder.priority if reminder else 'Medium'}
         
         for p_name, p_color in priorities:
             btn = ToggleButton(
                 text=p_name,
                 group='priority',
-                state='down' if (reminder and reminder.get('priority') == p_name) or (not reminder and p_name == 'Medium') else 'normal',
+                state='down' if (reminder and reminder.priority == p_name) or (not reminder and p_name == 'Medium') else 'normal',
                 background_normal='',
                 background_down='',
-                background_color=p_color if (reminder and reminder.get('priority') == p_name) or (not reminder and p_name == 'Medium') else (0.9, 0.9, 0.92, 1),
-                color=(1, 1, 1, 1) if (reminder and reminder.get('priority') == p_name) or (not reminder and p_name == 'Medium') else (0.5, 0.5, 0.55, 1),
+                background_color=p_color if (reminder and reminder.priority == p_name) or (not reminder and p_name == 'Medium') else (0.9, 0.9, 0.92, 1),
+                color=(1, 1, 1, 1) if (reminder and reminder.priority == p_name) or (not reminder and p_name == 'Medium') else (0.5, 0.5, 0.55, 1),
                 font_size='13sp',
                 bold=True
             )
@@ -1052,7 +1464,7 @@ The app will request these permissions automatically."""
         time_box = BoxLayout(size_hint=(1, None), height=dp(50), spacing=dp(6))
         
         hour = Spinner(
-            text=str(reminder['time'].hour % 12 or 12) if reminder else "9",
+            text=str(reminder.hour % 12 or 12) if reminder else "9",
             values=[str(i) for i in range(1, 13)],
             size_hint=(0.3, 1),
             background_color=(0.97, 0.98, 0.99, 1),
@@ -1062,7 +1474,7 @@ The app will request these permissions automatically."""
         colon = Label(text=":", size_hint=(0.08, 1), font_size='22sp', bold=True)
         
         minute = Spinner(
-            text=str(reminder['time'].minute).zfill(2) if reminder else "00",
+            text=str(reminder.minute).zfill(2) if reminder else "00",
             values=[str(i).zfill(2) for i in range(0, 60)],
             size_hint=(0.3, 1),
             background_color=(0.97, 0.98, 0.99, 1),
@@ -1070,7 +1482,7 @@ The app will request these permissions automatically."""
         )
         
         ampm = Spinner(
-            text="PM" if reminder and reminder['time'].hour >= 12 else "AM",
+            text="PM" if reminder and reminder.hour >= 12 else "AM",
             values=["AM", "PM"],
             size_hint=(0.32, 1),
             background_color=(0.97, 0.98, 0.99, 1),
@@ -1095,10 +1507,10 @@ The app will request these permissions automatically."""
         ringtone_label.bind(size=ringtone_label.setter('text_size'))
         form.add_widget(ringtone_label)
         
-        selected_ringtone_uri = {'uri': reminder.get('ringtone_uri') if reminder else None}
+        selected_ringtone_uri = {'uri': reminder.ringtone_uri if reminder else None}
         
         ringtone_spinner = Spinner(
-            text=reminder.get('ringtone', 'System Alarm') if reminder else 'System Alarm',
+            text=reminder.ringtone if reminder else 'System Alarm',
             values=sorted(self.ringtones.keys()),
             size_hint=(1, None),
             height=dp(45),
@@ -1112,6 +1524,8 @@ The app will request these permissions automatically."""
                     selected_ringtone_uri['uri'] = uri
                     spinner.text = 'Custom Sound'
                 self.browse_ringtone(on_file_selected)
+            elif text in self.ringtones:
+                selected_ringtone_uri['uri'] = self.ringtones[text]
         
         ringtone_spinner.bind(text=on_ringtone_select)
         form.add_widget(ringtone_spinner)
@@ -1136,7 +1550,7 @@ The app will request these permissions automatically."""
             cb_box = BoxLayout(orientation='vertical', size_hint=(1, 1), spacing=dp(3))
             
             cb = CheckBox(
-                active=reminder and i in reminder.get('days', list(range(7))) if reminder else True,
+                active=reminder.has_day(i) if reminder else True,
                 size_hint=(1, 0.6),
                 color=(0.3, 0.6, 0.9, 1)
             )
@@ -1213,8 +1627,8 @@ The app will request these permissions automatically."""
             padding=[dp(14), dp(12)],
             font_size='14sp'
         )
-        if reminder and reminder.get('note'):
-            note_input.text = reminder['note']
+        if reminder and reminder.note:
+            note_input.text = reminder.note
         form.add_widget(note_input)
 
         scroll.add_widget(form)
@@ -1266,35 +1680,39 @@ The app will request these permissions automatically."""
             elif ampm.text == "AM" and h == 12:
                 h = 0
 
-            selected_days = [i for i, cb in enumerate(day_checks) if cb.active]
-            if not selected_days:
+            days_mask = 0
+            for i, cb in enumerate(day_checks):
+                if cb.active:
+                    days_mask |= 1 << i
+            if not days_mask:
                 days_label.text = "⚠️ Select at least one day"
                 days_label.color = (0.95, 0.3, 0.3, 1)
                 return
 
-            new_reminder = {
-                'text': text,
-                'time': datetime.time(h, m),
-                'played': False,
-                'recurring': True,
-                'enabled': True,
-                'days': sorted(selected_days),
-                'snooze_until': None,
-                'ringtone': ringtone_spinner.text,
-                'ringtone_uri': selected_ringtone_uri['uri'],
-                'category': category_spinner.text,
-                'priority': selected_priority['value'],
-                'note': note_input.text.strip()
-            }
-
-            if self.editing_index is not None:
-                self.reminders[self.editing_index] = new_reminder
-                self.editing_index = None
+            new_reminder = Reminder(
+                text,
+                h * 60 + m,
+                days_mask,
+                ringtone=ringtone_spinner.text,
+                ringtone_uri=selected_ringtone_uri['uri'],
+                category=category_spinner.text,
+                priority=selected_priority['value'],
+                note=note_input.text.strip()
+            )
+
+            existing = self.reminder_index.get(self.editing_id)
+            if existing is not None:
+                # Update in place: keeps the id (and so the existing alarm)
+                # and the reminder's position in the list
+                # (this also clears any snooze)
+                existing.update_from(new_reminder)
+                self.editing_id = None
             else:
                 self.reminders.append(new_reminder)
+                self.reminder_index.add(new_reminder)
             
             if self.current_sort == 'Time':
-                self.reminders.sort(key=lambda x: (x['time'].hour, x['time'].minute))
+                self.reminders.sort(key=lambda x: x.minute_of_day)
             
             self.save_reminders()
             self.refresh_reminder_list()
@@ -1308,19 +1726,16 @@ The app will request these permissions automatically."""
         cancel_btn.bind(on_press=popup.dismiss)
         popup.open()
 
-    def edit_reminder(self, index):
-        if 0 <= index < len(self.reminders):
-            self.editing_index = index
-            self.show_reminder_dialog(self.reminders[index])
+    def edit_reminder(self, reminder_id):
+        reminder = self.reminder_index.get(reminder_id)
+        if reminder is not None:
+            self.editing_id = reminder_id
+            self.show_reminder_dialog(reminder)
 
-    def toggle_reminder(self, index):
-        if 0 <= index < len(self.reminders):
-            self.reminders[index]['enabled'] = not self.reminders[index].get('enabled', True)
-            self.reminders[index]['played'] = False
-            
-            reminder = self.reminders[index]
-            reminder_key = f"{index}_{reminder['time'].hour:02d}{reminder['time'].minute:02d}"
-            self.triggered_reminders.discard(reminder_key)
+    def toggle_reminder(self, reminder_id):
+        reminder = self.reminder_index.get(reminder_id)
+        if reminder is not None:
+            reminder.enabled = not reminder.enabled
             
             self.save_reminders()
             self.refresh_reminder_list()
@@ -1328,8 +1743,9 @@ The app will request these permissions automatically."""
             if platform == 'android':
                 Clock.schedule_once(lambda dt: start_background_service(), 0.5)
 
-    def delete_reminder(self, index):
-        if 0 <= index < len(self.reminders):
+    def delete_reminder(self, reminder_id):
+        reminder = self.reminder_index.get(reminder_id)
+        if reminder is not None:
             content = BoxLayout(orientation='vertical', spacing=dp(20), padding=dp(22))
             
             icon_label = Label(
@@ -1349,7 +1765,7 @@ The app will request these permissions automatically."""
             ))
             
             reminder_text = Label(
-                text=self.reminders[index]['text'],
+                text=reminder.text,
                 font_size='15sp',
                 color=(0.5, 0.5, 0.55, 1),
                 size_hint=(1, 0.22),
@@ -1391,14 +1807,9 @@ The app will request these permissions automatically."""
             )
             
             def do_delete(instance):
-                reminder = self.reminders[index]
-                reminder_key = f"{index}_{reminder['time'].hour:02d}{reminder['time'].minute:02d}"
-                self.triggered_reminders.discard(reminder_key)
-                
-                # Cancel alarm with AlarmManager
-                cancel_alarm_with_manager(index, reminder.get('days', list(range(7))))
-                
-                del self.reminders[index]
+                # save_reminders cancels the alarm registered under this id
+                self.reminders = [r for r in self.reminders if r.id != reminder_id]
+                self.reminder_index.remove(reminder_id)
                 self.save_reminders()
                 self.refresh_reminder_list()
                 
@@ -1412,143 +1823,56 @@ The app will request these permissions automatically."""
             confirm_popup.open()
 
     def refresh_reminder_list(self):
-        self.reminder_list.clear_widgets()
-        
         filtered = self.reminders
         if self.current_filter != 'All':
-            filtered = [r for r in self.reminders if r.get('category') == self.current_filter]
+            filtered = [r for r in self.reminders if r.category == self.current_filter]
         
-        active = sum(1 for r in self.reminders if r.get('enabled', True))
+        active = sum(1 for r in self.reminders if r.enabled)
         total = len(self.reminders)
         
         today = datetime.datetime.now().weekday()
-        today_reminders = sum(1 for r in self.reminders if r.get('enabled') and today in r.get('days', []))
+        today_reminders = sum(1 for r in self.reminders if r.enabled and r.days_mask >> today & 1)
         
         self.total_stat.text = str(total)
         self.active_stat.text = str(active)
         self.today_stat.text = str(today_reminders)
         
         if not filtered:
-            empty_card = ModernCard(
-                bg_color=(0.97, 0.98, 1, 1),
-                accent_color=(0.3, 0.6, 0.95, 1)
-            )
-            empty_card.size_hint_y = None
-            empty_card.height = dp(180)
-            empty_card.padding = dp(24)
-            
-            empty_box = BoxLayout(orientation='vertical', spacing=dp(12))
-            empty_box.add_widget(Label(
-                text="📭",
-                font_size='60sp',
-                size_hint_y=0.4,
-                color=(0.6, 0.7, 0.85, 1)
-            ))
-            empty_box.add_widget(Label(
-                text="No Reminders" if self.current_filter == 'All' else f"No {self.current_filter} Reminders",
-                font_size='20sp',
-                bold=True,
-                size_hint_y=0.3,
-                color=(0.3, 0.4, 0.6, 1)
-            ))
-            empty_box.add_widget(Label(
-                text="Tap the green button above to create your first reminder!",
-                font_size='14sp',
-                size_hint_y=0.3,
-                color=(0.5, 0.6, 0.7, 1)
-            ))
-            
-            empty_card.add_widget(empty_box)
-            self.reminder_list.add_widget(empty_card)
+            self.reminder_list.data = [{
+                'viewclass': 'EmptyStateCard',
+                'height': dp(180),
+                'title': "No Reminders" if self.current_filter == 'All' else f"No {self.current_filter} Reminders"
+            }]
             return
         
-        callbacks = {
-            'edit': self.edit_reminder,
-            'toggle': self.toggle_reminder,
-            'delete': self.delete_reminder
-        }
-        
+        # Only row descriptors are built here; the RecycleView creates cards
+        # for the visible rows and rebinds them as the list scrolls.
+        # Cards are addressed by reminder id, so no position lookups are needed
+        rows = []
         if self.current_sort == 'Category':
             categories = {}
-            for idx, r in enumerate(filtered):
-                cat = r.get('category', 'Personal')
+            for r in filtered:
+                cat = r.category
                 if cat not in categories:
                     categories[cat] = []
-                categories[cat].append((idx, r))
+                categories[cat].append(r)
             
             for cat in sorted(categories.keys()):
-                header = Label(
-                    text=f"📂 {cat}",
-                    size_hint=(1, None),
-                    height=dp(35),
-                    font_size='15sp',
-                    bold=True,
-                    halign='left',
-                    color=(0.3, 0.4, 0.6, 1),
-                    padding=[dp(8), 0]
-                )
-                header.bind(size=header.setter('text_size'))
-                self.reminder_list.add_widget(header)
-                
-                for idx, r in categories[cat]:
-                    actual_idx = self.reminders.index(r)
-                    self.reminder_list.add_widget(ReminderCard(r, actual_idx, callbacks))
+                rows.append({'viewclass': 'CategoryHeader', 'height': dp(35), 'text': f"📂 {cat}"})
+                for r in categories[cat]:
+                    rows.append({'viewclass': 'ReminderCard', 'height': dp(160), 'reminder_id': r.id, 'reminder': r})
         else:
-            for idx, r in enumerate(filtered):
-                actual_idx = self.reminders.index(r)
-                self.reminder_list.add_widget(ReminderCard(r, actual_idx, callbacks))
+            for r in filtered:
+                rows.append({'viewclass': 'ReminderCard', 'height': dp(160), 'reminder_id': r.id, 'reminder': r})
+        
+        self.reminder_list.data = rows
 
     def play_ringtone(self, ringtone_name, ringtone_uri=None):
-        """Play selected ringtone with proper permissions"""
+        """Play selected ringtone (prepared in advance when possible)"""
         try:
-            if self.media_player:
-                try:
-                    self.media_player.stop()
-                    self.media_player.release()
-                except:
-                    pass
-                self.media_player = None
-            
-            if platform == 'android' and ringtone_name != 'Vibrate Only':
-                from jnius import autoclass
-                
-                MediaPlayer = autoclass('android.media.MediaPlayer')
-                AudioManager = autoclass('android.media.AudioManager')
-                Uri = autoclass('android.net.Uri')
-                PythonActivity = autoclass('org.kivy.android.PythonActivity')
-                RingtoneManager = autoclass('android.media.RingtoneManager')
-                Context = autoclass('android.content.Context')
-                
-                activity = PythonActivity.mActivity
-                
-                self.media_player = MediaPlayer()
-                self.media_player.setAudioStreamType(AudioManager.STREAM_ALARM)
-                
-                try:
-                    if ringtone_uri and ringtone_uri not in ['SYSTEM_DEFAULT', 'VIBRATE_ONLY', 'BROWSE']:
-                        uri = Uri.parse(ringtone_uri)
-                        self.media_player.setDataSource(activity, uri)
-                        print(f"Playing custom ringtone: {ringtone_uri}")
-                    else:
-                        default_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-                        self.media_player.setDataSource(activity, default_uri)
-                        print("Playing default system alarm")
-                    
-                    self.media_player.setLooping(True)
-                    self.media_player.prepare()
-                    self.media_player.start()
-                    print("Ringtone started playing")
-                    
-                except Exception as e:
-                    print(f"Error with custom ringtone, falling back to default: {e}")
-                    self.media_player = MediaPlayer()
-                    self.media_player.setAudioStreamType(AudioManager.STREAM_ALARM)
-                    default_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-                    self.media_player.setDataSource(activity, default_uri)
-                    self.media_player.setLooping(True)
-                    self.media_player.prepare()
-                    self.media_player.start()
-                
+            if platform == 'android':
+                # None (Vibrate Only) just stops whatever is playing
+                self.get_alarm_audio().play(sound_source(ringtone_name, ringtone_uri))
         except Exception as e:
             print(f"Ringtone error: {e}")
             import traceback
@@ -1557,155 +1881,145 @@ The app will request these permissions automatically."""
     def stop_ringtone(self):
         """Stop playing ringtone"""
         try:
-            if self.media_player:
-                self.media_player.stop()
-                self.media_player.release()
-                self.media_player = None
+            if self.alarm_audio is not None:
+                self.alarm_audio.stop()
                 print("Ringtone stopped")
         except Exception as e:
             print(f"Stop ringtone error: {e}")
 
-    def show_android_notification(self, reminder):
-        """Show Android notification"""
-        if platform == 'android':
-            try:
-                from jnius import autoclass
-                
-                PythonActivity = autoclass('org.kivy.android.PythonActivity')
-                Context = autoclass('android.content.Context')
-                NotificationManager = autoclass('android.app.NotificationManager')
-                NotificationCompat = autoclass('androidx.core.app.NotificationCompat')
-                PendingIntent = autoclass('android.app.PendingIntent')
-                Intent = autoclass('android.content.Intent')
-                RingtoneManager = autoclass('android.media.RingtoneManager')
-                Uri = autoclass('android.net.Uri')
-                
-                activity = PythonActivity.mActivity
-                notification_service = activity.getSystemService(Context.NOTIFICATION_SERVICE)
-                
-                intent = Intent(activity.getApplicationContext(), PythonActivity)
-                intent.setFlags(Intent.FLAG_ACTIVITY_SINGLE_TOP | Intent.FLAG_ACTIVITY_CLEAR_TOP)
-                pending_intent = PendingIntent.getActivity(activity, 0, intent, PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE)
-                
-                builder = NotificationCompat.Builder(activity, "reminder_channel")
-                builder.setContentTitle(f"⏰ {reminder.get('category', 'Reminder')}")
-                builder.setContentText(reminder['text'])
-                builder.setSmallIcon(activity.getApplicationInfo().icon)
-                builder.setContentIntent(pending_intent)
-                builder.setPriority(NotificationCompat.PRIORITY_MAX)
-                builder.setCategory(NotificationCompat.CATEGORY_ALARM)
-                builder.setAutoCancel(True)
-                builder.setVibrate([0, 500, 200, 500])
-                
-                if reminder.get('ringtone') != 'Vibrate Only':
-                    ringtone_uri = reminder.get('ringtone_uri')
-                    if ringtone_uri and ringtone_uri not in ['SYSTEM_DEFAULT', 'VIBRATE_ONLY', 'BROWSE']:
-                        sound_uri = Uri.parse(ringtone_uri)
-                    else:
-                        sound_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-                    builder.setSound(sound_uri)
-                
-                notification = builder.build()
-                notification_service.notify(1001, notification)
-                print("Notification sent!")
-                
-            except Exception as e:
-                print(f"Notification error: {e}")
-                import traceback
-                traceback.print_exc()
-
     def check_reminders(self, dt):
-        """Check reminders with improved accuracy"""
+        """Fire reminders due this minute and snoozes that ran out"""
         try:
             now = datetime.datetime.now()
+            # Everything claimed in this pass fires as one alert
+            batch = []
+            scheduled = []
+            
+            # Snoozes are not minute-aligned, so handle them before the minute check
+            for reminder_id in list(self.snoozed_ids):
+                r = self.reminder_index.get(reminder_id)
+                if r is None or not r.snooze_until:
+                    self.snoozed_ids.discard(reminder_id)
+                elif now >= r.snooze_until:
+                    print(f"Snooze ended for reminder {reminder_id}")
+                    until = r.snooze_until
+                    r.snooze_until = None
+                    self.snoozed_ids.discard(reminder_id)
+                    self.save_reminders()
+                    if r.enabled and self.ledger.claim(reminder_id, occurrence_minute(until)):
+                        batch.append(r)
+                        scheduled.append(until.timestamp())
+            
             current_minute = now.hour * 60 + now.minute
+            occurrence = occurrence_minute(now)
             
-            if current_minute == self.last_check_minute:
+            # Keyed on the date too: with event-driven checks, consecutive
+            # checks can fall on the same clock minute of different days
+            if occurrence == self.last_check_occurrence:
+                self.show_alarms(batch, scheduled)
                 return
             
-            self.last_check_minute = current_minute
-            current_time = now.time().replace(second=0, microsecond=0)
+            self.last_check_occurrence = occurrence
             current_day = now.weekday()
             
-            for idx, r in enumerate(self.reminders):
-                if not r.get('enabled'):
-                    continue
-                
-                reminder_key = f"{idx}_{r['time'].hour:02d}{r['time'].minute:02d}"
-                
-                if r.get('snooze_until'):
-                    if now >= r['snooze_until']:
-                        print(f"Snooze ended for reminder {idx}")
-                        r['snooze_until'] = None
-                        r['played'] = False
-                        self.triggered_reminders.discard(reminder_key)
-                    else:
-                        continue
-                
-                if current_day not in r.get('days', list(range(7))):
+            # Only the reminders due this minute, straight from the index
+            for reminder_id in self.due_index.due(current_day, current_minute):
+                r = self.reminder_index.get(reminder_id)
+                if r is None or r.snooze_until:
                     continue
                 
-                reminder_time = r['time'].replace(second=0, microsecond=0)
-                if reminder_time == current_time and not r['played'] and reminder_key not in self.triggered_reminders:
-                    print(f"Triggering reminder {idx}: {r['text']}")
-                    self.show_alarm(r, idx)
-                    r['played'] = True
-                    self.triggered_reminders.add(reminder_key)
-            
-            if current_time.hour == 0 and current_time.minute == 0:
-                print("Midnight reset")
-                for r in self.reminders:
-                    if not r.get('snooze_until'):
-                        r['played'] = False
-                self.triggered_reminders.clear()
+                # The service or the AlarmManager receiver may have fired it already
+                if self.ledger.claim(reminder_id, occurrence):
+                    print(f"Triggering reminder {reminder_id}: {r.text}")
+                    batch.append(r)
+                    scheduled.append(occurrence * 60)
+            
+            self.show_alarms(batch, scheduled)
                 
         except Exception as e:
             print(f"Check reminders error: {e}")
             import traceback
             traceback.print_exc()
 
-    def snooze_alarm(self, reminder, idx):
-        """Snooze the alarm"""
-        reminder['snooze_until'] = datetime.datetime.now() + datetime.timedelta(minutes=self.snooze_minutes)
-        reminder['played'] = True
-        
-        reminder_key = f"{idx}_{reminder['time'].hour:02d}{reminder['time'].minute:02d}"
-        self.triggered_reminders.discard(reminder_key)
+    def snooze_alarm(self, reminders):
+        """Snooze every reminder still in the alarm popup"""
+        until = datetime.datetime.now() + datetime.timedelta(minutes=self.snooze_minutes)
+        for reminder in reminders:
+            reminder.snooze_until = until
+            self.snoozed_ids.add(reminder.id)
+        # Saved with the reminder and registered as a one-shot alarm, so it
+        # still goes off if the app is killed in the meantime
+        self.save_reminders()
         
         if self.alarm_popup:
             self.alarm_popup.dismiss()
         
         self.stop_ringtone()
-        print(f"Snoozed for {self.snooze_minutes} minutes")
+        print(f"Snoozed {len(reminders)} reminder(s) for {self.snooze_minutes} minutes")
 
-    def show_alarm(self, reminder, idx):
-        """Show alarm popup with enhanced design"""
+    def poll_alarm_dismissed(self, dt):
+        """Notifications can be dismissed from the shade; close the popup once all are"""
+        if self.get_dispatcher().poll_dismissed():
+            return
+        self.dismiss_poll.cancel()
+        self.dismiss_poll = None
+        if self.alarm_popup:
+            self.alarm_popup.dismiss()
+
+    def dismiss_alarm_item(self, reminder, row):
+        """Dismiss one reminder of the alarm popup; the popup closes with the last one"""
+        if reminder in self.alarm_reminders:
+            self.alarm_reminders.remove(reminder)
+        if row.parent is not None:
+            row.parent.remove_widget(row)
+        if platform == 'android':
+            self.get_dispatcher().dismiss(reminder.id)
+        if not self.alarm_reminders and self.alarm_popup:
+            self.alarm_popup.dismiss()
+
+    def alarm_row(self, reminder):
+        """One line of the alarm popup with its own dismiss button"""
+        row = BoxLayout(size_hint_y=None, height=dp(48), spacing=dp(8))
+        label = Label(
+            text=f"📂 {reminder.category}  {reminder.text}",
+            font_size='16sp',
+            color=(0.2, 0.25, 0.35, 1),
+            bold=True,
+            halign='left',
+            valign='middle',
+            shorten=True
+        )
+        label.bind(size=label.setter('text_size'))
+        row.add_widget(label)
+        dismiss_btn = Button(
+            text="✓",
+            size_hint_x=None,
+            width=dp(48),
+            background_normal='',
+            background_color=(0.2, 0.75, 0.5, 1),
+            color=(1, 1, 1, 1),
+            font_size='17sp',
+            bold=True
+        )
+        dismiss_btn.bind(on_press=lambda x: self.dismiss_alarm_item(reminder, row))
+        row.add_widget(dismiss_btn)
+        return row
+
+    def show_alarms(self, reminders, scheduled=()):
+        """One alert and one popup for all the reminders that fired together"""
+        if not reminders:
+            return
         try:
-            self.show_android_notification(reminder)
-            self.play_ringtone(reminder.get('ringtone', 'System Alarm'), 
-                             reminder.get('ringtone_uri'))
-            
             if platform == 'android':
-                try:
-                    from jnius import autoclass
-                    PythonActivity = autoclass('org.kivy.android.PythonActivity')
-                    Context = autoclass('android.content.Context')
-                    Vibrator = autoclass('android.os.Vibrator')
-                    VibrationEffect = autoclass('android.os.VibrationEffect')
-                    VERSION = autoclass('android.os.Build$VERSION')
-                    
-                    activity = PythonActivity.mActivity
-                    vibrator = activity.getSystemService(Context.VIBRATOR_SERVICE)
-                    
-                    if VERSION.SDK_INT >= 26:
-                        pattern = [0, 500, 200, 500, 200, 500]
-                        effect = VibrationEffect.createWaveform(pattern, 0)
-                        vibrator.vibrate(effect)
-                    else:
-                        vibrator.vibrate([0, 500, 200, 500, 200, 500], 0)
-                    print("Vibration triggered")
-                except Exception as e:
-                    print(f"Vibration error: {e}")
+                # Notification group, sound and vibration for the whole batch
+                self.get_dispatcher().fire(reminders, scheduled)
+                if self.dismiss_poll is None:
+                    self.dismiss_poll = Clock.schedule_interval(self.poll_alarm_dismissed, 2)
+            
+            # Reminders still showing from an earlier batch stay in the popup
+            known = {r.id for r in reminders}
+            reminders = [r for r in self.alarm_reminders if r.id not in known] + list(reminders)
+            self.alarm_reminders = reminders
             
             content = BoxLayout(orientation='vertical', spacing=dp(16), padding=dp(20))
             
@@ -1717,41 +2031,51 @@ The app will request these permissions automatically."""
             ))
             
             content.add_widget(Label(
-                text="REMINDER!",
+                text="REMINDER!" if len(reminders) == 1 else f"{len(reminders)} REMINDERS!",
                 font_size='30sp',
                 bold=True,
                 color=(0.95, 0.35, 0.4, 1),
                 size_hint=(1, 0.1)
             ))
             
-            category = reminder.get('category', 'Personal')
-            cat_label = Label(
-                text=f"📂 {category}",
-                font_size='14sp',
-                size_hint=(1, 0.06),
-                color=(0.4, 0.5, 0.65, 1),
-                bold=True
-            )
-            content.add_widget(cat_label)
-            
-            reminder_label = Label(
-                text=reminder['text'],
-                font_size='19sp',
-                size_hint=(1, 0.14),
-                color=(0.2, 0.25, 0.35, 1),
-                bold=True
-            )
-            content.add_widget(reminder_label)
-            
-            if reminder.get('note'):
-                note_label = Label(
-                    text=f"📝 {reminder['note']}",
+            if len(reminders) > 1:
+                rows = BoxLayout(orientation='vertical', size_hint_y=None, spacing=dp(6))
+                rows.bind(minimum_height=rows.setter('height'))
+                for r in reminders:
+                    rows.add_widget(self.alarm_row(r))
+                scroll = ScrollView(size_hint=(1, 0.3))
+                scroll.add_widget(rows)
+                content.add_widget(scroll)
+            else:
+                reminder = reminders[0]
+                category = reminder.category
+                cat_label = Label(
+                    text=f"📂 {category}",
                     font_size='14sp',
-                    size_hint=(1, 0.1),
-                    color=(0.5, 0.55, 0.65, 1),
-                    italic=True
+                    size_hint=(1, 0.06),
+                    color=(0.4, 0.5, 0.65, 1),
+                    bold=True
                 )
-                content.add_widget(note_label)
+                content.add_widget(cat_label)
+                
+                reminder_label = Label(
+                    text=reminder.text,
+                    font_size='19sp',
+                    size_hint=(1, 0.14),
+                    color=(0.2, 0.25, 0.35, 1),
+                    bold=True
+                )
+                content.add_widget(reminder_label)
+                
+                if reminder.note:
+                    note_label = Label(
+                        text=f"📝 {reminder.note}",
+                        font_size='14sp',
+                        size_hint=(1, 0.1),
+                        color=(0.5, 0.55, 0.65, 1),
+                        italic=True
+                    )
+                    content.add_widget(note_label)
             
             content.add_widget(Label(
                 text=datetime.datetime.now().strftime('%I:%M %p'),
@@ -1811,7 +2135,7 @@ The app will request these permissions automatically."""
             btn_box.add_widget(dismiss_btn)
             content.add_widget(btn_box)
             
-            self.alarm_popup = Popup(
+            popup = Popup(
                 content=content,
                 size_hint=(0.95, 0.8),
                 auto_dismiss=False,
@@ -1821,24 +2145,26 @@ The app will request these permissions automatically."""
             )
             
             def on_dismiss(instance):
+                if self.alarm_popup is not instance:
+                    # Replaced by the popup of a later batch
+                    return
+                self.alarm_popup = None
+                self.alarm_reminders = []
                 self.stop_ringtone()
                 if platform == 'android':
                     try:
-                        from jnius import autoclass
-                        PythonActivity = autoclass('org.kivy.android.PythonActivity')
-                        Context = autoclass('android.content.Context')
-                        Vibrator = autoclass('android.os.Vibrator')
-                        
-                        activity = PythonActivity.mActivity
-                        vibrator = activity.getSystemService(Context.VIBRATOR_SERVICE)
-                        vibrator.cancel()
-                    except:
-                        pass
-            
-            snooze_btn.bind(on_press=lambda x: self.snooze_alarm(reminder, idx))
-            dismiss_btn.bind(on_press=lambda x: self.alarm_popup.dismiss())
-            self.alarm_popup.bind(on_dismiss=on_dismiss)
-            self.alarm_popup.open()
+                        # Cancels the notifications still showing and the vibration
+                        self.get_dispatcher().dismiss_all()
+                    except Exception as e:
+                        print(f"Dismiss alarm error: {e}")
+            
+            snooze_btn.bind(on_press=lambda x: self.snooze_alarm(list(self.alarm_reminders)))
+            dismiss_btn.bind(on_press=lambda x: popup.dismiss())
+            popup.bind(on_dismiss=on_dismiss)
+            previous, self.alarm_popup = self.alarm_popup, popup
+            if previous is not None:
+                previous.dismiss()
+            popup.open()
             
         except Exception as e:
             print(f"Show alarm error: {e}")
@@ -1848,19 +2174,32 @@ The app will request these permissions automatically."""
     def on_pause(self):
         """Handle app going to background - AlarmManager continues working"""
         print("App pausing - AlarmManager will trigger alarms")
+        self.flush_now()
+        print(f"JNI class lookups: {java.stats()}")
+        if self.alarm_audio is not None:
+            print(f"Alarm audio: {self.alarm_audio.stats()}")
         return True
 
     def on_resume(self):
         """Handle app coming back to foreground"""
         print("App resuming")
         self.refresh_reminder_list()
-        self.last_check_minute = -1
+        self.last_check_occurrence = -1
+        # The clock doesn't run while paused; check now and re-arm from the current time
+        self.check_reminders(0)
+        self.arm_reminder_check()
 
     def on_stop(self):
         """Handle app stopping - AlarmManager keeps alarms active"""
         print("App stopping - AlarmManager alarms remain scheduled")
-        self.save_reminders()
+        if self.loaded:
+            # flush_now() only syncs when a save is pending; register every
+            # alarm once more so they are all in place after the app is gone
+            self.worker.submit(self.resync_alarms, [r.to_item() for r in self.reminders])
+        self.flush_now()
         self.stop_ringtone()
+        if self.alarm_audio is not None:
+            self.alarm_audio.release()
 
 
 if __name__ == "__main__":
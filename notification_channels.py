@@ -0,0 +1,118 @@
+"""
+Notification channels used by the app and both background services
+They are created once, on first launch or when CHANNELS_VERSION changes, and
+a marker file in the files dir records which version exists. Firing an alarm
+only builds a notification for ALARM_CHANNEL_ID
+"""
+import os
+import json
+import threading
+
+from jni_registry import java
+
+# Bump whenever the alarm channel's settings change. Android ignores changes
+# to an existing channel and restores a deleted one with the same id as it
+# was, so the version is part of the id: a new version is a new channel, and
+# the previous ones are deleted
+CHANNELS_VERSION = 2
+
+# Alarms from every path (app, service, AlarmReceiver, AlarmBroadcastReceiver.java,
+# which has its own copy of the id)
+ALARM_CHANNEL_PREFIX = 'reminder_alarms'
+ALARM_CHANNEL_ID = f'{ALARM_CHANNEL_PREFIX}_v{CHANNELS_VERSION}'
+# Ongoing notification of the foreground services
+SERVICE_CHANNEL_ID = 'service_channel'
+
+# Ids used before the channels were merged; removed on upgrade
+LEGACY_CHANNEL_IDS = ('reminder_channel', 'alarm_fullscreen', 'reminder_alarm_channel')
+MARKER_FILE_NAME = 'channels.json'
+
+ALARM_VIBRATION = [0, 1000, 500, 1000]
+
+_ready = False
+_lock = threading.Lock()
+
+
+def previous_channel_ids():
+    """Alarm channel ids of every earlier version (version 1 had no suffix)"""
+    return (ALARM_CHANNEL_PREFIX,) + tuple(
+        f'{ALARM_CHANNEL_PREFIX}_v{version}' for version in range(2, CHANNELS_VERSION)
+    )
+
+
+def marker_path(data_dir):
+    return os.path.join(data_dir, MARKER_FILE_NAME)
+
+
+def read_marker(data_dir):
+    """Channel version recorded in the files dir, 0 if there is none"""
+    try:
+        with open(marker_path(data_dir), 'r', encoding='utf-8') as f:
+            return int(json.load(f).get('version', 0))
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def write_marker(data_dir, channel_ids):
+    path = marker_path(data_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CHANNELS_VERSION, 'channels': list(channel_ids)}, f)
+    os.replace(tmp_path, path)
+
+
+def alarm_channel():
+    channel = java.NotificationChannel(
+        ALARM_CHANNEL_ID,
+        "Reminder Alarms",
+        java.NotificationManager.IMPORTANCE_HIGH
+    )
+    channel.setDescription("Alarms for your reminders")
+    channel.enableVibration(True)
+    channel.setVibrationPattern(ALARM_VIBRATION)
+    channel.setLockscreenVisibility(1)
+    channel.setBypassDnd(True)
+
+    alarm_uri = java.RingtoneManager.getDefaultUri(java.RingtoneManager.TYPE_ALARM)
+    audio_attributes = java.AudioAttributes.Builder() \
+        .setContentType(java.AudioAttributes.CONTENT_TYPE_SONIFICATION) \
+        .setUsage(java.AudioAttributes.USAGE_ALARM) \
+        .build()
+    channel.setSound(alarm_uri, audio_attributes)
+    return channel
+
+
+def service_channel():
+    return java.NotificationChannel(
+        SERVICE_CHANNEL_ID,
+        "Alarm Service",
+        java.NotificationManager.IMPORTANCE_LOW
+    )
+
+
+def ensure_channels(context, data_dir):
+    """Create the channels unless this version already did; cheap after that.
+
+    Returns True if the channels had to be (re)created.
+    """
+    global _ready
+    with _lock:
+        if _ready:
+            return False
+        if java.VERSION.SDK_INT < 26 or read_marker(data_dir) == CHANNELS_VERSION:
+            _ready = True
+            return False
+
+        notification_service = context.getSystemService(java.Context.NOTIFICATION_SERVICE)
+        for channel_id in LEGACY_CHANNEL_IDS + previous_channel_ids():
+            notification_service.deleteNotificationChannel(channel_id)
+        notification_service.createNotificationChannel(alarm_channel())
+        notification_service.createNotificationChannel(service_channel())
+        try:
+            write_marker(data_dir, (ALARM_CHANNEL_ID, SERVICE_CHANNEL_ID))
+        except OSError as e:
+            # The channels exist; the next process just creates them again
+            print(f"Channel marker error: {e}")
+        _ready = True
+        print(f"✅ Notification channels v{CHANNELS_VERSION} created")
+        return True
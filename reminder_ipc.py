@@ -0,0 +1,132 @@
+"""
+Change notifications from the app to the background service
+The service listens on a Unix datagram socket in the files dir; the app sends
+one small JSON message per save listing what changed by id
+"""
+import os
+import json
+import socket
+import threading
+
+SOCKET_NAME = 'reminder_service.sock'
+
+# Bigger change sets are sent as a plain 'reload' and the service re-reads the file
+MAX_MESSAGE = 60000
+
+
+def socket_path(data_dir):
+    return os.path.join(data_dir, SOCKET_NAME)
+
+
+def change_ops(changes):
+    """Delta ops for a diff_reminders() result: upsert/delete by id"""
+    ops = [{'op': 'upsert', 'item': item} for item in changes['put']]
+    ops.extend({'op': 'delete', 'id': rid} for rid in changes['deleted'])
+    return ops
+
+
+def as_signature(value):
+    """JSON turns the store signature's tuples into lists; turn them back"""
+    if isinstance(value, list):
+        return tuple(as_signature(v) for v in value)
+    return value
+
+
+class ChangeNotifier:
+    """App side. Sending never blocks: if the service isn't listening (not
+    started yet, or killed) the message is dropped and the service catches
+    up from the file the next time it loads it.
+    """
+    def __init__(self, data_dir):
+        self.path = socket_path(data_dir)
+        self.sock = None
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, ops, base=None, signature=None):
+        """base/signature: store signature before and after the write the ops describe"""
+        message = {'ops': ops}
+        if signature is not None:
+            message['base'] = base
+            message['signature'] = signature
+        data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+        if len(data) > MAX_MESSAGE:
+            data = b'{"ops":[{"op":"reload"}]}'
+
+        with self.lock:
+            try:
+                if self.sock is None:
+                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                    self.sock.setblocking(False)
+                self.sock.sendto(data, self.path)
+                self.sent += 1
+                return True
+            except (FileNotFoundError, ConnectionRefusedError, BlockingIOError):
+                self.dropped += 1
+                return False
+            except OSError as e:
+                print(f"Change notify error: {e}")
+                self.dropped += 1
+                return False
+
+    def close(self):
+        with self.lock:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+
+class ChangeListener:
+    """Service side: a daemon thread hands every decoded message to on_message"""
+    def __init__(self, data_dir, on_message):
+        self.path = socket_path(data_dir)
+        self.on_message = on_message
+        self.sock = None
+        self.thread = None
+        self.received = 0
+
+    def start(self):
+        # A socket file left by a killed service would make bind() fail
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.sock = sock
+        self.thread = threading.Thread(target=self.run, name='change-listener', daemon=True)
+        self.thread.start()
+        print(f"Listening for changes on {self.path}")
+
+    def run(self):
+        sock = self.sock
+        while True:
+            try:
+                data = sock.recv(MAX_MESSAGE + 1)
+            except OSError:
+                break
+            if self.sock is None:
+                # close() was called
+                break
+            try:
+                message = json.loads(data.decode('utf-8'))
+                self.received += 1
+                self.on_message(message)
+            except Exception as e:
+                print(f"Change message error: {e}")
+
+    def close(self):
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            try:
+                # Wakes the thread blocked in recv()
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
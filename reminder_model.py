@@ -0,0 +1,135 @@
+"""
+Reminder model shared by the app and both background services
+One slotted class plus the codec to and from the on-disk JSON items
+"""
+import sys
+import datetime
+
+from reminder_schedule import ALL_DAYS, days_to_mask, mask_to_days
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Reminder:
+    """One reminder; time is stored as minute of day and days as a weekday bitmask"""
+    __slots__ = (
+        'id', 'text', 'minute_of_day', 'days_mask', 'enabled', 'recurring',
+        'ringtone', 'ringtone_uri', 'category', 'priority', 'note',
+        # Naive local datetime while snoozed, else None
+        'snooze_until'
+    )
+
+    def __init__(self, text='', minute_of_day=0, days_mask=ALL_DAYS, id=None,
+                 enabled=True, recurring=True, ringtone='System Alarm', ringtone_uri=None,
+                 category='Personal', priority='Medium', note=''):
+        self.id = id
+        self.text = text
+        self.minute_of_day = minute_of_day
+        self.days_mask = days_mask
+        self.enabled = enabled
+        self.recurring = recurring
+        self.ringtone = _intern(ringtone)
+        self.ringtone_uri = ringtone_uri
+        # A handful of distinct values shared by every reminder
+        self.category = _intern(category)
+        self.priority = _intern(priority)
+        self.note = note
+        self.snooze_until = None
+
+    @property
+    def hour(self):
+        return self.minute_of_day // 60
+
+    @property
+    def minute(self):
+        return self.minute_of_day % 60
+
+    @property
+    def time(self):
+        return datetime.time(self.minute_of_day // 60, self.minute_of_day % 60)
+
+    @time.setter
+    def time(self, value):
+        self.minute_of_day = value.hour * 60 + value.minute
+
+    @property
+    def days(self):
+        """Selected weekdays as a list (display and logging only)"""
+        return mask_to_days(self.days_mask)
+
+    def has_day(self, weekday):
+        return self.days_mask >> weekday & 1 == 1
+
+    def update_from(self, other):
+        """Take over every stored field of `other` except the id (editing in place)"""
+        self.text = other.text
+        self.minute_of_day = other.minute_of_day
+        self.days_mask = other.days_mask
+        self.enabled = other.enabled
+        self.recurring = other.recurring
+        self.ringtone = other.ringtone
+        self.ringtone_uri = other.ringtone_uri
+        self.category = other.category
+        self.priority = other.priority
+        self.note = other.note
+        self.snooze_until = other.snooze_until
+
+    @classmethod
+    def from_item(cls, item):
+        """Decode one on-disk JSON item"""
+        hour, minute = item['time'].split(':')
+        reminder = cls(
+            item.get('text', ''),
+            int(hour) * 60 + int(minute),
+            item_days_mask(item),
+            item.get('id'),
+            item.get('enabled', True),
+            item.get('recurring', True),
+            item.get('ringtone', 'System Alarm'),
+            item.get('ringtone_uri'),
+            item.get('category', 'Personal'),
+            item.get('priority', 'Medium'),
+            item.get('note', '')
+        )
+        snooze_until = item.get('snooze_until')
+        if snooze_until:
+            reminder.snooze_until = datetime.datetime.fromtimestamp(snooze_until)
+        return reminder
+
+    def to_item(self):
+        """Encode to the on-disk JSON item"""
+        item = {
+            'id': self.id,
+            'text': self.text,
+            'time': f"{self.minute_of_day // 60:02d}:{self.minute_of_day % 60:02d}",
+            'recurring': self.recurring,
+            'enabled': self.enabled,
+            'days_mask': self.days_mask,
+            'ringtone': self.ringtone,
+            'ringtone_uri': self.ringtone_uri,
+            'category': self.category,
+            'priority': self.priority,
+            'note': self.note
+        }
+        # Only snoozed reminders carry the key (epoch seconds)
+        if self.snooze_until:
+            item['snooze_until'] = self.snooze_until.timestamp()
+        return item
+
+    def __repr__(self):
+        return f"Reminder({self.id}, {self.text!r}, {self.hour:02d}:{self.minute:02d}, days={self.days_mask:07b})"
+
+
+def item_days_mask(item):
+    """Weekday mask of an on-disk item (files from older versions store a 'days' list)"""
+    mask = item.get('days_mask')
+    if mask is not None:
+        return mask
+    days = item.get('days')
+    return ALL_DAYS if days is None else days_to_mask(days)
+
+
+def decode_reminders(items):
+    return [Reminder.from_item(item) for item in items]
@@ -0,0 +1,199 @@
+"""
+Shared scheduling helpers
+Used by the app (main.py) and the background service
+"""
+import time
+import heapq
+import datetime
+from bisect import bisect_left, bisect_right, insort
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# 'per_reminder': one exact AlarmManager alarm per enabled reminder
+# 'next_alarm': only the NEXT_ALARM_WINDOW earliest occurrences are registered
+#               and re-armed after each fire (see OccurrenceQueue)
+ALARM_STRATEGY = 'per_reminder'
+NEXT_ALARM_WINDOW = 1
+
+
+def seconds_until(when):
+    """Seconds from now until a naive local datetime (DST-safe)"""
+    return time.mktime(when.timetuple()) + when.microsecond / 1e6 - time.time()
+
+
+def epoch_ms(when):
+    """Epoch milliseconds of a naive local datetime"""
+    return int(time.mktime(when.timetuple())) * 1000 + when.microsecond // 1000
+
+
+# Weekday bitmask with every day set (bit 0 = Monday)
+ALL_DAYS = 0x7F
+
+# mask -> tuple of selected weekdays, for the few places that still need lists
+MASK_DAYS = tuple(tuple(day for day in range(7) if mask >> day & 1) for mask in range(128))
+
+
+def days_to_mask(days):
+    """[0, 2, 4] -> 0b0010101 (bit 0 = Monday)"""
+    mask = 0
+    for day in days:
+        mask |= 1 << day
+    return mask
+
+
+def mask_to_days(mask):
+    """0b0010101 -> [0, 2, 4]"""
+    return list(MASK_DAYS[mask & ALL_DAYS])
+
+
+def next_occurrences(entries, now):
+    """Next fire time (epoch ms) strictly after `now` for many reminders in one pass.
+
+    entries: iterable of (reminder_id, minute_of_day, days_mask).
+    Returns {reminder_id: epoch ms}; reminders without any day are left out.
+    The weekday search is a bit rotation plus a lowest-set-bit scan; local
+    time (including DST) is resolved with one mktime per distinct
+    (day offset, minute) pair.
+    """
+    today = now.weekday()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    now_us = ((now.hour * 60 + now.minute) * 60 + now.second) * 1000000 + now.microsecond
+    resolved = {}
+    result = {}
+    for reminder_id, minute_of_day, mask in entries:
+        # Rotate so bit 0 is today, bit 1 tomorrow, ...
+        rotated = ((mask >> today) | (mask << (7 - today))) & 0x7F
+        if minute_of_day * 60000000 <= now_us:
+            rotated &= ~1
+        if rotated:
+            offset = (rotated & -rotated).bit_length() - 1
+        elif mask:
+            # Only today was selected and it has already passed
+            offset = 7
+        else:
+            continue
+
+        key = (offset, minute_of_day)
+        ms = resolved.get(key)
+        if ms is None:
+            ms = epoch_ms(midnight + datetime.timedelta(days=offset, minutes=minute_of_day))
+            resolved[key] = ms
+        result[reminder_id] = ms
+    return result
+
+
+def next_occurrence_ms(minute_of_day, days_mask, now):
+    """Single-reminder form of next_occurrences(); None if no day is selected"""
+    return next_occurrences([(None, minute_of_day, days_mask)], now).get(None)
+
+
+class DueIndex:
+    """(weekday, minute of day) -> ids of the enabled reminders due then.
+
+    Rebuilt whenever the reminders change so a per-minute check is a
+    single dict lookup instead of a scan over every reminder.
+    """
+    def __init__(self):
+        self.slots = {}
+        # Sorted minutes-since-Monday-00:00 that have something due
+        self.week_minutes = []
+
+    def rebuild(self, entries):
+        """entries: iterable of (reminder_id, minute_of_day, days_mask) for enabled reminders"""
+        slots = {}
+        for reminder_id, minute_of_day, days_mask in entries:
+            for day in MASK_DAYS[days_mask]:
+                key = (day, minute_of_day)
+                if key in slots:
+                    slots[key].append(reminder_id)
+                else:
+                    slots[key] = [reminder_id]
+        self.slots = slots
+        self.week_minutes = sorted(day * MINUTES_PER_DAY + minute_of_day for day, minute_of_day in slots)
+
+    def add(self, reminder_id, minute_of_day, days_mask):
+        """Incremental form of rebuild() for one enabled reminder"""
+        for day in MASK_DAYS[days_mask]:
+            key = (day, minute_of_day)
+            if key in self.slots:
+                self.slots[key].append(reminder_id)
+            else:
+                self.slots[key] = [reminder_id]
+                insort(self.week_minutes, day * MINUTES_PER_DAY + minute_of_day)
+
+    def remove(self, reminder_id, minute_of_day, days_mask):
+        """Undo add() with the values it was added with"""
+        for day in MASK_DAYS[days_mask]:
+            key = (day, minute_of_day)
+            ids = self.slots.get(key)
+            if not ids or reminder_id not in ids:
+                continue
+            ids.remove(reminder_id)
+            if not ids:
+                del self.slots[key]
+                week_minute = day * MINUTES_PER_DAY + minute_of_day
+                del self.week_minutes[bisect_left(self.week_minutes, week_minute)]
+
+    def due(self, weekday, minute_of_day):
+        return self.slots.get((weekday, minute_of_day), ())
+
+    def next_due_after(self, now):
+        """Start of the first minute after `now` that has a reminder due, or None"""
+        if not self.week_minutes:
+            return None
+        current = now.weekday() * MINUTES_PER_DAY + now.hour * 60 + now.minute
+        i = bisect_right(self.week_minutes, current)
+        if i < len(self.week_minutes):
+            delta = self.week_minutes[i] - current
+        else:
+            delta = self.week_minutes[0] + MINUTES_PER_WEEK - current
+        return now.replace(second=0, microsecond=0) + datetime.timedelta(minutes=delta)
+
+
+class OccurrenceQueue:
+    """Min-heap of each enabled reminder's next occurrence as (epoch ms, id)"""
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+
+    def rebuild(self, entries, now):
+        """entries: iterable of (reminder_id, minute_of_day, days_mask) for enabled reminders"""
+        self.entries = {rid: (minute_of_day, days_mask) for rid, minute_of_day, days_mask in entries}
+        heap = [(ms, rid) for rid, ms in next_occurrences(
+            ((rid, minute_of_day, mask) for rid, (minute_of_day, mask) in self.entries.items()),
+            now
+        ).items()]
+        heapq.heapify(heap)
+        self.heap = heap
+
+    def advance(self, now):
+        """Pop every occurrence at or before `now` and queue each reminder's following one.
+
+        Returns the ids that were popped.
+        """
+        now_ms = epoch_ms(now)
+        fired = []
+        while self.heap and self.heap[0][0] <= now_ms:
+            _, rid = heapq.heappop(self.heap)
+            fired.append(rid)
+        following = next_occurrences(((rid,) + self.entries[rid] for rid in fired), now)
+        for rid, ms in following.items():
+            heapq.heappush(self.heap, (ms, rid))
+        return fired
+
+    def window(self, k):
+        """The k earliest distinct instants as [(epoch ms, [ids due then]), ...]"""
+        popped = []
+        result = []
+        while self.heap and len(result) < k:
+            ms = self.heap[0][0]
+            ids = []
+            while self.heap and self.heap[0][0] == ms:
+                item = heapq.heappop(self.heap)
+                popped.append(item)
+                ids.append(item[1])
+            result.append((ms, sorted(ids)))
+        for item in popped:
+            heapq.heappush(self.heap, item)
+        return result
@@ -0,0 +1,602 @@
+"""
+Shared reminder storage helpers
+Used by the app (main.py) and both background services
+"""
+import os
+import json
+import threading
+
+from reminder_model import Reminder, item_days_mask
+
+DATA_FILE_NAME = 'reminders.json'
+DB_FILE_NAME = 'reminders.db'
+
+# 'json' (snapshot + journal) or 'sqlite'. Once reminders.db exists it is
+# used regardless, by the app and both services.
+STORAGE_BACKEND = 'json'
+
+# Small change records are appended here between snapshots
+JOURNAL_SUFFIX = '.journal'
+
+# Fold the journal into a fresh snapshot once it holds this many records
+COMPACT_AFTER = 100
+
+
+def assign_ids(items):
+    """Give every reminder without a valid unique id a new one.
+
+    Legacy files have no ids at all; those reminders get ids equal to their
+    position, which matches the request codes older versions registered.
+    Returns True if any id was added.
+    """
+    used = set()
+    missing = []
+    for item in items:
+        rid = item.get('id')
+        if isinstance(rid, int) and rid >= 0 and rid not in used:
+            used.add(rid)
+        else:
+            missing.append(item)
+
+    next_id = max(used) + 1 if used else 0
+    for item in missing:
+        item['id'] = next_id
+        next_id += 1
+    return bool(missing)
+
+
+def journal_path(data_file):
+    return data_file + JOURNAL_SUFFIX
+
+
+def read_snapshot(data_file):
+    """(generation, items) of the snapshot.
+
+    Older versions wrote a bare list; that counts as generation 0.
+    """
+    if not os.path.exists(data_file):
+        return 0, []
+    with open(data_file, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        generation, items = data.get('generation', 0), data.get('reminders', [])
+    else:
+        generation, items = 0, data
+    assign_ids(items)
+    return generation, items
+
+
+def write_snapshot(data_file, items, generation):
+    """Replace the snapshot atomically: temp file + fsync + rename"""
+    directory = os.path.dirname(data_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = data_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump({'generation': generation, 'reminders': items}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, data_file)
+    # Make the rename itself durable
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def read_journal(path):
+    """Change records from the journal; a torn record (crash mid-append) is skipped"""
+    try:
+        with open(path, 'r') as f:
+            lines = f.read().split('\n')
+    except FileNotFoundError:
+        return []
+
+    records = []
+    for line in lines:
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            print(f"Skipping torn journal record ({len(line)} bytes)")
+    return records
+
+
+def apply_journal(items, records, generation=0):
+    """Replay put/del/order records on top of a snapshot list.
+
+    Only records of the snapshot's generation count: older ones were
+    written before the snapshot and are already part of it.
+    """
+    by_id = {item['id']: item for item in items}
+    order = [item['id'] for item in items]
+    in_order = set(order)
+    for record in records:
+        if record.get('gen', 0) != generation:
+            continue
+        op = record.get('op')
+        if op == 'put':
+            item = record['item']
+            by_id[item['id']] = item
+            if item['id'] not in in_order:
+                order.append(item['id'])
+                in_order.add(item['id'])
+        elif op == 'del':
+            by_id.pop(record['id'], None)
+        elif op == 'order':
+            order = list(record['ids'])
+            in_order = set(order)
+
+    result = [by_id[rid] for rid in order if rid in by_id]
+    if len(result) < len(by_id):
+        # Anything an order record missed goes at the end
+        result.extend(item for rid, item in by_id.items() if rid not in in_order)
+    return result
+
+
+def read_reminder_file(data_file):
+    """Read the raw reminder list (snapshot + journal) from disk, with ids assigned"""
+    for _ in range(3):
+        before = file_signature(data_file)
+        generation, items = read_snapshot(data_file)
+        items = apply_journal(items, read_journal(journal_path(data_file)), generation)
+        # A compaction between reading the snapshot and the journal could
+        # hide the newest changes; read again if the snapshot was replaced
+        if file_signature(data_file) == before:
+            break
+    return items
+
+
+def diff_reminders(saved, order, items):
+    """What changed between the last written state (saved by id + order) and items"""
+    put = []
+    ids = []
+    current = {}
+    for item in items:
+        rid = item['id']
+        ids.append(rid)
+        current[rid] = item
+        if saved.get(rid) != item:
+            put.append(item)
+    deleted = [rid for rid in saved if rid not in current]
+
+    # Order the reader would end up with: survivors in the old order, new ones appended
+    replayed = [rid for rid in order if rid in current]
+    replayed.extend(rid for rid in ids if rid not in saved)
+    return {
+        'current': current,
+        'ids': ids,
+        'put': put,
+        'deleted': deleted,
+        'reordered': replayed != ids
+    }
+
+
+class ReminderStore:
+    """Writer side of the snapshot + journal storage (used by the app only).
+
+    save() compares the list with what was last written and appends one
+    small record per changed reminder, so a single edit costs a few hundred
+    bytes. After COMPACT_AFTER records the journal is folded into a new
+    snapshot. Readers never see a torn state: the snapshot is replaced
+    atomically and a half-written journal record is ignored.
+
+    Every snapshot has a generation number and every journal record the
+    generation it applies to. Compaction writes the next generation, so
+    records left over from before it (a reader in between, or a crash before
+    the journal is emptied) are skipped instead of replayed again.
+    """
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.journal_file = journal_path(data_file)
+        # id -> item as last written, and the written order
+        self.saved = {}
+        self.order = []
+        self.journal_records = 0
+        self.snapshot_generation = 0
+        # diff_reminders() result of the last save(), for change notifications
+        self.last_changes = None
+
+    def load(self):
+        self.journal_records = self.repair_journal()
+        self.snapshot_generation = read_snapshot(self.data_file)[0]
+        items = read_reminder_file(self.data_file)
+        self.saved = {item['id']: item for item in items}
+        self.order = [item['id'] for item in items]
+        return items
+
+    def repair_journal(self):
+        """Cut a torn trailing record so later appends start on a fresh line.
+
+        Returns the number of complete records.
+        """
+        try:
+            with open(self.journal_file, 'rb+') as f:
+                data = f.read()
+                end = data.rfind(b'\n') + 1
+                if end < len(data):
+                    print(f"Dropping torn journal tail ({len(data) - end} bytes)")
+                    f.truncate(end)
+                return data.count(b'\n', 0, end)
+        except FileNotFoundError:
+            return 0
+
+    def save(self, items):
+        """Persist the full reminder list; returns the number of change records"""
+        changes = diff_reminders(self.saved, self.order, items)
+        current, ids = changes['current'], changes['ids']
+        gen = self.snapshot_generation
+        records = [{'gen': gen, 'op': 'put', 'item': item} for item in changes['put']]
+        records.extend({'gen': gen, 'op': 'del', 'id': rid} for rid in changes['deleted'])
+        if changes['reordered']:
+            records.append({'gen': gen, 'op': 'order', 'ids': ids})
+
+        if not os.path.exists(self.data_file) or self.journal_records + len(records) > COMPACT_AFTER:
+            self.compact(items)
+        elif records:
+            self.append(records)
+
+        self.saved = current
+        self.order = ids
+        self.last_changes = changes
+        return len(records)
+
+    def signature(self):
+        """Readers' view of the files (see ReminderFileCache.adopt)"""
+        return store_signature(self.data_file)
+
+    def append(self, records):
+        with open(self.journal_file, 'a') as f:
+            f.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += len(records)
+
+    def compact(self, items):
+        """Write the next generation's snapshot, then empty the journal"""
+        write_snapshot(self.data_file, items, self.snapshot_generation + 1)
+        self.snapshot_generation += 1
+        # From here on the old records belong to an older generation and are
+        # skipped, so a crash (or a reader) before the truncation loses nothing
+        self.reset_journal()
+
+    def reset_journal(self):
+        with open(self.journal_file, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records = 0
+
+
+class ReminderIndex:
+    """id -> Reminder lookup plus id allocation"""
+    def __init__(self, reminders=()):
+        self.by_id = {}
+        self.next_id = 0
+        self.rebuild(reminders)
+
+    def rebuild(self, reminders):
+        self.by_id = {r.id: r for r in reminders}
+        self.next_id = max(self.by_id) + 1 if self.by_id else 0
+
+    def add(self, reminder):
+        """Register a reminder, allocating an id if it has none"""
+        if reminder.id is None:
+            reminder.id = self.next_id
+        self.by_id[reminder.id] = reminder
+        if reminder.id >= self.next_id:
+            self.next_id = reminder.id + 1
+        return reminder.id
+
+    def remove(self, reminder_id):
+        return self.by_id.pop(reminder_id, None)
+
+    def get(self, reminder_id):
+        return self.by_id.get(reminder_id)
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self.by_id
+
+    def __len__(self):
+        return len(self.by_id)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    enabled INTEGER NOT NULL,
+    days_mask INTEGER NOT NULL,
+    minute_of_day INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reminders_due ON reminders (enabled, minute_of_day);
+CREATE INDEX IF NOT EXISTS reminders_position ON reminders (position);
+"""
+
+
+def connect_db(db_file):
+    # Only needed by the optional SQLite backend (p4a 'sqlite3' recipe)
+    import sqlite3
+    conn = sqlite3.connect(db_file, timeout=5, check_same_thread=False)
+    # WAL lets the app write while the services read
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def reminder_row(item, position):
+    """(id, position, enabled, days_mask, minute_of_day, data) for a raw reminder"""
+    hour, minute = map(int, item['time'].split(':'))
+    return (
+        item['id'],
+        position,
+        1 if item.get('enabled', True) else 0,
+        item_days_mask(item),
+        hour * 60 + minute,
+        json.dumps(item, separators=(',', ':'))
+    )
+
+
+def migrate_json_to_sqlite(data_file, db_file):
+    """One-time import of reminders.json (+ journal) into a new reminders.db.
+
+    The database is built under a temporary name and renamed into place, so
+    a crash never leaves a half-filled reminders.db behind. The JSON files
+    are kept with a .migrated suffix.
+    """
+    if os.path.exists(db_file):
+        return False
+    journal_file = journal_path(data_file)
+    if not os.path.exists(data_file) and not os.path.exists(journal_file):
+        return False
+
+    import sqlite3
+    items = read_reminder_file(data_file)
+    tmp_file = db_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    conn = sqlite3.connect(tmp_file)
+    try:
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.executemany('INSERT INTO reminders VALUES (?, ?, ?, ?, ?, ?)',
+                             [reminder_row(item, i) for i, item in enumerate(items)])
+    finally:
+        conn.close()
+    os.replace(tmp_file, db_file)
+
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.replace(path, path + '.migrated')
+    print(f"Migrated {len(items)} reminders to {db_file}")
+    return True
+
+
+class SqliteReminderStore:
+    """SQLite backend with the same load()/save() interface as ReminderStore.
+
+    save() only touches the rows that changed, in one transaction. Schedule
+    fields live in indexed columns, so the services' get() and due() (see
+    SqliteReminderCache) are index lookups.
+    """
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.conn = connect_db(db_file)
+        self.lock = threading.Lock()
+        self.saved = {}
+        self.order = []
+        # diff_reminders() result of the last save(), for change notifications
+        self.last_changes = None
+
+    def load(self):
+        with self.lock:
+            rows = self.conn.execute('SELECT data FROM reminders ORDER BY position').fetchall()
+        items = [json.loads(data) for (data,) in rows]
+        self.saved = {item['id']: item for item in items}
+        self.order = [item['id'] for item in items]
+        return items
+
+    def save(self, items):
+        """Persist the full reminder list; returns the number of changed rows"""
+        changes = diff_reminders(self.saved, self.order, items)
+        ids = changes['ids']
+        positions = {rid: i for i, rid in enumerate(ids)}
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO reminders VALUES (?, ?, ?, ?, ?, ?)',
+                                  [reminder_row(item, positions[item['id']]) for item in changes['put']])
+            self.conn.executemany('DELETE FROM reminders WHERE id = ?',
+                                  [(rid,) for rid in changes['deleted']])
+            if changes['reordered']:
+                self.conn.executemany('UPDATE reminders SET position = ? WHERE id = ?',
+                                      [(i, rid) for i, rid in enumerate(ids)])
+
+        self.saved = changes['current']
+        self.order = ids
+        self.last_changes = changes
+        return len(changes['put']) + len(changes['deleted']) + (1 if changes['reordered'] else 0)
+
+    def signature(self):
+        # data_version is per connection, so readers can't be handed a signature
+        return None
+
+
+def fetch_reminder(conn, reminder_id):
+    row = conn.execute('SELECT data FROM reminders WHERE id = ?', (reminder_id,)).fetchone()
+    return Reminder.from_item(json.loads(row[0])) if row else None
+
+
+def fetch_due(conn, weekday, minute_of_day):
+    """Enabled reminders due at minute_of_day on weekday (uses reminders_due)"""
+    rows = conn.execute(
+        'SELECT data FROM reminders WHERE enabled = 1 AND minute_of_day = ? '
+        'AND (days_mask >> ?) & 1 ORDER BY position',
+        (minute_of_day, weekday)
+    ).fetchall()
+    return [Reminder.from_item(json.loads(data)) for (data,) in rows]
+
+
+def open_store(data_dir):
+    """The app's writer for whichever backend is configured (or already on disk)"""
+    data_file = os.path.join(data_dir, DATA_FILE_NAME)
+    db_file = os.path.join(data_dir, DB_FILE_NAME)
+    if STORAGE_BACKEND == 'sqlite' or os.path.exists(db_file):
+        migrate_json_to_sqlite(data_file, db_file)
+        return SqliteReminderStore(db_file)
+    return ReminderStore(data_file)
+
+
+def file_signature(path):
+    """(mtime_ns, size, inode) of a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def store_signature(data_file):
+    """Changes whenever the snapshot or its journal changes; None if neither exists"""
+    signature = (file_signature(data_file), file_signature(journal_path(data_file)))
+    return signature if any(signature) else None
+
+
+class ReminderFileCache:
+    """Parsed reminder state that is only rebuilt when the file changes.
+
+    `parse` turns the raw reminder list into whatever shape the caller
+    keeps in memory. Two stat() calls per load() are all it costs while
+    the snapshot and journal are unchanged.
+    """
+    def __init__(self, data_file, parse=None):
+        self.data_file = data_file
+        self.parse = parse or (lambda items: items)
+        self.signature = None
+        self.value = None
+        self.generation = 0
+
+    def load(self):
+        signature = store_signature(self.data_file)
+        if self.generation and signature == self.signature:
+            return self.value
+
+        try:
+            items = read_reminder_file(self.data_file) if signature else []
+        except ValueError as e:
+            # A snapshot from an older, non-atomic writer caught mid-write;
+            # keep the last good state and retry next time
+            print(f"Reminder file not readable yet: {e}")
+            if self.generation:
+                return self.value
+            items, signature = [], None
+
+        self.signature = signature
+        self.value = self.parse(items)
+        self.generation += 1
+        return self.value
+
+    def adopt(self, base, signature):
+        """Accept `signature` as already loaded when the caller has applied the
+        change from `base` to it in memory; False if we weren't at `base`"""
+        if self.generation and base is not None and self.signature == base:
+            self.signature = signature
+            return True
+        return False
+
+    def get(self, reminder_id):
+        """Works when `parse` returns something with .get(), e.g. ReminderIndex"""
+        return self.load().get(reminder_id)
+
+
+class SqliteReminderCache:
+    """ReminderFileCache counterpart for reminders.db.
+
+    PRAGMA data_version changes whenever another connection commits, so an
+    unchanged database costs one tiny query per load().
+    """
+    def __init__(self, db_file, parse=None, generation=0):
+        self.db_file = db_file
+        self.parse = parse or (lambda items: items)
+        self.conn = None
+        self.version = None
+        self.value = None
+        # Continues the numbering of the cache this one replaces
+        self.generation = generation
+        self.loaded = False
+
+    def connection(self):
+        if self.conn is None:
+            self.conn = connect_db(self.db_file)
+        return self.conn
+
+    def load(self):
+        conn = self.connection()
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if self.loaded and version == self.version:
+            return self.value
+        rows = conn.execute('SELECT data FROM reminders ORDER BY position').fetchall()
+        self.version = version
+        self.value = self.parse([json.loads(data) for (data,) in rows])
+        self.generation += 1
+        self.loaded = True
+        return self.value
+
+    def get(self, reminder_id):
+        """Single indexed lookup, without loading everything"""
+        return fetch_reminder(self.connection(), reminder_id)
+
+    def due(self, weekday, minute_of_day):
+        return fetch_due(self.connection(), weekday, minute_of_day)
+
+
+class ReminderReader:
+    """Cached read access for the services over whichever backend is on disk.
+
+    Starts on reminders.json and switches for good once the app has created
+    reminders.db (e.g. after migrating).
+    """
+    def __init__(self, data_dir, parse=None):
+        self.data_file = os.path.join(data_dir, DATA_FILE_NAME)
+        self.db_file = os.path.join(data_dir, DB_FILE_NAME)
+        self.parse = parse
+        self.cache = None
+
+    def backend(self):
+        if not isinstance(self.cache, SqliteReminderCache) and os.path.exists(self.db_file):
+            generation = self.cache.generation if self.cache else 0
+            self.cache = SqliteReminderCache(self.db_file, self.parse, generation)
+        elif self.cache is None:
+            self.cache = ReminderFileCache(self.data_file, self.parse)
+        return self.cache
+
+    @property
+    def generation(self):
+        return self.backend().generation
+
+    @property
+    def value(self):
+        """Last parsed value, without checking the files"""
+        return self.backend().value
+
+    def load(self):
+        return self.backend().load()
+
+    def adopt(self, base, signature):
+        cache = self.backend()
+        return isinstance(cache, ReminderFileCache) and cache.adopt(base, signature)
+
+    def get(self, reminder_id):
+        return self.backend().get(reminder_id)
+
+    def due(self, weekday, minute_of_day):
+        """Enabled reminders due then, straight from the SQLite index; None on
+        the JSON backend, where callers look them up in their own DueIndex"""
+        cache = self.backend()
+        if isinstance(cache, SqliteReminderCache):
+            return cache.due(weekday, minute_of_day)
+        return None
@@ -0,0 +1,47 @@
+"""
+Ringtones bundled with the app in assets/ringtones
+Indexed by file name only; nothing is read or decoded until a clip is used
+"""
+import os
+
+# ringtone_uri of a bundled sound: BUNDLED_PREFIX + file name
+BUNDLED_PREFIX = 'bundled:'
+
+RINGTONE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'ringtones')
+SOUND_EXTS = ('.mp3', '.ogg', '.wav')
+
+
+def is_bundled(source):
+    return isinstance(source, str) and source.startswith(BUNDLED_PREFIX)
+
+
+def display_name(file_name):
+    """'Burglar-Alarm-chosic.com_.mp3' -> 'Burglar Alarm'"""
+    stem = os.path.splitext(file_name)[0]
+    # Attribution suffix carried by the bundled files
+    stem = stem.replace('-chosic.com_', '')
+    return ' '.join(stem.replace('_', '-').split('-')).strip()
+
+
+class RingtoneCatalogue:
+    """Display name -> 'bundled:<file>' for every sound file in the ringtone dir"""
+    def __init__(self, root=RINGTONE_DIR):
+        self.root = root
+        self.by_name = {}
+        self.scan()
+
+    def scan(self):
+        try:
+            files = sorted(os.listdir(self.root))
+        except OSError as e:
+            print(f"No bundled ringtones: {e}")
+            files = []
+        self.by_name = {
+            display_name(name): BUNDLED_PREFIX + name
+            for name in files if name.lower().endswith(SOUND_EXTS)
+        }
+        return self.by_name
+
+    def path(self, source):
+        """Absolute path of a bundled source (the file name can't leave the dir)"""
+        return os.path.join(self.root, os.path.basename(source[len(BUNDLED_PREFIX):]))
@@ -3,125 +3,96 @@ AlarmManager Receiver Service
 This handles alarms even when the app is completely closed
 """
 import os
-import json
-from jnius import autoclass
+import sys
+import datetime
 
-PythonService = autoclass('org.kivy.android.PythonService')
-Context = autoclass('android.content.Context')
-NotificationManager = autoclass('android.app.NotificationManager')
-NotificationCompat = autoclass('androidx.core.app.NotificationCompat')
-NotificationChannel = autoclass('android.app.NotificationChannel')
-PendingIntent = autoclass('android.app.PendingIntent')
-Intent = autoclass('android.content.Intent')
-PythonActivity = autoclass('org.kivy.android.PythonActivity')
-Vibrator = autoclass('android.os.Vibrator')
-VibrationEffect = autoclass('android.os.VibrationEffect')
-VERSION = autoclass('android.os.Build$VERSION')
-MediaPlayer = autoclass('android.media.MediaPlayer')
-AudioManager = autoclass('android.media.AudioManager')
-Uri = autoclass('android.net.Uri')
-RingtoneManager = autoclass('android.media.RingtoneManager')
-PowerManager = autoclass('android.os.PowerManager')
-AudioAttributes = autoclass('android.media.AudioAttributes')
+# Shared modules live in the app root, one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reminder_store import ReminderIndex, ReminderReader
+from reminder_model import decode_reminders
+from jni_registry import java
+from fire_ledger import FiredLedger, occurrence_minute
+from alarm_audio import DEFAULT_SOURCE, AlarmAudio
+from notification_channels import ALARM_CHANNEL_ID, SERVICE_CHANNEL_ID, ensure_channels
 
 print("AlarmReceiver service starting...")
 
 
 class AlarmReceiver:
     def __init__(self):
-        self.service = PythonService.mService
-        self.media_player = None
+        self.service = java.PythonService.mService
+        # Keeps the default alarm sound prepared between alarms
+        self.alarm_audio = AlarmAudio(self.service)
+        self.alarm_audio.prewarm(DEFAULT_SOURCE)
+        data_dir = self.service.getFilesDir().getAbsolutePath()
+        self.reminder_cache = ReminderReader(data_dir, lambda items: ReminderIndex(decode_reminders(items)))
+        self.ledger = FiredLedger(data_dir)
+        # Created here once, so firing only has to build the notification
+        try:
+            ensure_channels(self.service, data_dir)
+        except Exception as e:
+            print(f"Channel creation error: {e}")
         print("AlarmReceiver initialized")
     
     def show_fullscreen_alarm(self, reminder_id):
         """Show full-screen notification with alarm"""
         try:
-            # Load reminder data
-            data_dir = self.service.getFilesDir().getAbsolutePath()
-            data_file = os.path.join(data_dir, 'reminders.json')
-            
-            reminder = None
-            if os.path.exists(data_file):
-                with open(data_file, 'r') as f:
-                    reminders = json.load(f)
-                    if 0 <= reminder_id < len(reminders):
-                        reminder = reminders[reminder_id]
+            # Load reminder data (cached until the reminders change; an
+            # indexed single-row query with the SQLite backend)
+            reminder = self.reminder_cache.get(reminder_id)
             
             if not reminder:
                 print(f"Reminder {reminder_id} not found")
                 return
             
-            # Create notification channel
-            notification_service = self.service.getSystemService(Context.NOTIFICATION_SERVICE)
-            
-            channel_id = "alarm_fullscreen"
-            channel = NotificationChannel(
-                channel_id,
-                "Alarm Notifications",
-                NotificationManager.IMPORTANCE_HIGH
-            )
-            channel.setDescription("Full-screen alarm notifications")
-            channel.enableVibration(True)
-            channel.setVibrationPattern([0, 1000, 500, 1000])
-            channel.setLockscreenVisibility(1)
-            channel.setBypassDnd(True)
-            
-            # Set alarm sound
-            alarm_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-            audio_attributes = AudioAttributes.Builder() \
-                .setContentType(AudioAttributes.CONTENT_TYPE_SONIFICATION) \
-                .setUsage(AudioAttributes.USAGE_ALARM) \
-                .build()
-            channel.setSound(alarm_uri, audio_attributes)
-            
-            notification_service.createNotificationChannel(channel)
+            notification_service = self.service.getSystemService(java.Context.NOTIFICATION_SERVICE)
             
             # Wake up the device
-            power_manager = self.service.getSystemService(Context.POWER_SERVICE)
+            power_manager = self.service.getSystemService(java.Context.POWER_SERVICE)
             wake_lock = power_manager.newWakeLock(
-                PowerManager.SCREEN_BRIGHT_WAKE_LOCK | 
-                PowerManager.ACQUIRE_CAUSES_WAKEUP |
-                PowerManager.ON_AFTER_RELEASE,
+                java.PowerManager.SCREEN_BRIGHT_WAKE_LOCK | 
+                java.PowerManager.ACQUIRE_CAUSES_WAKEUP |
+                java.PowerManager.ON_AFTER_RELEASE,
                 "AlarmReceiver::WakeLock"
             )
             wake_lock.acquire(60000)  # 60 seconds
             
             # Create full-screen intent
-            full_screen_intent = Intent(self.service, PythonActivity)
+            full_screen_intent = java.Intent(self.service, java.PythonActivity)
             full_screen_intent.setFlags(
-                Intent.FLAG_ACTIVITY_NEW_TASK | 
-                Intent.FLAG_ACTIVITY_CLEAR_TOP |
-                Intent.FLAG_ACTIVITY_SINGLE_TOP
+                java.Intent.FLAG_ACTIVITY_NEW_TASK | 
+                java.Intent.FLAG_ACTIVITY_CLEAR_TOP |
+                java.Intent.FLAG_ACTIVITY_SINGLE_TOP
             )
             full_screen_intent.putExtra("alarm_triggered", True)
             full_screen_intent.putExtra("reminder_id", reminder_id)
             
-            full_screen_pending = PendingIntent.getActivity(
+            full_screen_pending = java.PendingIntent.getActivity(
                 self.service,
                 reminder_id + 10000,
                 full_screen_intent,
-                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+                java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
             )
             
             # Dismiss action
-            dismiss_intent = Intent(self.service, PythonService)
+            dismiss_intent = java.Intent(self.service, java.PythonService)
             dismiss_intent.setAction("DISMISS_ALARM")
             dismiss_intent.putExtra("reminder_id", reminder_id)
             
-            dismiss_pending = PendingIntent.getService(
+            dismiss_pending = java.PendingIntent.getService(
                 self.service,
                 reminder_id + 20000,
                 dismiss_intent,
-                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+                java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
             )
             
             # Build notification
-            builder = NotificationCompat.Builder(self.service, channel_id)
+            builder = java.NotificationCompat.Builder(self.service, ALARM_CHANNEL_ID)
             builder.setSmallIcon(self.service.getApplicationInfo().icon)
-            builder.setContentTitle(f"REMINDER: {reminder.get('category', 'Reminder')}")
-            builder.setContentText(reminder['text'])
-            builder.setPriority(NotificationCompat.PRIORITY_MAX)
-            builder.setCategory(NotificationCompat.CATEGORY_ALARM)
+            builder.setContentTitle(f"REMINDER: {reminder.category}")
+            builder.setContentText(reminder.text)
+            builder.setPriority(java.NotificationCompat.PRIORITY_MAX)
+            builder.setCategory(java.NotificationCompat.CATEGORY_ALARM)
             builder.setAutoCancel(False)
             builder.setOngoing(True)
             builder.setFullScreenIntent(full_screen_pending, True)
@@ -137,14 +108,14 @@ class AlarmReceiver:
             # Vibration
             builder.setVibrate([0, 1000, 500, 1000, 500, 1000])
             
-            # Sound
-            builder.setSound(alarm_uri)
+            # Sound (pre-Android 8.0; the channel's sound after that)
+            builder.setSound(java.RingtoneManager.getDefaultUri(java.RingtoneManager.TYPE_ALARM))
             
             # Style with note
-            if reminder.get('note'):
+            if reminder.note:
                 builder.setStyle(
-                    NotificationCompat.BigTextStyle()
-                    .bigText(f"{reminder['text']}\n\nNote: {reminder['note']}")
+                    java.NotificationCompat.BigTextStyle()
+                    .bigText(f"{reminder.text}\n\nNote: {reminder.note}")
                 )
             
             notification = builder.build()
@@ -175,12 +146,12 @@ class AlarmReceiver:
     def vibrate(self):
         """Vibrate the device"""
         try:
-            vibrator = self.service.getSystemService(Context.VIBRATOR_SERVICE)
+            vibrator = self.service.getSystemService(java.Context.VIBRATOR_SERVICE)
             
             pattern = [0, 1000, 500, 1000, 500, 1000, 500, 1000]
             
-            if VERSION.SDK_INT >= 26:
-                effect = VibrationEffect.createWaveform(pattern, 0)  # Repeat
+            if java.VERSION.SDK_INT >= 26:
+                effect = java.VibrationEffect.createWaveform(pattern, 0)  # Repeat
                 vibrator.vibrate(effect)
             else:
                 vibrator.vibrate(pattern, 0)  # Repeat
@@ -192,24 +163,7 @@ class AlarmReceiver:
     def play_alarm(self):
         """Play alarm sound"""
         try:
-            if self.media_player:
-                try:
-                    self.media_player.stop()
-                    self.media_player.release()
-                except:
-                    pass
-            
-            self.media_player = MediaPlayer()
-            self.media_player.setAudioStreamType(AudioManager.STREAM_ALARM)
-            
-            alarm_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-            self.media_player.setDataSource(self.service, alarm_uri)
-            self.media_player.setLooping(True)
-            self.media_player.prepare()
-            self.media_player.start()
-            
-            print("Alarm sound playing")
-            
+            self.alarm_audio.play(DEFAULT_SOURCE)
         except Exception as e:
             print(f"Play alarm error: {e}")
             import traceback
@@ -218,14 +172,12 @@ class AlarmReceiver:
     def stop_alarm(self):
         """Stop alarm sound and vibration"""
         try:
-            # Stop sound
-            if self.media_player:
-                self.media_player.stop()
-                self.media_player.release()
-                self.media_player = None
+            # Stop sound, and get it ready for the next alarm
+            self.alarm_audio.stop()
+            self.alarm_audio.prewarm(DEFAULT_SOURCE)
             
             # Stop vibration
-            vibrator = self.service.getSystemService(Context.VIBRATOR_SERVICE)
+            vibrator = self.service.getSystemService(java.Context.VIBRATOR_SERVICE)
             vibrator.cancel()
             
             print("Alarm stopped")
@@ -241,7 +193,12 @@ class AlarmReceiver:
             if action and action.startswith("REMINDER_ALARM_"):
                 reminder_id = intent.getIntExtra("reminder_id", -1)
                 print(f"Alarm received for reminder {reminder_id}")
-                self.show_fullscreen_alarm(reminder_id)
+                occurrence = intent.getIntExtra("occurrence_minute", 0) \
+                    or occurrence_minute(datetime.datetime.now())
+                if self.ledger.claim(reminder_id, occurrence):
+                    self.show_fullscreen_alarm(reminder_id)
+                else:
+                    print(f"Reminder {reminder_id} already fired")
             
             elif action == "DISMISS_ALARM":
                 reminder_id = intent.getIntExtra("reminder_id", -1)
@@ -249,7 +206,7 @@ class AlarmReceiver:
                 self.stop_alarm()
                 
                 # Cancel notification
-                notification_service = self.service.getSystemService(Context.NOTIFICATION_SERVICE)
+                notification_service = self.service.getSystemService(java.Context.NOTIFICATION_SERVICE)
                 notification_service.cancel(3000 + reminder_id)
             
         except Exception as e:
@@ -272,30 +229,20 @@ class AlarmReceiver:
     def start_foreground(self):
         """Start as foreground service"""
         try:
-            notification_service = self.service.getSystemService(Context.NOTIFICATION_SERVICE)
-            
-            channel_id = "service_channel"
-            channel = NotificationChannel(
-                channel_id,
-                "Alarm Service",
-                NotificationManager.IMPORTANCE_LOW
-            )
-            notification_service.createNotificationChannel(channel)
-            
-            intent = Intent(self.service, PythonActivity)
-            pending_intent = PendingIntent.getActivity(
+            intent = java.Intent(self.service, java.PythonActivity)
+            pending_intent = java.PendingIntent.getActivity(
                 self.service,
                 0,
                 intent,
-                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+                java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
             )
             
-            builder = NotificationCompat.Builder(self.service, channel_id)
+            builder = java.NotificationCompat.Builder(self.service, SERVICE_CHANNEL_ID)
             builder.setContentTitle("My Reminders")
             builder.setContentText("Alarm service active")
             builder.setSmallIcon(self.service.getApplicationInfo().icon)
             builder.setContentIntent(pending_intent)
-            builder.setPriority(NotificationCompat.PRIORITY_LOW)
+            builder.setPriority(java.NotificationCompat.PRIORITY_LOW)
             builder.setOngoing(True)
             
             notification = builder.build()
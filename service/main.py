@@ -3,51 +3,81 @@ Enhanced background service for reminder app - FIXED VERSION
 Handles AlarmManager triggers and reschedules
 """
 import os
-import json
+import sys
 import datetime
 import time
-from jnius import autoclass
+import queue
+import threading
 
-# Android classes
-PythonService = autoclass('org.kivy.android.PythonService')
-PythonActivity = autoclass('org.kivy.android.PythonActivity')
-Context = autoclass('android.content.Context')
-NotificationManager = autoclass('android.app.NotificationManager')
-NotificationCompat = autoclass('androidx.core.app.NotificationCompat')
-PendingIntent = autoclass('android.app.PendingIntent')
-Intent = autoclass('android.content.Intent')
-Vibrator = autoclass('android.os.Vibrator')
-VibrationEffect = autoclass('android.os.VibrationEffect')
-VERSION = autoclass('android.os.Build$VERSION')
-MediaPlayer = autoclass('android.media.MediaPlayer')
-AudioManager = autoclass('android.media.AudioManager')
-Uri = autoclass('android.net.Uri')
-RingtoneManager = autoclass('android.media.RingtoneManager')
-PowerManager = autoclass('android.os.PowerManager')
-AlarmManager = autoclass('android.app.AlarmManager')
-Calendar = autoclass('java.util.Calendar')
+# Shared modules live in the app root, one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reminder_store import DATA_FILE_NAME, ReminderIndex, ReminderReader
+from reminder_model import Reminder, decode_reminders
+from reminder_schedule import (
+    ALARM_STRATEGY, NEXT_ALARM_WINDOW, DueIndex, OccurrenceQueue, days_to_mask,
+    next_occurrence_ms, seconds_until
+)
+import alarm_manager
+from jni_registry import java
+from reminder_ipc import ChangeListener, as_signature
+from fire_ledger import FiredLedger, occurrence_minute
+from alarm_audio import PREWARM_AHEAD_SECONDS, AlarmAudio, sound_source
+from notification_channels import SERVICE_CHANNEL_ID, ensure_channels
+from alarm_dispatch import AlarmDispatcher, lead_reminder
+from fire_latency import LatencyHistogram
 
 print("Enhanced Service starting...")
 
+# Longest sleep between checks when nothing is due soon, so edits made by
+# the app are still picked up
+MAX_IDLE_SECONDS = 300
+
+# How often to look for dismissed notifications while an alarm is sounding
+DISMISS_POLL_SECONDS = 2
+
 class ReminderService:
     def __init__(self):
-        self.service = PythonService.mService
+        self.service = java.PythonService.mService
         self.data_dir = self.service.getFilesDir().getAbsolutePath()
-        self.data_file = os.path.join(self.data_dir, 'reminders.json')
-        self.triggered_reminders = set()
-        self.last_check_minute = -1
-        self.media_player = None
+        self.data_file = os.path.join(self.data_dir, DATA_FILE_NAME)
+        # Shared with the app and the Java receiver so each occurrence fires once
+        self.ledger = FiredLedger(self.data_dir)
+        self.reminder_index = ReminderIndex()
+        self.due_index = DueIndex()
+        self.occurrences = OccurrenceQueue()
+        self.occurrences_generation = 0
+        self.alarm_slots = {}
+        self.reminder_cache = ReminderReader(self.data_dir, self.parse_reminders)
+        self.last_check_occurrence = -1
+        self.alarm_audio = AlarmAudio(self.service)
+        # How late alarms fire, shared with the app and the Java receiver
+        self.latency = LatencyHistogram(self.data_dir)
+        # Reminders firing together get one notification group, sound and vibration
+        self.dispatcher = AlarmDispatcher(self.service, self.alarm_audio,
+                                          latency=self.latency, path='service')
         self.wake_lock = None
+        self.wakeup = threading.Event()
+        # Deltas pushed by the app, applied on the service loop thread
+        self.changes = queue.SimpleQueue()
+        self.change_listener = ChangeListener(self.data_dir, self.on_change_message)
+        # reminder id -> datetime its snooze runs out (saved by the app)
+        self.snoozes = {}
         
         print(f"Service initialized. Data file: {self.data_file}")
         
+        # Before handle_alarm_intent() can post to them (no-op once created)
+        try:
+            ensure_channels(self.service, self.data_dir)
+        except Exception as e:
+            print(f"Channel creation error: {e}")
+        
         # Check if we were started by AlarmManager
         self.handle_alarm_intent()
         
         try:
-            power_manager = self.service.getSystemService(Context.POWER_SERVICE)
+            power_manager = self.service.getSystemService(java.Context.POWER_SERVICE)
             self.wake_lock = power_manager.newWakeLock(
-                PowerManager.PARTIAL_WAKE_LOCK,
+                java.PowerManager.PARTIAL_WAKE_LOCK,
                 "MyReminders::ServiceWakeLock"
             )
             self.wake_lock.acquire()
@@ -68,30 +98,35 @@ class ReminderService:
                     reminder_note = intent.getStringExtra("reminder_note")
                     alarm_hour = intent.getIntExtra("alarm_hour", 0)
                     alarm_minute = intent.getIntExtra("alarm_minute", 0)
+                    alarm_days_mask = intent.getIntExtra("alarm_days_mask", 0)
+                    # Alarms registered by older versions carry a "0,1,2" string
                     alarm_days_str = intent.getStringExtra("alarm_days")
+                    if not alarm_days_mask and alarm_days_str:
+                        alarm_days_mask = days_to_mask(int(d) for d in alarm_days_str.split(','))
                     
                     print(f"AlarmManager triggered reminder {reminder_id}: {reminder_text}")
                     
-                    # Show notification immediately
-                    self.show_alarm_notification({
-                        'text': reminder_text,
-                        'category': reminder_category,
-                        'note': reminder_note,
-                        'priority': 'High'
-                    }, reminder_id)
-                    
-                    self.vibrate('High')
-                    self.play_alarm({'text': reminder_text})
-                    self.wake_screen()
+                    # Alarms registered by older versions don't say which occurrence
+                    occurrence = intent.getIntExtra("occurrence_minute", 0)
+                    scheduled = [occurrence * 60 + intent.getIntExtra("occurrence_offset_ms", 0) / 1000] \
+                        if occurrence else []
+                    occurrence = occurrence or occurrence_minute(datetime.datetime.now())
+                    if self.ledger.claim(reminder_id, occurrence):
+                        # Show notification immediately
+                        reminder = Reminder(reminder_text, id=reminder_id, category=reminder_category,
+                                            priority='High', note=reminder_note)
+                        self.dispatcher.fire([reminder], scheduled, path='intent')
+                        self.wake_screen()
+                    else:
+                        print(f"Reminder {reminder_id} already fired")
                     
                     # IMPORTANT: Reschedule for next occurrence
-                    if alarm_days_str:
-                        alarm_days = [int(d) for d in alarm_days_str.split(',')]
+                    if alarm_days_mask:
                         self.reschedule_alarm(
                             reminder_id, 
                             alarm_hour, 
                             alarm_minute, 
-                            alarm_days,
+                            alarm_days_mask,
                             reminder_text,
                             reminder_category,
                             reminder_note
@@ -102,35 +137,16 @@ class ReminderService:
             import traceback
             traceback.print_exc()
     
-    def reschedule_alarm(self, reminder_id, hour, minute, days, text, category, note):
+    def reschedule_alarm(self, reminder_id, hour, minute, days_mask, text, category, note):
         """Reschedule alarm for next occurrence"""
         try:
             alarm_manager = self.service.getSystemService('alarm')
             
             # Find next occurrence
-            now = Calendar.getInstance()
-            current_time = now.getTimeInMillis()
-            
-            next_alarm_time = None
-            
-            for day in days:
-                calendar = Calendar.getInstance()
-                calendar.set(Calendar.HOUR_OF_DAY, hour)
-                calendar.set(Calendar.MINUTE, minute)
-                calendar.set(Calendar.SECOND, 0)
-                calendar.set(Calendar.MILLISECOND, 0)
-                
-                java_day = ((day + 1) % 7) + 1
-                calendar.set(Calendar.DAY_OF_WEEK, java_day)
-                
-                if calendar.getTimeInMillis() <= current_time:
-                    calendar.add(Calendar.WEEK_OF_YEAR, 1)
-                
-                if next_alarm_time is None or calendar.getTimeInMillis() < next_alarm_time:
-                    next_alarm_time = calendar.getTimeInMillis()
+            next_alarm_time = next_occurrence_ms(hour * 60 + minute, days_mask, datetime.datetime.now())
             
             if next_alarm_time:
-                intent = Intent(self.service, PythonService)
+                intent = java.Intent(self.service, java.PythonService)
                 intent.setAction(f"ALARM_{reminder_id}")
                 intent.putExtra("reminder_id", reminder_id)
                 intent.putExtra("reminder_text", text)
@@ -138,17 +154,18 @@ class ReminderService:
                 intent.putExtra("reminder_note", note)
                 intent.putExtra("alarm_hour", hour)
                 intent.putExtra("alarm_minute", minute)
-                intent.putExtra("alarm_days", ','.join(map(str, days)))
+                intent.putExtra("alarm_days_mask", days_mask)
+                intent.putExtra("occurrence_minute", next_alarm_time // 60000)
                 
-                pending_intent = PendingIntent.getService(
+                pending_intent = java.PendingIntent.getService(
                     self.service,
                     reminder_id,
                     intent,
-                    PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+                    java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
                 )
                 
                 alarm_manager.setExactAndAllowWhileIdle(
-                    AlarmManager.RTC_WAKEUP,
+                    java.AlarmManager.RTC_WAKEUP,
                     next_alarm_time,
                     pending_intent
                 )
@@ -161,141 +178,119 @@ class ReminderService:
             traceback.print_exc()
     
     def load_reminders(self):
-        """Load reminders from JSON file"""
+        """Load reminders from JSON file (re-parsed only when it changed)"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    reminders = []
-                    for item in data:
-                        h, m = map(int, item['time'].split(':'))
-                        reminders.append({
-                            'text': item['text'],
-                            'hour': h,
-                            'minute': m,
-                            'enabled': item.get('enabled', True),
-                            'days': item.get('days', list(range(7))),
-                            'ringtone': item.get('ringtone', 'System Alarm'),
-                            'ringtone_uri': item.get('ringtone_uri', None),
-                            'category': item.get('category', 'Personal'),
-                            'priority': item.get('priority', 'Medium'),
-                            'note': item.get('note', '')
-                        })
-                    print(f"Loaded {len(reminders)} reminders")
-                    return reminders
+            return self.reminder_cache.load()
         except Exception as e:
             print(f"Error loading reminders: {e}")
         return []
     
-    def show_alarm_notification(self, reminder, reminder_id):
-        """Show full-screen alarm notification"""
-        try:
-            notification_service = self.service.getSystemService(Context.NOTIFICATION_SERVICE)
-            
-            intent = Intent(self.service.getApplicationContext(), PythonActivity)
-            intent.setFlags(Intent.FLAG_ACTIVITY_NEW_TASK | Intent.FLAG_ACTIVITY_CLEAR_TOP)
-            pending_intent = PendingIntent.getActivity(
-                self.service, 0, intent,
-                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
-            )
-            
-            category = reminder.get('category', 'Reminder')
-            priority = reminder.get('priority', 'High')
-            
-            priority_icon = "[!] " if priority == 'High' else ""
-            
-            builder = NotificationCompat.Builder(self.service, "reminder_channel")
-            builder.setContentTitle(f"{priority_icon}⏰ {category}")
-            builder.setContentText(reminder['text'])
-            builder.setSmallIcon(self.service.getApplicationInfo().icon)
-            builder.setContentIntent(pending_intent)
-            builder.setPriority(NotificationCompat.PRIORITY_MAX)
-            builder.setCategory(NotificationCompat.CATEGORY_ALARM)
-            builder.setAutoCancel(True)
-            builder.setVibrate([0, 1000, 500, 1000])
-            
-            if reminder.get('note'):
-                builder.setStyle(
-                    NotificationCompat.BigTextStyle()
-                    .bigText(f"{reminder['text']}\n\n📝 {reminder['note']}")
-                )
-            
-            sound_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-            builder.setSound(sound_uri)
-            
-            notification = builder.build()
-            notification.flags |= notification.FLAG_INSISTENT | notification.FLAG_AUTO_CANCEL
-            notification_service.notify(3000 + reminder_id, notification)
-            
-            print(f"Notification shown: {category} - {reminder['text']}")
-            
-        except Exception as e:
-            print(f"Notification error: {e}")
-            import traceback
-            traceback.print_exc()
+    def parse_reminders(self, data):
+        """Build the service's reminder list from the raw file contents"""
+        reminders = decode_reminders(data)
+        self.reminder_index.rebuild(reminders)
+        self.due_index.rebuild(
+            (r.id, r.minute_of_day, r.days_mask)
+            for r in reminders if r.enabled
+        )
+        self.snoozes = {r.id: r.snooze_until for r in reminders if r.snooze_until}
+        print(f"Loaded {len(reminders)} reminders")
+        return reminders
     
-    def vibrate(self, priority='Medium'):
-        """Vibrate the device"""
-        try:
-            vibrator = self.service.getSystemService(Context.VIBRATOR_SERVICE)
-            
-            if priority == 'High':
-                pattern = [0, 1000, 500, 1000, 500, 1000]
-            else:
-                pattern = [0, 500, 200, 500]
-            
-            if VERSION.SDK_INT >= 26:
-                effect = VibrationEffect.createWaveform(pattern, -1)
-                vibrator.vibrate(effect)
-            else:
-                vibrator.vibrate(pattern, -1)
-            
-            print(f"Vibrated with {priority} priority")
-        except Exception as e:
-            print(f"Vibration error: {e}")
+    def on_change_message(self, message):
+        """Listener thread: queue the app's delta and wake the loop"""
+        self.changes.put(message)
+        self.wakeup.set()
     
-    def play_alarm(self, reminder):
-        """Play alarm sound"""
-        try:
-            if self.media_player:
-                try:
-                    self.media_player.stop()
-                    self.media_player.release()
-                except:
-                    pass
-                self.media_player = None
-            
-            self.media_player = MediaPlayer()
-            self.media_player.setAudioStreamType(AudioManager.STREAM_ALARM)
-            
-            default_uri = RingtoneManager.getDefaultUri(RingtoneManager.TYPE_ALARM)
-            self.media_player.setDataSource(self.service, default_uri)
-            self.media_player.setLooping(True)
-            self.media_player.prepare()
-            self.media_player.start()
-            
-            print("Alarm sound playing")
-            
-        except Exception as e:
-            print(f"Play alarm error: {e}")
-            import traceback
-            traceback.print_exc()
+    def apply_changes(self):
+        """Apply queued deltas to the in-memory reminders without re-reading the file"""
+        applied = 0
+        while True:
+            try:
+                message = self.changes.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                ops = message.get('ops', [])
+                if any(op['op'] == 'reload' for op in ops):
+                    self.load_reminders()
+                    continue
+                
+                if 'signature' not in message:
+                    # The SQLite store hands out no signature to check the ops
+                    # against, so re-read it (cheap when data_version is unchanged)
+                    self.load_reminders()
+                    continue
+                
+                # Only apply on top of exactly the state the app wrote it against;
+                # otherwise we missed something and simply re-read
+                if not self.reminder_cache.adopt(as_signature(message['base']),
+                                                 as_signature(message['signature'])):
+                    self.load_reminders()
+                    continue
+                self.apply_reminder_ops(ops)
+                applied += len(ops)
+            except Exception as e:
+                print(f"Apply changes error: {e}")
+                import traceback
+                traceback.print_exc()
+        
+        if applied:
+            print(f"Applied {applied} changes from the app")
+    
+    def apply_reminder_ops(self, ops):
+        # The parsed list as of the adopted signature; load() could already
+        # see a newer file that these ops must not be replayed on
+        reminders = self.reminder_cache.value
+        for op in ops:
+            if op['op'] == 'upsert':
+                new = Reminder.from_item(op['item'])
+                existing = self.reminder_index.get(new.id)
+                if existing is not None:
+                    self.unindex_due(existing)
+                    existing.update_from(new)
+                    self.index_due(existing)
+                else:
+                    reminders.append(new)
+                    self.reminder_index.add(new)
+                    self.index_due(new)
+                if new.snooze_until:
+                    self.snoozes[new.id] = new.snooze_until
+                else:
+                    self.snoozes.pop(new.id, None)
+            elif op['op'] == 'delete':
+                r = self.reminder_index.remove(op['id'])
+                if r is not None:
+                    self.unindex_due(r)
+                    reminders.remove(r)
+                self.snoozes.pop(op['id'], None)
+        
+        # Rebuild the occurrence queue on the next rearm
+        self.occurrences_generation = None
+    
+    def index_due(self, r):
+        if r.enabled:
+            self.due_index.add(r.id, r.minute_of_day, r.days_mask)
+    
+    def unindex_due(self, r):
+        if r.enabled:
+            self.due_index.remove(r.id, r.minute_of_day, r.days_mask)
     
     def wake_screen(self):
         """Wake up the screen"""
         try:
-            power_manager = self.service.getSystemService(Context.POWER_SERVICE)
+            power_manager = self.service.getSystemService(java.Context.POWER_SERVICE)
             wake_lock = power_manager.newWakeLock(
-                PowerManager.SCREEN_BRIGHT_WAKE_LOCK | 
-                PowerManager.ACQUIRE_CAUSES_WAKEUP,
+                java.PowerManager.SCREEN_BRIGHT_WAKE_LOCK | 
+                java.PowerManager.ACQUIRE_CAUSES_WAKEUP,
                 "MyReminders::AlarmWakeLock"
             )
             wake_lock.acquire(10000)
             
-            intent = Intent(self.service.getApplicationContext(), PythonActivity)
-            intent.addFlags(Intent.FLAG_ACTIVITY_NEW_TASK | 
-                          Intent.FLAG_ACTIVITY_CLEAR_TOP |
-                          Intent.FLAG_FROM_BACKGROUND)
+            intent = java.Intent(self.service.getApplicationContext(), java.PythonActivity)
+            intent.addFlags(java.Intent.FLAG_ACTIVITY_NEW_TASK | 
+                          java.Intent.FLAG_ACTIVITY_CLEAR_TOP |
+                          java.Intent.FLAG_FROM_BACKGROUND)
             self.service.startActivity(intent)
             
             print("Screen woken up")
@@ -307,56 +302,140 @@ class ReminderService:
         """Backup check - AlarmManager should handle this"""
         try:
             now = datetime.datetime.now()
+            
+            # Everything claimed in this pass fires as one alert
+            batch = []
+            scheduled = []
+            
+            # Snoozes set in the app end at any second, so check them first
+            for reminder_id, until in list(self.snoozes.items()):
+                if now >= until:
+                    del self.snoozes[reminder_id]
+                    self.load_reminders()
+                    r = self.reminder_index.get(reminder_id)
+                    if r is not None and r.enabled and self.ledger.claim(reminder_id, occurrence_minute(until)):
+                        print(f"Backup snooze trigger: {r.text}")
+                        batch.append(r)
+                        scheduled.append(until.timestamp())
+            
             current_minute = now.hour * 60 + now.minute
+            occurrence = occurrence_minute(now)
             
-            if current_minute == self.last_check_minute:
+            # Keyed on the date too: with event-driven checks, consecutive
+            # checks can fall on the same clock minute of different days
+            if occurrence == self.last_check_occurrence:
+                self.fire(batch, scheduled)
                 return
             
-            self.last_check_minute = current_minute
+            self.last_check_occurrence = occurrence
             current_day = now.weekday()
             
-            reminders = self.load_reminders()
+            # One indexed query with the SQLite backend
+            due = self.reminder_cache.due(current_day, current_minute)
+            if due is None:
+                # Refreshes reminder_index/due_index only if the file changed
+                self.load_reminders()
+                due = [self.reminder_index.get(reminder_id)
+                       for reminder_id in self.due_index.due(current_day, current_minute)]
             
-            for idx, r in enumerate(reminders):
-                if not r.get('enabled'):
-                    continue
-                
-                if current_day not in r.get('days', list(range(7))):
+            for r in due:
+                if r is None or r.snooze_until or r.id in self.snoozes:
                     continue
                 
-                if r['hour'] == now.hour and r['minute'] == now.minute:
-                    reminder_key = f"{idx}_{r['hour']:02d}{r['minute']:02d}_{now.date()}"
-                    
-                    if reminder_key not in self.triggered_reminders:
-                        print(f"Backup trigger: {r['text']}")
-                        self.show_alarm_notification(r, idx)
-                        self.vibrate(r.get('priority', 'Medium'))
-                        self.play_alarm(r)
-                        self.wake_screen()
-                        self.triggered_reminders.add(reminder_key)
+                # Usually the app or the AlarmManager receiver got there first
+                if self.ledger.claim(r.id, occurrence):
+                    print(f"Backup trigger: {r.text}")
+                    batch.append(r)
+                    scheduled.append(occurrence * 60)
             
-            if now.hour == 0 and now.minute == 0:
-                self.triggered_reminders.clear()
+            self.fire(batch, scheduled)
                 
         except Exception as e:
             print(f"Check reminders error: {e}")
     
+    def fire(self, reminders, scheduled):
+        """One notification group, sound and vibration for everything due together"""
+        if reminders:
+            self.dispatcher.fire(reminders, scheduled)
+            self.wake_screen()
+    
+    def rearm_next_alarm(self):
+        """'next_alarm' strategy: drop fired occurrences and keep the next slot(s) registered"""
+        try:
+            reminders = self.load_reminders()
+            now = datetime.datetime.now()
+            if self.occurrences_generation != self.reminder_cache.generation:
+                self.occurrences_generation = self.reminder_cache.generation
+                self.occurrences.rebuild(
+                    ((r.id, r.minute_of_day, r.days_mask) for r in reminders if r.enabled),
+                    now
+                )
+            else:
+                self.occurrences.advance(now)
+            
+            self.alarm_slots = alarm_manager.sync_next_alarm_slots(
+                self.service,
+                self.occurrences.window(NEXT_ALARM_WINDOW),
+                self.reminder_index.by_id,
+                self.alarm_slots
+            )
+        except Exception as e:
+            print(f"Next alarm slot error: {e}")
+    
+    def prewarm_sound(self, when):
+        """Prepare the sound of the first reminder due at `when`"""
+        try:
+            due_ids = self.due_index.due(when.weekday(), when.hour * 60 + when.minute)
+            due = [self.reminder_index.get(rid) for rid in due_ids]
+            due = [r for r in due if r is not None]
+            if due:
+                # The sound the dispatcher will play for this batch
+                r = lead_reminder(due)
+                self.alarm_audio.prewarm(sound_source(r.ringtone, r.ringtone_uri))
+        except Exception as e:
+            print(f"Prewarm error: {e}")
+    
+    def wait_for_next_due(self):
+        """Sleep until the next due minute instead of polling"""
+        self.load_reminders()
+        timeout = MAX_IDLE_SECONDS
+        next_due = self.due_index.next_due_after(datetime.datetime.now())
+        if next_due is not None:
+            # Small margin so we wake just after the minute boundary
+            timeout = min(timeout, max(0, seconds_until(next_due)) + 0.05)
+        if self.snoozes:
+            timeout = min(timeout, max(0, seconds_until(min(self.snoozes.values()))) + 0.05)
+        if next_due is not None:
+            # Wake up early once to get the sound ready, then sleep until it's due
+            until_prewarm = seconds_until(next_due) - PREWARM_AHEAD_SECONDS
+            if until_prewarm <= 0:
+                self.prewarm_sound(next_due)
+            else:
+                timeout = min(timeout, until_prewarm)
+        
+        if self.dispatcher.poll_dismissed():
+            # Stop the sound soon after the last notification is dismissed
+            timeout = min(timeout, DISMISS_POLL_SECONDS)
+        
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+    
     def start_foreground(self):
         """Start service in foreground"""
         try:
-            intent = Intent(self.service.getApplicationContext(), PythonActivity)
-            intent.setFlags(Intent.FLAG_ACTIVITY_NEW_TASK)
-            pending_intent = PendingIntent.getActivity(
+            intent = java.Intent(self.service.getApplicationContext(), java.PythonActivity)
+            intent.setFlags(java.Intent.FLAG_ACTIVITY_NEW_TASK)
+            pending_intent = java.PendingIntent.getActivity(
                 self.service, 0, intent,
-                PendingIntent.FLAG_UPDATE_CURRENT | PendingIntent.FLAG_IMMUTABLE
+                java.PendingIntent.FLAG_UPDATE_CURRENT | java.PendingIntent.FLAG_IMMUTABLE
             )
             
-            builder = NotificationCompat.Builder(self.service, "reminder_channel")
+            builder = java.NotificationCompat.Builder(self.service, SERVICE_CHANNEL_ID)
             builder.setContentTitle("⏰ My Reminders")
             builder.setContentText("Alarm service active")
             builder.setSmallIcon(self.service.getApplicationInfo().icon)
             builder.setContentIntent(pending_intent)
-            builder.setPriority(NotificationCompat.PRIORITY_LOW)
+            builder.setPriority(java.NotificationCompat.PRIORITY_LOW)
             builder.setOngoing(True)
             
             notification = builder.build()
@@ -370,11 +449,19 @@ class ReminderService:
         """Main service loop"""
         print("Service running...")
         self.start_foreground()
+        try:
+            self.change_listener.start()
+        except Exception as e:
+            # Still works without it, edits are just picked up on the next wake
+            print(f"Change listener error: {e}")
         
         while True:
             try:
+                self.apply_changes()
                 self.check_reminders()
-                time.sleep(30)
+                if ALARM_STRATEGY == 'next_alarm':
+                    self.rearm_next_alarm()
+                self.wait_for_next_due()
             except Exception as e:
                 print(f"Service loop error: {e}")
                 time.sleep(30)
@@ -382,6 +469,8 @@ class ReminderService:
     def __del__(self):
         """Cleanup"""
         try:
+            self.change_listener.close()
+            self.alarm_audio.release()
             if self.wake_lock and self.wake_lock.isHeld():
                 self.wake_lock.release()
         except:
@@ -0,0 +1,70 @@
+"""
+Single background worker thread for slow work (disk writes, AlarmManager calls)
+Tasks run one at a time in submission order, so a later edit can never be
+overtaken by an earlier one
+"""
+import queue
+import threading
+import functools
+import traceback
+
+# Tasks allowed to wait before submit() blocks the caller
+QUEUE_SIZE = 8
+
+
+class TaskWorker:
+    """FIFO task queue served by one daemon thread.
+
+    `dispatch(fn)` is how results get back to the caller's thread; the app
+    passes a Clock.schedule_once wrapper so on_done runs on the UI thread.
+    """
+    def __init__(self, dispatch=None, maxsize=QUEUE_SIZE, name='reminder-worker'):
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.tasks = queue.Queue(maxsize)
+        self.name = name
+        self.thread = None
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+
+    def submit(self, fn, *args, on_done=None):
+        """Queue fn(*args); on_done(result) is dispatched when it finishes.
+
+        Blocks while the queue is full (back-pressure) instead of letting
+        work pile up without bound.
+        """
+        self.start()
+        if self.tasks.full():
+            print(f"{self.name}: queue full, waiting")
+        self.tasks.put((fn, args, on_done))
+
+    def run(self):
+        while True:
+            fn, args, on_done = self.tasks.get()
+            try:
+                result = fn(*args)
+                self.completed += 1
+                if on_done is not None:
+                    # Bound now: the dispatched call runs later, after this
+                    # loop has moved on to the next task
+                    self.dispatch(functools.partial(on_done, result))
+            except Exception as e:
+                self.failed += 1
+                print(f"{self.name} task error: {e}")
+                traceback.print_exc()
+            finally:
+                self.tasks.task_done()
+
+    def flush(self, timeout=5):
+        """Wait until everything submitted so far has run; False on timeout"""
+        if self.thread is None:
+            return True
+        done = threading.Event()
+        self.submit(done.set)
+        return done.wait(timeout)
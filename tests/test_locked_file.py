@@ -0,0 +1,89 @@
+"""
+The fired ledger and the latency histogram on their shared locked file
+"""
+import datetime
+import multiprocessing
+
+import fire_latency
+import fire_ledger
+from fire_ledger import FILE_SIZE as LEDGER_SIZE, FiredLedger, JavaFiredLedger, occurrence_minute
+from fire_latency import FILE_SIZE as HISTOGRAM_SIZE, JavaLatencyHistogram, LatencyHistogram
+
+
+def claim_all(data_dir, ids, minute, won):
+    ledger = FiredLedger(data_dir)
+    for reminder_id in ids:
+        if ledger.claim(reminder_id, minute):
+            won.put(reminder_id)
+
+
+def test_only_the_first_claim_wins_across_processes(tmp_path):
+    minute = occurrence_minute(datetime.datetime.now())
+    won = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=claim_all, args=(str(tmp_path), range(100), minute, won))
+               for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    winners = [won.get(timeout=5) for _ in range(100)]
+    assert sorted(winners) == list(range(100))
+    assert won.empty()
+    assert (tmp_path / 'fired.ledger').stat().st_size == LEDGER_SIZE
+
+
+def test_histogram_starts_over_on_a_foreign_file(tmp_path):
+    histogram = LatencyHistogram(str(tmp_path))
+    assert histogram.read() == {}
+    (tmp_path / 'fire_latency.hist').write_bytes(b'not a histogram')
+
+    histogram.record([('app', 'trigger', 3), ('app', 'trigger', 40)])
+    LatencyHistogram(str(tmp_path)).record([('receiver', 'sound', 1500)])
+    assert (tmp_path / 'fire_latency.hist').stat().st_size == HISTOGRAM_SIZE
+    cells = histogram.read()
+    assert sum(cells[('app', 'trigger')][0]) == 2
+    assert cells[('app', 'trigger')][1] == 40
+    assert cells[('receiver', 'sound')][1] == 1500
+
+    histogram.reset()
+    assert histogram.read() == {}
+
+
+class FakeReceiver:
+    """Stands in for AlarmBroadcastReceiver's static methods, storing like the Java side does"""
+    def __init__(self, data_dir):
+        self.histogram = LatencyHistogram(data_dir)
+        self.ledger = FiredLedger(data_dir)
+
+    def claimOccurrence(self, context, reminder_id, minute):
+        return self.ledger.claim(reminder_id, minute)
+
+    def recordLatency(self, context, cell_indexes, samples):
+        cells = [(path, stage) for path in fire_latency.PATHS for stage in fire_latency.STAGES]
+        self.histogram.record([cells[i] + (ms,) for i, ms in zip(cell_indexes, samples)])
+
+    def readLatency(self, context):
+        data = self.histogram.file.read()
+        # Java bytes come back signed
+        return None if data is None else [b - 256 if b > 127 else b for b in data]
+
+
+def test_app_process_goes_through_the_receiver(tmp_path, monkeypatch):
+    receiver = FakeReceiver(str(tmp_path))
+    java = type('java', (), {'AlarmBroadcastReceiver': receiver})
+    monkeypatch.setattr(fire_ledger, 'java', java)
+    monkeypatch.setattr(fire_latency, 'java', java)
+
+    minute = occurrence_minute(datetime.datetime.now())
+    ledger = JavaFiredLedger(context=None)
+    assert ledger.claim(4, minute)
+    assert not ledger.claim(4, minute)
+
+    histogram = JavaLatencyHistogram(None, str(tmp_path))
+    assert histogram.read() == {}
+    histogram.record([('app', 'sound', 300.7), ('intent', 'trigger', -5)])
+    cells = histogram.read()
+    assert cells[('app', 'sound')][1] == 300
+    assert sum(cells[('intent', 'trigger')][0]) == 1
+    assert cells == LatencyHistogram(str(tmp_path)).read()
@@ -0,0 +1,22 @@
+"""
+The alarm channel id carries its version, and the Java receiver uses the same one
+"""
+import os
+import re
+
+from notification_channels import ALARM_CHANNEL_ID, CHANNELS_VERSION, previous_channel_ids
+
+RECEIVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'AlarmBroadcastReceiver.java')
+
+
+def test_alarm_channel_id_is_versioned():
+    assert ALARM_CHANNEL_ID.endswith(f'_v{CHANNELS_VERSION}')
+    assert ALARM_CHANNEL_ID not in previous_channel_ids()
+    assert 'reminder_alarms' in previous_channel_ids()
+
+
+def test_receiver_uses_the_current_alarm_channel():
+    with open(RECEIVER, encoding='utf-8') as f:
+        match = re.search(r'ALARM_CHANNEL_ID = "([^"]+)"', f.read())
+    assert match and match.group(1) == ALARM_CHANNEL_ID
@@ -0,0 +1,134 @@
+"""
+The schedule engine against a brute-force oracle
+Plain Python only (no Kivy, no Android): every candidate instant in the next
+eight days is enumerated and the earliest one after `now` is the answer
+"""
+import os
+import time
+import random
+import datetime
+
+import pytest
+
+from reminder_schedule import (
+    DueIndex, OccurrenceQueue, days_to_mask, epoch_ms, mask_to_days,
+    next_occurrence_ms, next_occurrences
+)
+
+TIMEZONES = ('UTC', 'Europe/Berlin', 'America/New_York', 'Asia/Kolkata', 'Australia/Lord_Howe')
+CASES = 600
+
+
+def oracle_ms(minute_of_day, days, now):
+    """Earliest hh:mm on a selected weekday strictly after now (epoch ms), or None"""
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    candidates = []
+    for offset in range(9):
+        t = midnight + datetime.timedelta(days=offset, minutes=minute_of_day)
+        if t.weekday() in days and t > now:
+            candidates.append(epoch_ms(t))
+    return min(candidates) if candidates else None
+
+
+def random_now(rng):
+    now = datetime.datetime(2026, 1, 1) + datetime.timedelta(seconds=rng.randrange(366 * 86400))
+    if rng.random() < 0.5:
+        now += datetime.timedelta(microseconds=rng.randrange(1000000))
+    return now
+
+
+def random_entry(rng, now):
+    if rng.random() < 0.2:
+        # Due this very minute: must go to the next selected day
+        minute_of_day = now.hour * 60 + now.minute
+    else:
+        minute_of_day = rng.randrange(24 * 60)
+    days = sorted(rng.sample(range(7), rng.randint(0, 7)))
+    return minute_of_day, days
+
+
+@pytest.fixture(params=TIMEZONES)
+def local_tz(request):
+    """Run the test with the process local time zone set (DST included)"""
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = request.param
+    time.tzset()
+    yield request.param
+    if previous is None:
+        del os.environ['TZ']
+    else:
+        os.environ['TZ'] = previous
+    time.tzset()
+
+
+def test_days_mask_round_trip():
+    for mask in range(128):
+        assert days_to_mask(mask_to_days(mask)) == mask
+
+
+def test_next_occurrences_matches_oracle(local_tz):
+    rng = random.Random(local_tz)
+    for _ in range(CASES // 5):
+        now = random_now(rng)
+        entries = [random_entry(rng, now) for _ in range(5)]
+        got = next_occurrences(
+            ((i, minute_of_day, days_to_mask(days)) for i, (minute_of_day, days) in enumerate(entries)),
+            now
+        )
+        for i, (minute_of_day, days) in enumerate(entries):
+            assert got.get(i) == oracle_ms(minute_of_day, days, now), (now, minute_of_day, days)
+
+
+def test_next_occurrence_ms_matches_oracle(local_tz):
+    rng = random.Random('single-' + local_tz)
+    for _ in range(CASES // 5):
+        now = random_now(rng)
+        minute_of_day, days = random_entry(rng, now)
+        assert next_occurrence_ms(minute_of_day, days_to_mask(days), now) == \
+            oracle_ms(minute_of_day, days, now), (now, minute_of_day, days)
+
+
+def test_due_index_matches_oracle():
+    rng = random.Random(9)
+    for _ in range(CASES // 10):
+        now = random_now(rng)
+        entries = [(i,) + random_entry(rng, now) for i in range(8)]
+        index = DueIndex()
+        index.rebuild((i, minute_of_day, days_to_mask(days)) for i, minute_of_day, days in entries)
+
+        current = now.hour * 60 + now.minute
+        due = {i for i, minute_of_day, days in entries
+               if minute_of_day == current and now.weekday() in days}
+        assert set(index.due(now.weekday(), current)) == due
+
+        # Next minute with anything due, on naive wall-clock time
+        minute = now.replace(second=0, microsecond=0)
+        expected = None
+        for _ in range(7 * 24 * 60):
+            minute += datetime.timedelta(minutes=1)
+            if any(minute_of_day == minute.hour * 60 + minute.minute and minute.weekday() in days
+                   for _, minute_of_day, days in entries):
+                expected = minute
+                break
+        assert index.next_due_after(now) == expected, (now, entries)
+
+
+def test_occurrence_queue_advance_matches_oracle(local_tz):
+    rng = random.Random('queue-' + local_tz)
+    for _ in range(CASES // 20):
+        now = random_now(rng)
+        entries = {i: random_entry(rng, now) for i in range(6)}
+        queue = OccurrenceQueue()
+        queue.rebuild(((i, minute_of_day, days_to_mask(days)) for i, (minute_of_day, days) in entries.items()),
+                      now)
+
+        # Step past the first instant, then everything must point at the following one
+        first = queue.window(1)
+        if not first:
+            assert all(not days for _, days in entries.values())
+            continue
+        later = datetime.datetime.fromtimestamp(first[0][0] / 1000) + datetime.timedelta(seconds=30)
+        assert sorted(queue.advance(later)) == first[0][1]
+        for ms, ids in queue.window(len(entries)):
+            for i in ids:
+                assert ms == oracle_ms(*entries[i], later), (later, entries[i])
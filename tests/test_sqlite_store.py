@@ -0,0 +1,75 @@
+"""
+SQLite backend: migration from JSON, save/load round-trips and the indexed reads
+"""
+import os
+
+import reminder_store
+from reminder_store import (
+    DATA_FILE_NAME, DB_FILE_NAME, ReminderReader, ReminderStore, SqliteReminderStore, open_store
+)
+
+
+def item(rid, text, time='09:00', days_mask=127, enabled=True):
+    return {'id': rid, 'text': text, 'time': time, 'enabled': enabled, 'days_mask': days_mask}
+
+
+def test_open_store_migrates_json_once(tmp_path, monkeypatch):
+    data_file = str(tmp_path / DATA_FILE_NAME)
+    json_store = ReminderStore(data_file)
+    json_store.load()
+    json_store.save([item(0, 'a'), item(1, 'b')])
+    # The newest edit is only in the journal
+    items = [item(0, 'a'), item(1, 'b edited'), item(2, 'c')]
+    json_store.save(items)
+
+    monkeypatch.setattr(reminder_store, 'STORAGE_BACKEND', 'sqlite')
+    store = open_store(str(tmp_path))
+    assert isinstance(store, SqliteReminderStore)
+    assert store.last_changes is None
+    assert store.load() == items
+    assert not os.path.exists(data_file)
+    assert os.path.exists(data_file + '.migrated')
+
+    # reminders.db is used from now on, whatever the setting
+    monkeypatch.setattr(reminder_store, 'STORAGE_BACKEND', 'json')
+    assert open_store(str(tmp_path)).load() == items
+
+
+def test_save_load_delete_round_trip(tmp_path):
+    db_file = str(tmp_path / DB_FILE_NAME)
+    store = SqliteReminderStore(db_file)
+    assert store.load() == []
+
+    items = [item(0, 'a'), item(1, 'b'), item(2, 'c')]
+    assert store.save(items) == 3
+    assert SqliteReminderStore(db_file).load() == items
+
+    # Edit one, delete one, reorder
+    items = [item(2, 'c'), item(0, 'a edited')]
+    assert store.save(items) == 3
+    assert store.last_changes['deleted'] == [1]
+    assert SqliteReminderStore(db_file).load() == items
+    assert store.save(items) == 0
+
+
+def test_reader_due_and_get_use_the_database(tmp_path):
+    store = SqliteReminderStore(str(tmp_path / DB_FILE_NAME))
+    store.load()
+    store.save([
+        item(0, 'weekdays', '07:30', days_mask=0b0011111),
+        item(1, 'weekend', '07:30', days_mask=0b1100000),
+        item(2, 'off', '07:30', enabled=False),
+        item(3, 'later', '08:00'),
+    ])
+
+    reader = ReminderReader(str(tmp_path))
+    # Monday and Saturday at 07:30
+    assert [r.id for r in reader.due(0, 7 * 60 + 30)] == [0]
+    assert [r.id for r in reader.due(5, 7 * 60 + 30)] == [1]
+    assert reader.due(0, 7 * 60 + 31) == []
+    assert reader.get(3).text == 'later'
+    assert reader.get(9) is None
+
+
+def test_reader_due_is_none_on_the_json_backend(tmp_path):
+    assert ReminderReader(str(tmp_path)).due(0, 0) is None
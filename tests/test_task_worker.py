@@ -0,0 +1,19 @@
+"""
+TaskWorker results reach on_done unchanged when dispatch runs them late
+"""
+from task_worker import TaskWorker
+
+
+def test_late_dispatch_gets_each_tasks_own_result():
+    # Held back like Clock.schedule_once does, until the worker has moved on
+    pending = []
+    worker = TaskWorker(dispatch=pending.append)
+    got = []
+    worker.submit(lambda: 1, on_done=lambda result: got.append(('first', result)))
+    worker.submit(lambda: 2)
+    worker.submit(lambda: 3, on_done=lambda result: got.append(('third', result)))
+    assert worker.flush()
+
+    for fn in pending:
+        fn()
+    assert got == [('first', 1), ('third', 3)]
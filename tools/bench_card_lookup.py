@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: addressing reminder cards by position vs by id
+refresh_reminder_list used to look up every card's position with
+self.reminders.index(r), a linear dict-equality scan per card. Cards now carry
+the reminder id straight through the filter/group pipeline. This times both
+ways of building the card rows, without Kivy, for a growing reminder list.
+
+Run from the repo root:  python tools/bench_card_lookup.py [n ...]
+"""
+import os
+import sys
+import time
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder_model import Reminder
+
+CATEGORIES = ('Personal', 'Work', 'Health', 'Shopping', 'Other')
+SIZES = (250, 500, 1000, 2000)
+REPEAT = 5
+
+
+def make_dicts(n):
+    """Reminders in the old dict form, as refresh_reminder_list saw them"""
+    return [{
+        'text': f"Reminder {i}",
+        'time': datetime.time(i % 24, i % 60),
+        'days': [0, 1, 2, 3, 4],
+        'enabled': True,
+        'category': CATEGORIES[i % len(CATEGORIES)],
+        'priority': 'Medium',
+        'note': ''
+    } for i in range(n)]
+
+
+def make_reminders(n):
+    return [Reminder(text=f"Reminder {i}", minute_of_day=(i % 24) * 60 + i % 60,
+                     id=i + 1, category=CATEGORIES[i % len(CATEGORIES)])
+            for i in range(n)]
+
+
+def rows_by_index(reminders):
+    """Before: category groups, then one index() scan per card"""
+    categories = {}
+    for r in reminders:
+        categories.setdefault(r['category'], []).append(r)
+    rows = []
+    for cat in sorted(categories):
+        for r in categories[cat]:
+            rows.append({'viewclass': 'ReminderCard', 'index': reminders.index(r)})
+    return rows
+
+
+def rows_by_id(reminders):
+    """After: the id travels with the reminder"""
+    categories = {}
+    for r in reminders:
+        categories.setdefault(r.category, []).append(r)
+    rows = []
+    for cat in sorted(categories):
+        for r in categories[cat]:
+            rows.append({'viewclass': 'ReminderCard', 'reminder_id': r.id, 'reminder': r})
+    return rows
+
+
+def best_ms(func, arg):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(arg)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(sizes):
+    print(f"{'n':>6}  {'index() lookups':>16}  {'id pass-through':>16}")
+    for n in sizes:
+        before = best_ms(rows_by_index, make_dicts(n))
+        after = best_ms(rows_by_id, make_reminders(n))
+        print(f"{n:>6}  {before:>13.2f} ms  {after:>13.3f} ms")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)